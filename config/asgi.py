@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Serve the student hot paths with async views (see core/async_views.py).
+os.environ.setdefault("ASYNC_VIEWS", "True")
+# Every request runs in a fresh thread, which cannot reuse a persistent connection.
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.db_router.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -86,25 +87,142 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Seconds a connection is kept open and reused by later requests and jobs
+# (0 = a new connection each time). config/asgi.py defaults it to 0: ASGI runs
+# each request in a new thread, so persistent connections would pile up
+# instead of being reused.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+# Check a reused connection with a ping before its first query in a request or
+# job, so a connection the server dropped is replaced instead of failing it.
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+# Retries of work marked with core.db_connections.retry_on_disconnect after the
+# connection was lost (never inside a transaction).
+DB_RETRY_ATTEMPTS = config('DB_RETRY_ATTEMPTS', default=2, cast=int)
+# Threads, and so connections per database, of a DatabaseWorkerPool by default.
+DB_POOL_SIZE = config('DB_POOL_SIZE', default=4, cast=int)
+
 DATABASES = {
     'default': dj_database_url.config(
         default=config('DATABASE_URL', default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
-        conn_max_age=600,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
     )
 }
 
+# Optional read replicas, e.g. REPLICA_DATABASE_URLS=mysql://...,mysql://...
+# (or sqlite:///replica.sqlite3 locally). Views and commands marked read-only
+# read from them through core.db_router; everything else uses 'default'.
+for index, url in enumerate(config('REPLICA_DATABASE_URLS', default='', cast=Csv())):
+    DATABASES[f'replica_{index}'] = dj_database_url.parse(
+        url, conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
+    DATABASES[f'replica_{index}']['TEST'] = {'MIRROR': 'default'}
+
+if len(DATABASES) > 1:
+    DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+# Seconds a user reads from the primary after writing, so they see their own changes.
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+# Replicas further behind the primary than this are skipped.
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=5, cast=float)
+# How often each process re-measures replica lag; keep it below the max lag,
+# or a replica can fall that far behind between checks unnoticed.
+REPLICA_LAG_CHECK_SECONDS = config('REPLICA_LAG_CHECK_SECONDS', default=2, cast=float)
+# How often heartbeats are written to the primary; a replica that is up to
+# date still reads this far behind, so keep it well below the max lag.
+REPLICA_HEARTBEAT_SECONDS = config('REPLICA_HEARTBEAT_SECONDS', default=1, cast=float)
+
 # Add SSL requirements for production (Render) if using MySQL/Postgres
-if not DEBUG and 'sqlite' not in DATABASES['default']['ENGINE']:
-    if 'mysql' in DATABASES['default']['ENGINE']:
-        DATABASES['default']['OPTIONS'] = {
+for database in DATABASES.values():
+    if DEBUG or 'sqlite' in database['ENGINE']:
+        continue
+    if 'mysql' in database['ENGINE']:
+        database['OPTIONS'] = {
             'ssl': {'ca': '/etc/ssl/certs/ca-certificates.crt'} # Default location in most linux envs
         }
     else:
         # Postgres default
-        DATABASES['default']['OPTIONS'] = {'sslmode': 'require'}
+        database['OPTIONS'] = {'sslmode': 'require'}
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Use a shared backend (e.g. memcached or the database cache) in production so
+# every worker sees the same cache versions.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='problems-validator'),
+    }
+}
+
+# Seconds a rendered dashboard fragment is reused; submissions invalidate it immediately.
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=60, cast=int)
+
+# Seconds a task's similar-submission pairs are reused after new submissions arrive.
+SIMILARITY_REFRESH_SECONDS = config('SIMILARITY_REFRESH_SECONDS', default=300, cast=int)
+
+# Seconds an encoded per-task test case payload is kept; edits invalidate it immediately.
+TEST_CASES_CACHE_TIMEOUT = config('TEST_CASES_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Serve assignment_detail, task_test_cases, leaderboard and submit_task with async views
+# (core/async_views.py). config/asgi.py turns this on by default; under WSGI
+# every async view would need its own event loop, so it stays off there.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Server-side judge (core/services/judge.py). When enabled, every submission to
+# an auto-validated coding task is queued and re-judged by 'manage.py run_judge';
+# the browser's verdict is shown until then.
+SERVER_JUDGE = config('SERVER_JUDGE', default=False, cast=bool)
+# Sandbox for solutions: 'bwrap' (bubblewrap must be installed) or 'none',
+# which applies resource limits only and is refused unless DEBUG is on.
+JUDGE_SANDBOX = config('JUDGE_SANDBOX', default='bwrap')
+# Worker threads per run_judge process.
+JUDGE_WORKERS = config('JUDGE_WORKERS', default=4, cast=int)
+# Worker threads of all run_judge processes together; the fair share is a
+# fraction of these.
+JUDGE_TOTAL_WORKERS = config('JUDGE_TOTAL_WORKERS', default=JUDGE_WORKERS, cast=int)
+# Fraction of all judge workers a single student may occupy at once.
+JUDGE_MAX_SHARE = config('JUDGE_MAX_SHARE', default=0.25, cast=float)
+# Jobs queued longer than this are served before shorter ones of the same class.
+JUDGE_MAX_WAIT_SECONDS = config('JUDGE_MAX_WAIT_SECONDS', default=60, cast=float)
+# Runtime assumed for tasks that have not been judged yet.
+JUDGE_DEFAULT_RUNTIME_MS = config('JUDGE_DEFAULT_RUNTIME_MS', default=200, cast=float)
+JUDGE_TIME_LIMIT_SECONDS = config('JUDGE_TIME_LIMIT_SECONDS', default=2, cast=float)
+JUDGE_MEMORY_LIMIT_MB = config('JUDGE_MEMORY_LIMIT_MB', default=256, cast=int)
+# Largest stdout a solution may write before it is stopped.
+JUDGE_OUTPUT_LIMIT_MB = config('JUDGE_OUTPUT_LIMIT_MB', default=16, cast=int)
+# Largest total size of the test cases one assignment import may generate;
+# each case alone is already capped by JUDGE_OUTPUT_LIMIT_MB.
+TEST_GENERATION_MAX_TOTAL_MB = config('TEST_GENERATION_MAX_TOTAL_MB', default=256, cast=int)
+# Adaptive limit = reference wall time on the slowest test case x multiplier, at least the minimum.
+# Like every time limit it is enforced on wall time.
+JUDGE_ADAPTIVE_MULTIPLIER = config('JUDGE_ADAPTIVE_MULTIPLIER', default=3.0, cast=float)
+JUDGE_ADAPTIVE_MIN_SECONDS = config('JUDGE_ADAPTIVE_MIN_SECONDS', default=0.5, cast=float)
+# Seconds between checks whether a task's test case order changed, which
+# republishes its test cases to browsers (core/services/test_ordering.py).
+ORDER_REFRESH_SECONDS = config('ORDER_REFRESH_SECONDS', default=600, cast=int)
+
+# Load shedding for submissions (core/services/submission_intake.py): above
+# these limits submit requests get 503 with Retry-After and the browser's
+# queue backs off. A limit of 0 disables that check. Requests in flight are
+# counted in the cache, so the limit covers all web processes only when
+# CACHE_BACKEND is shared (Redis, Memcached); with LocMemCache it is per process.
+# The judge backlog (QUEUED jobs) is only checked when SERVER_JUDGE is on.
+SUBMIT_MAX_IN_FLIGHT = config('SUBMIT_MAX_IN_FLIGHT', default=32, cast=int)
+SUBMIT_MAX_JUDGE_BACKLOG = config('SUBMIT_MAX_JUDGE_BACKLOG', default=500, cast=int)
+SUBMIT_RETRY_AFTER_SECONDS = config('SUBMIT_RETRY_AFTER_SECONDS', default=5, cast=int)
+# Submissions the browser may send in one batch request.
+SUBMIT_MAX_BATCH = config('SUBMIT_MAX_BATCH', default=20, cast=int)
+# Default submission rate limits (token buckets), overridable per assignment:
+# a burst of *_BURST submissions, then *_RATE_PER_MINUTE. A rate of 0 disables the bucket.
+SUBMIT_TASK_RATE_PER_MINUTE = config('SUBMIT_TASK_RATE_PER_MINUTE', default=6, cast=int)
+SUBMIT_TASK_BURST = config('SUBMIT_TASK_BURST', default=5, cast=int)
+SUBMIT_STUDENT_RATE_PER_MINUTE = config('SUBMIT_STUDENT_RATE_PER_MINUTE', default=30, cast=int)
+SUBMIT_STUDENT_BURST = config('SUBMIT_STUDENT_BURST', default=20, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -142,6 +260,16 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Files written by background admin exports (core/services/background_jobs.py).
+EXPORT_DIR = config('EXPORT_DIR', default=str(BASE_DIR / 'exports'))
+
+# Public scoreboard snapshots (core/services/scoreboard.py), rewritten every
+# SCOREBOARD_SNAPSHOT_SECONDS by snapshot_scoreboards and served from disk.
+SCOREBOARD_DIR = config('SCOREBOARD_DIR', default=str(BASE_DIR / 'scoreboards'))
+SCOREBOARD_SNAPSHOT_SECONDS = config('SCOREBOARD_SNAPSHOT_SECONDS', default=10, cast=int)
+# Browser/CDN cache lifetime of snapshots that can no longer change (ended, not frozen).
+SCOREBOARD_FINAL_MAX_AGE = config('SCOREBOARD_FINAL_MAX_AGE', default=86400, cast=int)
+
 STORAGES = {
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
@@ -1,6 +1,15 @@
-from django.contrib import admin
+import os
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Assignment, Task, TestCase, Submission
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import User, Assignment, Task, TestCase, Submission, JudgeJob, BackgroundJob
+from .paginators import EstimatedCountPaginator
 
 class CustomUserAdmin(UserAdmin):
     list_display = ('username', 'email', 'role', 'is_approved', 'is_staff')
@@ -11,9 +20,148 @@ class CustomUserAdmin(UserAdmin):
     add_fieldsets = UserAdmin.add_fieldsets + (
         ('Extra Info', {'fields': ('role', 'is_approved')}),
     )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for tables with millions of rows: estimated counts,
+    no second "N total" count, and large text columns left out of the list query.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    # Text columns the changelist never shows; the change form still loads them.
+    changelist_defer = ()
+
+    def get_changelist(self, request, **kwargs):
+        defer = self.changelist_defer
+
+        class DeferredChangeList(ChangeList):
+            def get_queryset(self, request, exclude_parameters=None):
+                return super().get_queryset(request, exclude_parameters).defer(*defer)
+
+        return DeferredChangeList
+
+
+def queue_background_job(kind, description):
+    """Admin action that queues ``kind`` as a background job instead of running it in the request."""
+    def action(modeladmin, request, queryset):
+        from .services import background_jobs
+        # "Select all" stores the changelist's filters instead of every primary key.
+        filters = None
+        if request.POST.get('select_across') == '1':
+            filters = background_jobs.changelist_filters(request.GET)
+        try:
+            job = background_jobs.enqueue(kind, queryset, user=request.user, filters=filters)
+        except background_jobs.BackgroundJobError as e:
+            modeladmin.message_user(request, str(e), messages.ERROR)
+            return
+        url = reverse('admin:core_backgroundjob_change', args=[job.id])
+        modeladmin.message_user(
+            request,
+            format_html('Queued background job <a href="{}">#{}</a>; run_background_jobs will pick it up.', url, job.id),
+            messages.SUCCESS,
+        )
+    action.__name__ = f"queue_{kind.lower()}"
+    action.short_description = description
+    return action
+
+
+class AssignmentAdmin(LargeTableAdmin):
+    list_display = ('title', 'teacher', 'start_time', 'end_time', 'created_at')
+    list_select_related = ('teacher',)
+    search_fields = ('title',)
+    raw_id_fields = ('teacher',)
+    ordering = ('-id',)
+    actions = [queue_background_job('ARCHIVE', 'Archive old attempts (background)')]
+
+
+class TaskAdmin(LargeTableAdmin):
+    list_display = ('title', 'assignment', 'task_type', 'validation_type', 'comparator', 'order')
+    list_select_related = ('assignment',)
+    list_filter = ('task_type', 'validation_type')
+    search_fields = ('title', 'assignment__title')
+    autocomplete_fields = ('assignment',)
+    changelist_defer = ('description', 'reference_solution')
+
+
+class TestCaseAdmin(LargeTableAdmin):
+    list_display = ('id', 'task', 'run_count', 'fail_count', 'generation_hash')
+    list_select_related = ('task__assignment',)
+    search_fields = ('=task__id',)
+    autocomplete_fields = ('task',)
+    ordering = ('-id',)
+    changelist_defer = ('input_data', 'expected_output')
+
+
+class SubmissionAdmin(LargeTableAdmin):
+    list_display = ('id', 'student', 'task', 'auto_result', 'attempt_count', 'manual_grade', 'submitted_at')
+    # Task.__str__ reads the assignment title, so join it too.
+    list_select_related = ('student', 'task__assignment')
+    # auto_result is indexed together with id; FK filters would list every task in the sidebar.
+    list_filter = ('auto_result',)
+    # Exact matches only, so the username/id indexes are used.
+    search_fields = ('=student__username', '=id')
+    raw_id_fields = ('student', 'task')
+    ordering = ('-id',)
+    changelist_defer = ('content', 'auto_output', 'teacher_comments')
+    actions = [
+        queue_background_job('REJUDGE', 'Re-judge on the server (background)'),
+        queue_background_job('EXPORT', 'Export to CSV (background)'),
+    ]
+
+
+class JudgeJobAdmin(LargeTableAdmin):
+    list_display = ('id', 'submission_id', 'student', 'task', 'priority', 'status', 'enqueued_at', 'runtime_ms')
+    list_select_related = ('student', 'task__assignment')
+    list_filter = ('status', 'priority')
+    raw_id_fields = ('submission', 'student', 'task')
+    ordering = ('-id',)
+    changelist_defer = ('error',)
+
+
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'created_by', 'created_at', 'finished_at', 'processed', 'download')
+    list_select_related = ('created_by',)
+    list_filter = ('status', 'kind')
+    exclude = ('params',)
+    readonly_fields = (
+        'kind', 'status', 'created_by', 'worker', 'created_at', 'started_at', 'finished_at',
+        'processed', 'result', 'download',
+    )
+    ordering = ('-id',)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description='Result file')
+    def download(self, obj):
+        if not obj.result_path:
+            return ''
+        return format_html('<a href="{}">Download</a>', reverse('admin:core_backgroundjob_download', args=[obj.id]))
+
+    def get_urls(self):
+        return [
+            path('<int:job_id>/download/', self.admin_site.admin_view(self.download_view), name='core_backgroundjob_download'),
+        ] + super().get_urls()
+
+    def download_view(self, request, job_id):
+        job = get_object_or_404(BackgroundJob, id=job_id)
+        if not self.has_view_permission(request, job) or not job.result_path:
+            raise Http404
+        export_dir = os.path.realpath(settings.EXPORT_DIR)
+        result_path = os.path.realpath(job.result_path)
+        if os.path.dirname(result_path) != export_dir or not os.path.exists(result_path):
+            raise Http404
+        return FileResponse(open(result_path, 'rb'), as_attachment=True, filename=os.path.basename(result_path))
+
 
 admin.site.register(User, CustomUserAdmin)
-admin.site.register(Assignment)
-admin.site.register(Task)
-admin.site.register(TestCase)
-admin.site.register(Submission)
+admin.site.register(Assignment, AssignmentAdmin)
+admin.site.register(Task, TaskAdmin)
+admin.site.register(TestCase, TestCaseAdmin)
+admin.site.register(Submission, SubmissionAdmin)
+admin.site.register(JudgeJob, JudgeJobAdmin)
+admin.site.register(BackgroundJob, BackgroundJobAdmin)
@@ -0,0 +1,151 @@
+"""
+Async versions of the student hot paths: assignment_detail, task_test_cases,
+leaderboard and submit_task.
+
+They behave exactly like their counterparts in ``views.py`` but use Django's
+async ORM, so under ASGI a slow database round trip suspends the request
+instead of blocking a worker. ``core.urls`` routes to them when the
+``ASYNC_VIEWS`` setting is on (the default when served through
+``config.asgi``).
+"""
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponseBadRequest
+from django.shortcuts import aget_object_or_404, redirect, render
+
+from .db_router import use_replica
+from .models import Assignment, Task
+from .services.comparators import bound_output
+from .services.leaderboard import abuild_leaderboard
+from .services.test_case_delivery import (
+    TestCaseDeliveryError, aencoded_test_cases, test_cases_response, test_cases_url,
+)
+from .services.rate_limit import SubmissionThrottle
+from .services.submission_intake import (
+    SubmissionIntakeError, batch_response, overloaded_response, parse_batch, store_submission,
+    submit_batch as store_batch, submit_gate, throttled_response,
+)
+from .services.test_ordering import record_browser_runs
+
+
+def async_login_required(view_func):
+    """``login_required`` for coroutine views (Django 5.0's decorator is sync-only)."""
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        # Templates read request.user; resolve it here so rendering never touches the database.
+        request.user = user
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
+
+
+@use_replica
+@async_login_required
+async def leaderboard(request, assignment_id):
+    assignment = await aget_object_or_404(Assignment, id=assignment_id)
+    tasks = [task async for task in assignment.tasks.all()]
+    sorted_students = await abuild_leaderboard(assignment, tasks)
+
+    context = {
+        'assignment': assignment,
+        'tasks': tasks,
+        'students': sorted_students,
+    }
+
+    if request.headers.get('HX-Request'):
+        return render(request, 'core/partials/leaderboard_table.html', context)
+    return render(request, 'core/leaderboard.html', context)
+
+
+@use_replica
+@async_login_required
+async def assignment_detail(request, assignment_id):
+    assignment = await aget_object_or_404(Assignment, id=assignment_id)
+    if not assignment.is_live():
+        messages.error(request, "This assignment is not currently available.")
+        return redirect('dashboard')
+    tasks = [task async for task in assignment.tasks.all()]
+
+    # The runner fetches each task's test cases when it is first run.
+    test_case_urls = {task.id: test_cases_url(task) for task in tasks if task.task_type == 'CODING'}
+
+    return render(request, 'core/assignment_detail.html', {
+        'assignment': assignment,
+        'tasks': tasks,
+        'test_case_urls_json': json.dumps(test_case_urls, cls=DjangoJSONEncoder)
+    })
+
+
+@use_replica
+@async_login_required
+async def task_test_cases(request, task_id):
+    task = await aget_object_or_404(Task.objects.select_related('assignment'), id=task_id, task_type='CODING')
+    if not task.assignment.is_live():
+        raise Http404("This assignment is not currently available.")
+    try:
+        encoded = await aencoded_test_cases(task, request.GET.get('format', 'full'))
+    except TestCaseDeliveryError as e:
+        return HttpResponseBadRequest(str(e))
+    return test_cases_response(request, task, encoded)
+
+
+@async_login_required
+async def submit_task(request, task_id):
+    task = await aget_object_or_404(Task.objects.select_related('assignment'), id=task_id)
+    if request.method == 'POST':
+        retry_after, window = await submit_gate.aadmit()
+        if retry_after is not None:
+            return overloaded_response(retry_after)
+        try:
+            return await _submit_task(request, task)
+        finally:
+            await submit_gate.arelease(window)
+    return redirect('assignment_detail', assignment_id=task.assignment.id)
+
+
+async def _submit_task(request, task):
+    wait = await sync_to_async(SubmissionThrottle(task.assignment).check)(request.user.id, task.id)
+    if wait is not None:
+        if request.headers.get('HX-Request'):
+            return throttled_response(wait)
+        messages.error(request, f"Too many submissions. Try again in {wait} seconds.")
+        return redirect('assignment_detail', assignment_id=task.assignment.id)
+
+    auto_result = request.POST.get('auto_result', 'PENDING')
+    submission, created = await sync_to_async(store_submission)(
+        request.user, task, request.POST.get('content'), auto_result,
+        bound_output(request.POST.get('auto_output', '')),
+    )
+    if created and auto_result != 'PENDING' and not settings.SERVER_JUDGE:
+        await sync_to_async(record_browser_runs)(task, request.POST.get('test_runs'), auto_result)
+
+    if request.headers.get('HX-Request'):
+        return render(request, 'core/partials/submission_result.html', {'submission': submission})
+
+    return redirect('assignment_detail', assignment_id=task.assignment.id)
+
+
+@async_login_required
+async def submit_batch(request):
+    if request.method != 'POST':
+        return HttpResponseBadRequest("POST a JSON batch of submissions")
+    retry_after, window = await submit_gate.aadmit()
+    if retry_after is not None:
+        return overloaded_response(retry_after)
+    try:
+        try:
+            items = parse_batch(request.body)
+        except SubmissionIntakeError as e:
+            return HttpResponseBadRequest(str(e))
+        results = await sync_to_async(store_batch)(request.user, items)
+        return batch_response(request, results)
+    finally:
+        await submit_gate.arelease(window)
@@ -0,0 +1,53 @@
+"""
+Version counters used to build cache keys.
+
+Cached values embed the current version of the object they were computed
+from; bumping the version makes every older entry unreachable, so no cache
+key ever has to be deleted explicitly.
+
+These counters live in the cache, so with a per-process cache every process
+has its own. That only costs extra recomputation, except where a version is
+handed out to clients: test case URLs are cached by browsers for good, so
+their version is stored on the task instead (``bump_test_cases_version``).
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+
+def _key(scope, pk):
+    return f"version:{scope}:{pk}"
+
+
+def get_version(scope, pk):
+    """Return the current version for ``scope``/``pk``, creating it if missing."""
+    key = _key(scope, pk)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(scope, pk):
+    """Invalidate everything cached under ``scope``/``pk``."""
+    try:
+        cache.incr(_key(scope, pk))
+    except ValueError:
+        cache.add(_key(scope, pk), time.time_ns(), timeout=None)
+
+
+def bump_test_cases_version(task_id):
+    """
+    Give a task's test cases a new version, stored in ``Task.test_cases_version``.
+
+    The new version is at least the current time in microseconds, so a save of
+    a task instance holding an older version can never bring a used one back.
+    """
+    from core.models import Task
+    Task.objects.filter(id=task_id).update(
+        test_cases_version=Greatest(F('test_cases_version') + 1, time.time_ns() // 1000),
+    )
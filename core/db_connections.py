@@ -0,0 +1,192 @@
+"""
+Database connection management outside the request cycle.
+
+Within a request Django reuses each thread's connection for
+``DB_CONN_MAX_AGE`` seconds and, with ``DB_CONN_HEALTH_CHECKS``, pings a
+reused connection before its first query, because the request_started and
+request_finished signals call ``close_old_connections``. Long-running
+workers (``run_judge``, ``run_background_jobs``) and worker threads never
+see those signals: they kept one connection forever, and once the server
+dropped it (MySQL's ``wait_timeout``, a failover) every later query failed.
+
+* ``db_job()`` brackets a unit of work the way a request is bracketed.
+* ``retry_on_disconnect`` runs work again on a fresh connection when the
+  connection was lost, unless a transaction was open.
+* ``DatabaseWorkerPool`` is a fixed set of threads that each keep their
+  connection across jobs, so threaded work needs at most ``size``
+  connections per database and reuses them instead of connecting per job.
+  It is for many short database jobs (``bench_connections`` measures it).
+  ``run_judge`` does not use it: each of its threads runs a claim, judge,
+  store loop for the life of the process, which already keeps one
+  connection per thread, and brackets every job with ``db_job()`` itself.
+  The threads of test generation never touch the database.
+
+Connections are still per process: a new process (every management command
+run) needs its own connection and TLS handshake; sharing connections across
+processes takes a server-side pooler such as ProxySQL or PgBouncer.
+"""
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, close_old_connections, connections
+
+# MySQL errors meaning the connection is gone: server shutdown (1053), server
+# has gone away (2006), lost connection during query (2013) or handshake
+# (2055), disconnected by the server for inactivity (4031).
+MYSQL_DISCONNECT_CODES = {1053, 2006, 2013, 2055, 4031}
+DISCONNECT_MESSAGES = (
+    'server closed the connection', 'terminating connection', 'connection already closed',
+    'ssl connection has been closed', 'connection is closed', 'server has gone away',
+)
+# Seconds before the first retry; doubled for each further one.
+RETRY_DELAY = 0.1
+
+
+class DatabaseConnectionError(Exception):
+    """Custom exception for database connection management errors."""
+    pass
+
+
+def is_disconnect(exc: BaseException) -> bool:
+    """Whether a database error means the connection was lost, as opposed to a failing query."""
+    if not isinstance(exc, (OperationalError, InterfaceError)):
+        return False
+    for error in (exc, exc.__cause__):
+        args = getattr(error, 'args', ())
+        if args and isinstance(args[0], int) and args[0] in MYSQL_DISCONNECT_CODES:
+            return True
+    message = str(exc).lower()
+    return any(text in message for text in DISCONNECT_MESSAGES)
+
+
+def in_transaction() -> bool:
+    return any(conn.in_atomic_block for conn in connections.all(initialized_only=True))
+
+
+@contextmanager
+def db_job():
+    """
+    Bracket a unit of work like Django brackets a request: connections past
+    ``DB_CONN_MAX_AGE`` or left broken are closed before and after it, and a
+    reused one is health-checked before its first query.
+    """
+    close_old_connections()
+    try:
+        yield
+    finally:
+        close_old_connections()
+
+
+def retry_on_disconnect(func: Optional[Callable] = None, *, attempts: Optional[int] = None):
+    """
+    Decorator running ``func`` again, on a new connection, when the database
+    connection is lost while it runs (up to ``DB_RETRY_ATTEMPTS`` times, with
+    exponential backoff).
+
+    Only use it for work that is safe to repeat. Nothing is retried inside an
+    open transaction, whose earlier statements died with the connection.
+
+    Usage:
+        @retry_on_disconnect
+        def claim(...): ...
+
+        job = retry_on_disconnect(queue.claim)(worker)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            retries = settings.DB_RETRY_ATTEMPTS if attempts is None else attempts
+            for attempt in range(retries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except (OperationalError, InterfaceError) as e:
+                    if attempt == retries or in_transaction() or not is_disconnect(e):
+                        raise
+                # Drops the broken connection; the next query opens a new one.
+                close_old_connections()
+                time.sleep(RETRY_DELAY * 2 ** attempt)
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+class DatabaseWorkerPool:
+    """
+    A fixed set of threads running submitted callables, each one inside
+    ``db_job()``. Every thread keeps its connections across jobs (subject to
+    ``DB_CONN_MAX_AGE`` and health checks) and closes them when the pool shuts
+    down, so the pool never holds more than ``size`` connections per database.
+    """
+
+    def __init__(self, size: Optional[int] = None, name: str = 'db-worker'):
+        """
+        Initialize the pool and start its threads.
+
+        Args:
+            size: Number of threads; defaults to DB_POOL_SIZE
+
+        Raises:
+            DatabaseConnectionError: If size is not positive
+        """
+        self.size = settings.DB_POOL_SIZE if size is None else size
+        if self.size < 1:
+            raise DatabaseConnectionError("A worker pool needs at least one thread")
+        self._jobs = queue.Queue()
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True) for i in range(self.size)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run ``fn(*args, **kwargs)`` on a pool thread; returns its future."""
+        if self._shutdown:
+            raise DatabaseConnectionError("The pool has been shut down")
+        future = Future()
+        self._jobs.put((future, fn, args, kwargs))
+        return future
+
+    def map(self, fn: Callable, items: Iterable) -> List:
+        """Run ``fn`` for every item and return the results in order, raising the first error."""
+        return [future.result() for future in [self.submit(fn, item) for item in items]]
+
+    def _work(self) -> None:
+        try:
+            while True:
+                item = self._jobs.get()
+                if item is None:
+                    return
+                future, fn, args, kwargs = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db_job():
+                        result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            connections.close_all()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Let the threads finish the queued jobs, then close their connections and stop."""
+        self._shutdown = True
+        for _ in self._threads:
+            self._jobs.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
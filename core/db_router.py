@@ -0,0 +1,232 @@
+"""
+Read-replica routing.
+
+Replicas are configured with ``REPLICA_DATABASE_URLS`` (see settings). Reads
+of ``core`` models go to a replica only inside views decorated with
+``@use_replica`` or code wrapped in ``with replica_reads():``; all writes and
+every other read use the primary.
+
+A request that writes (or any unsafe request) sets a short-lived cookie that
+pins the user to the primary for ``REPLICA_PIN_SECONDS``, so a student always
+sees their own submission. Replicas whose lag exceeds
+``REPLICA_MAX_LAG_SECONDS`` (measured with heartbeat rows, see
+``replica_lag``), or that cannot be reached, are skipped until the next lag
+check. Every process that routes reads writes heartbeats from a background
+thread every ``REPLICA_HEARTBEAT_SECONDS``.
+"""
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class _RoutingState:
+    def __init__(self, use_replica: bool = False, pinned: bool = False):
+        self.use_replica = use_replica
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('replica_routing_state', default=None)
+
+
+def replica_aliases() -> List[str]:
+    return [alias for alias in settings.DATABASES if alias != 'default']
+
+
+# Heartbeats older than this are pruned; a replica further behind reads as infinitely late.
+HEARTBEAT_RETENTION = timedelta(hours=1)
+
+
+def write_heartbeat() -> None:
+    """Add a heartbeat on the primary unless another process wrote one in the last ``REPLICA_HEARTBEAT_SECONDS``."""
+    from core.models import ReplicationHeartbeat
+    now = timezone.now()
+    beats = ReplicationHeartbeat.objects.using('default')
+    if beats.filter(beat_at__gt=now - timedelta(seconds=settings.REPLICA_HEARTBEAT_SECONDS)).exists():
+        return
+    beat = beats.create(beat_at=now)
+    if beat.id % 100 == 0:
+        beats.filter(beat_at__lt=now - HEARTBEAT_RETENTION).delete()
+
+
+class _HeartbeatWriter:
+    """Daemon thread writing a heartbeat every ``REPLICA_HEARTBEAT_SECONDS``, started once per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='replica-heartbeat', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                write_heartbeat()
+            except DatabaseError:
+                pass  # the primary is unreachable; the next beat tries again
+            finally:
+                close_old_connections()
+            time.sleep(settings.REPLICA_HEARTBEAT_SECONDS)
+
+
+heartbeats = _HeartbeatWriter()
+
+
+def replica_lag(alias: str) -> Optional[float]:
+    """
+    Seconds ``alias`` is behind the primary.
+
+    A replica has every write made before the newest heartbeat it has, and
+    may lack any made since, so its lag is that heartbeat's age. Heartbeats
+    are written every ``REPLICA_HEARTBEAT_SECONDS`` (see ``heartbeats``), so
+    an up-to-date replica reads at most that far behind. Unlike comparing the
+    newest data row, this keeps measuring while nothing else is written.
+
+    Returns:
+        The lag in seconds, or None if the replica cannot be queried
+    """
+    from core.models import ReplicationHeartbeat
+    try:
+        newest = ReplicationHeartbeat.objects.using(alias).order_by('-beat_at').values_list('beat_at', flat=True).first()
+    except DatabaseError:
+        return None
+    if newest is None:
+        return float('inf')
+    return max(0.0, (timezone.now() - newest).total_seconds())
+
+
+def stream_with_replica_reads(iterable: Iterable) -> Iterator:
+    """
+    Wrap the iterable of a ``StreamingHttpResponse`` so it is consumed with
+    the routing of the view that created it.
+
+    ``ReplicaRoutingMiddleware`` resets the routing state once the view
+    returns, before the response body is iterated; without this, queries made
+    while streaming would always read from the primary.
+    """
+    state = _state.get()
+    use_replica = state is not None and state.use_replica and not state.pinned
+
+    def stream():
+        token = _state.set(_RoutingState(use_replica=use_replica))
+        try:
+            yield from iterable
+        finally:
+            _state.reset(token)
+
+    return stream()
+
+
+class _ReplicaHealth:
+    """Per-process cache of replica lag, refreshed every ``REPLICA_LAG_CHECK_SECONDS``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked: Dict[str, Tuple[float, Optional[float]]] = {}
+
+    def usable(self, alias: str) -> bool:
+        heartbeats.start()
+        now = time.monotonic()
+        with self._lock:
+            checked_at, lag = self._checked.get(alias, (None, None))
+            stale = checked_at is None or now - checked_at >= settings.REPLICA_LAG_CHECK_SECONDS
+            if stale:
+                # Claim the check so concurrent requests keep using the last result meanwhile.
+                self._checked[alias] = (now, lag)
+        if stale:
+            lag = replica_lag(alias)
+            with self._lock:
+                self._checked[alias] = (now, lag)
+        return lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+    def reset(self) -> None:
+        with self._lock:
+            self._checked.clear()
+
+
+health = _ReplicaHealth()
+
+
+class ReplicaRouter:
+    """Sends reads of core models to a healthy replica when the current request allows it."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.pinned or model._meta.app_label != 'core':
+            return None
+        candidates = [alias for alias in replica_aliases() if health.usable(alias)]
+        return random.choice(candidates) if candidates else 'default'
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication.
+        return db == 'default'
+
+
+@contextmanager
+def replica_reads():
+    """Let code outside a request (e.g. management commands) read from replicas."""
+    token = _state.set(_RoutingState(use_replica=True))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def use_replica(view_func):
+    """Mark a read-only view (sync or async) whose queries may be served by a replica."""
+    view_func.use_replica = True
+    return view_func
+
+
+class ReplicaRoutingMiddleware:
+    """Tracks per-request routing state and pins users to the primary after a write."""
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = _RoutingState(pinned=PIN_COOKIE in request.COOKIES or request.method not in SAFE_METHODS)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        if state is not None and getattr(view_func, 'use_replica', False):
+            state.use_replica = True
+        return None
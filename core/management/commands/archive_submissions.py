@@ -0,0 +1,78 @@
+"""
+Django management command to archive submissions of ended assignments.
+
+Keeps each student's best and last attempt per task in the Submission table
+and moves every other attempt to the compressed archive table.
+
+Usage:
+    python manage.py archive_submissions --days 90 [--assignment <id>] [--dump-dir <dir> --format jsonl|parquet] [--dry-run]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.services.submission_archiver import SubmissionArchiver, SubmissionArchiveError
+
+
+class Command(BaseCommand):
+    help = 'Archive old attempts of assignments that ended more than N days ago'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Archive assignments whose end_time is older than this many days (default: 90)'
+        )
+        parser.add_argument(
+            '--assignment',
+            type=int,
+            help='Only archive this assignment ID'
+        )
+        parser.add_argument(
+            '--dump-dir',
+            type=str,
+            help='Also write the archived rows to a compressed file in this directory'
+        )
+        parser.add_argument(
+            '--format',
+            type=str,
+            default='jsonl',
+            choices=SubmissionArchiver.DUMP_FORMATS,
+            help='Dump file format (default: jsonl)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows moved per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many submissions would be archived'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            archiver = SubmissionArchiver(
+                older_than_days=options['days'],
+                dump_dir=options.get('dump_dir'),
+                dump_format=options['format'],
+                batch_size=options['batch_size'],
+            )
+        except SubmissionArchiveError as e:
+            raise CommandError(str(e))
+
+        assignments = archiver.eligible_assignments()
+        if options.get('assignment'):
+            assignments = assignments.filter(id=options['assignment'])
+
+        dry_run = options['dry_run']
+        total = 0
+        for assignment in assignments:
+            count = archiver.archive_assignment(assignment, dry_run=dry_run)
+            total += count
+            verb = 'Would archive' if dry_run else 'Archived'
+            self.stdout.write(f"{verb} {count} submissions of '{assignment.title}' (ID: {assignment.id})")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{'Would archive' if dry_run else 'Archived'} {total} submissions in total")
+        )
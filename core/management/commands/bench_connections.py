@@ -0,0 +1,149 @@
+"""
+Django management command measuring database connection overhead per web
+request and per background job under different connection policies.
+
+Each policy runs ``--requests`` emulated requests (the request_started and
+request_finished signals around one ``SELECT 1``, which is how Django
+manages connections for a real request) and ``--jobs`` jobs on a
+``DatabaseWorkerPool`` of ``--threads`` threads:
+
+* fresh: ``CONN_MAX_AGE=0``, a new connection every time.
+* persistent: connections reused, no health checks.
+* persistent+health: connections reused, pinged before their first query.
+
+The report shows latency per request, time per job and the number of
+connections opened. Connecting to a local SQLite file costs next to nothing,
+so ``--connect-latency-ms`` adds a delay to every new connection to stand in
+for a remote MySQL TLS handshake (20-50 ms is typical across a network).
+
+Usage:
+    python manage.py bench_connections [--requests 200] [--jobs 200] [--threads 4] [--connect-latency-ms 0] [--database default] [--output results.json]
+"""
+import json
+import statistics
+import threading
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from core.db_connections import DatabaseWorkerPool
+from core.services.loadtest import percentile
+
+POLICIES = [
+    ('fresh', 0, False),
+    ('persistent', 600, False),
+    ('persistent+health', 600, True),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark database connection overhead per request and per job for each connection policy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Emulated requests per policy (default: 200)')
+        parser.add_argument('--jobs', type=int, default=200, help='Pool jobs per policy (default: 200)')
+        parser.add_argument('--threads', type=int, default=4, help='Worker pool threads (default: 4)')
+        parser.add_argument('--connect-latency-ms', type=float, default=0,
+                            help='Delay added to every new connection (default: 0)')
+        parser.add_argument('--database', type=str, default='default', help='Database alias (default: default)')
+        parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if alias not in connections:
+            raise CommandError(f"Unknown database '{alias}'")
+        if min(options['requests'], options['jobs'], options['threads']) < 1:
+            raise CommandError("--requests, --jobs and --threads must be at least 1")
+
+        settings_dict = connections[alias].settings_dict  # shared by the connections of every thread
+        saved = {key: settings_dict.get(key) for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        self._alias = alias
+        self._latency = options['connect_latency_ms'] / 1000
+        self._opened = 0
+        self._lock = threading.Lock()
+        connection_created.connect(self._on_connect)
+        report = {'meta': {'vendor': connections[alias].vendor, **{k: options[k] for k in (
+            'requests', 'jobs', 'threads', 'connect_latency_ms')}}, 'policies': {}}
+        try:
+            for name, max_age, health_checks in POLICIES:
+                settings_dict['CONN_MAX_AGE'] = max_age
+                settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+                connections[alias].close()
+                report['policies'][name] = {
+                    'requests': self.bench_requests(options['requests']),
+                    'jobs': self.bench_jobs(options['jobs'], options['threads']),
+                }
+        finally:
+            connection_created.disconnect(self._on_connect)
+            settings_dict.update(saved)
+            connections[alias].close()
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def _on_connect(self, sender, connection, **kwargs):
+        if connection.alias != self._alias:
+            return
+        if self._latency:
+            time.sleep(self._latency)
+        with self._lock:
+            self._opened += 1
+
+    def _query(self, *args):
+        with connections[self._alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+
+    def _opened_since(self, start: int) -> int:
+        with self._lock:
+            return self._opened - start
+
+    def bench_requests(self, count: int) -> dict:
+        opened = self._opened
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            request_started.send(sender=WSGIHandler, environ={})
+            self._query()
+            request_finished.send(sender=WSGIHandler)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return {
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'mean_ms': round(statistics.mean(latencies), 3),
+            'connections': self._opened_since(opened),
+        }
+
+    def bench_jobs(self, count: int, threads: int) -> dict:
+        opened = self._opened
+        started = time.perf_counter()
+        with DatabaseWorkerPool(size=threads) as pool:
+            pool.map(self._query, range(count))
+        elapsed = time.perf_counter() - started
+        return {
+            'jobs_per_second': round(count / elapsed, 1),
+            'ms_per_job': round(elapsed * threads / count * 1000, 3),  # thread time per job
+            'connections': self._opened_since(opened),
+        }
+
+    def print_report(self, report: dict) -> None:
+        meta = report['meta']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Connection overhead on {meta['vendor']} (connect latency {meta['connect_latency_ms']:g} ms)"
+        ))
+        self.stdout.write(
+            f"{'policy':<20}{'req p50 ms':>11}{'req p95 ms':>11}{'req conns':>10}"
+            f"{'ms/job':>9}{'jobs/s':>9}{'job conns':>10}"
+        )
+        for name, result in report['policies'].items():
+            requests, jobs = result['requests'], result['jobs']
+            self.stdout.write(
+                f"{name:<20}{requests['p50_ms']:>11}{requests['p95_ms']:>11}{requests['connections']:>10}"
+                f"{jobs['ms_per_job']:>9}{jobs['jobs_per_second']:>9}{jobs['connections']:>10}"
+            )
@@ -0,0 +1,88 @@
+"""
+Django management command to run the micro-benchmark suite.
+
+Times assignment import, leaderboard aggregation and rendering, the
+per-task test case payloads and submission inserts at several data sizes,
+in a throwaway test database.
+
+Usage:
+    python manage.py benchmark [--sizes 100,1000,10000] [--repeat 5] [--only leaderboard_aggregation] [--output results.json] [--save]
+"""
+import json
+import os
+import subprocess
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.services.benchmarks import BenchmarkError, BenchmarkRunner, BENCHMARKS
+
+BASELINE_PATH = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+def _int_list(value):
+    try:
+        return [int(v) for v in value.split(',') if v.strip()]
+    except ValueError:
+        raise CommandError(f"Invalid size list: {value}")
+
+
+def run_suite(sizes, repeat, only=None, progress=None):
+    """Run the suite in a test database and return the results document."""
+    try:
+        runner = BenchmarkRunner(sizes=sizes, repeat=repeat, only=only)
+    except BenchmarkError as e:
+        raise CommandError(str(e))
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        document = runner.run(progress=progress)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    try:
+        revision = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=settings.BASE_DIR, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = ''
+    document['meta'].update({
+        'revision': revision,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    })
+    return document
+
+
+class Command(BaseCommand):
+    help = 'Run micro-benchmarks of core hot paths at several data sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=_int_list, default=None,
+                            help='Comma-separated data sizes (default: 100,1000,10000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark (default: 5)')
+        parser.add_argument('--only', type=str, default='',
+                            help=f"Comma-separated benchmarks to run ({', '.join(BENCHMARKS)})")
+        parser.add_argument('--output', type=str, help='Write the JSON results to this file')
+        parser.add_argument('--save', action='store_true', help=f'Store the results as the baseline ({BASELINE_PATH})')
+
+    def handle(self, *args, **options):
+        only = [name.strip() for name in options['only'].split(',') if name.strip()] or None
+
+        def progress(key, result):
+            self.stdout.write(
+                f"{key:<36} min {result['min_ms']:>10.3f} ms   median {result['median_ms']:>10.3f} ms"
+            )
+
+        document = run_suite(options['sizes'], options['repeat'], only, progress)
+
+        targets = [options['output']] if options.get('output') else []
+        if options['save']:
+            targets.append(BASELINE_PATH)
+        for path in targets:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=2, sort_keys=True)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Results written to {path}"))
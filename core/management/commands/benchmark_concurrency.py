@@ -0,0 +1,134 @@
+"""
+Django management command comparing how many concurrent students the sync
+(WSGI) and async (ASGI) serving modes can handle on one box.
+
+Seeds a throwaway test database once, adds a fixed delay to every query to
+emulate a remote database, then replays the student side of the exam-rush
+traffic mix (already logged in) at increasing numbers of concurrent clients:
+
+* wsgi: sync views behind ``--workers`` sync gunicorn workers; requests beyond
+  that wait in the accept queue.
+* asgi: async views (``ASYNC_VIEWS``) on one event loop, as in a single
+  uvicorn worker.
+
+A level counts as served when its p95 latency stays under ``--slo-ms`` with no
+errors; the report shows the highest served level for each mode.
+
+Usage:
+    python manage.py benchmark_concurrency [--levels 25,50,100,200] [--workers 5] [--db-latency-ms 20] [--slo-ms 1000] [--output results.json]
+"""
+import importlib
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import clear_url_caches
+from core.management.commands.loadtest import create_loadtest_db
+from core.services.loadtest import (
+    AsyncTrafficReplayer, DatabaseLatency, LoadTestSeeder, STUDENT_MIX, TrafficReplayer,
+)
+
+
+def _use_async_views(enabled):
+    """Re-import the URLconf so it routes to the sync or async student views."""
+    settings.ASYNC_VIEWS = enabled
+    import core.urls
+    import config.urls
+    importlib.reload(core.urls)
+    importlib.reload(config.urls)
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent-student capacity of sync workers and async views under database latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=300, help='Number of students (default: 300)')
+        parser.add_argument('--levels', type=str, default='25,50,100,200',
+                            help='Comma-separated concurrent client counts (default: 25,50,100,200)')
+        parser.add_argument('--requests', type=int, default=10, help='Requests per client after login (default: 10)')
+        parser.add_argument('--workers', type=int, default=(os.cpu_count() or 1) * 2 + 1,
+                            help='Sync gunicorn workers to emulate (default: 2 x CPUs + 1)')
+        parser.add_argument('--db-latency-ms', type=float, default=20.0,
+                            help='Delay added to every query (default: 20)')
+        parser.add_argument('--slo-ms', type=float, default=1000.0,
+                            help='p95 latency a level must stay under to count as served (default: 1000)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+        parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        try:
+            levels = sorted(int(level) for level in options['levels'].split(',') if level.strip())
+        except ValueError:
+            raise CommandError(f"Invalid levels: {options['levels']}")
+        if not levels:
+            raise CommandError('At least one concurrency level is required')
+
+        if '*' not in settings.ALLOWED_HOSTS and 'testserver' not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = list(settings.ALLOWED_HOSTS) + ['testserver']
+
+        old_name = create_loadtest_db()
+        latency = DatabaseLatency(options['db_latency_ms'] / 1000.0)
+        async_views = settings.ASYNC_VIEWS
+        try:
+            self.stdout.write(f"Seeding {options['students']} students...")
+            dataset = LoadTestSeeder(students=options['students'], seed=options['seed']).seed()
+            connection.close()
+            latency.install()
+
+            results = {'wsgi': [], 'asgi': []}
+            for level in levels:
+                for mode, replayer_class, workers in (
+                    ('wsgi', TrafficReplayer, options['workers']),
+                    ('asgi', AsyncTrafficReplayer, None),
+                ):
+                    _use_async_views(mode == 'asgi')
+                    replayer = replayer_class(
+                        dataset, clients=level, requests_per_client=options['requests'],
+                        mix=STUDENT_MIX, seed=options['seed'], workers=workers, login=False,
+                    )
+                    summary = replayer.run()['summary']
+                    summary['clients'] = level
+                    results[mode].append(summary)
+                    self.stdout.write(
+                        f"{mode} {level:>5} clients: p95 {summary['p95_ms']:>9} ms, "
+                        f"{summary['throughput_rps']:>8} req/s, {summary['errors']} errors"
+                    )
+        finally:
+            latency.uninstall()
+            _use_async_views(async_views)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'parameters': {
+                key: options[key] for key in
+                ('students', 'requests', 'workers', 'db_latency_ms', 'slo_ms', 'seed')
+            },
+            'levels': levels,
+            'results': results,
+            'capacity': {
+                mode: max(
+                    (r['clients'] for r in runs if r['p95_ms'] <= options['slo_ms'] and not r['errors']),
+                    default=0,
+                )
+                for mode, runs in results.items()
+            },
+        }
+        self._print(report)
+        if options.get('output'):
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def _print(self, report):
+        capacity = report['capacity']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Concurrent students served with p95 <= {report['parameters']['slo_ms']:g} ms "
+            f"({report['parameters']['db_latency_ms']:g} ms per query):"
+        ))
+        self.stdout.write(f"  wsgi ({report['parameters']['workers']} sync workers): {capacity['wsgi']}")
+        self.stdout.write(f"  asgi (1 async worker): {capacity['asgi']}")
+        if capacity['wsgi'] and capacity['asgi']:
+            self.stdout.write(f"  ratio: {capacity['asgi'] / capacity['wsgi']:.1f}x")
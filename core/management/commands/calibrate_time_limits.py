@@ -0,0 +1,59 @@
+"""
+Django management command to derive adaptive time limits from reference solutions.
+
+Times each task's reference solution on every test case and reports the
+resulting adaptive limit, together with how many accepted runs recorded by
+the server judge would have exceeded it. --apply stores the reference
+runtime and enables the adaptive limit.
+
+Usage:
+    python manage.py calibrate_time_limits (--task <id> | --assignment <id>) [--repeat 3] [--apply]
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Task
+from core.services.judge import JudgeError
+from core.services.runtime_stats import measure_reference, runs_over_limit
+
+
+class Command(BaseCommand):
+    help = 'Time reference solutions and derive adaptive per-task time limits'
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--task', type=int, help='ID of the task to calibrate')
+        target.add_argument('--assignment', type=int, help='Calibrate every auto-validated coding task of this assignment')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs of the reference solution (default: 3)')
+        parser.add_argument('--apply', action='store_true', help='Store the measurement and enable the adaptive limit')
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.filter(task_type='CODING', validation_type='AUTO')
+        if options.get('task'):
+            tasks = tasks.filter(id=options['task'])
+        else:
+            tasks = tasks.filter(assignment_id=options['assignment'])
+        if not tasks.exists():
+            raise CommandError("No matching auto-validated coding tasks found")
+
+        for task in tasks:
+            try:
+                reference_ms = measure_reference(task, repeat=options['repeat'])
+            except JudgeError as e:
+                self.stdout.write(self.style.WARNING(f"{task.title} (ID: {task.id}): skipped, {e}"))
+                continue
+
+            limit = max(settings.JUDGE_ADAPTIVE_MIN_SECONDS, reference_ms * settings.JUDGE_ADAPTIVE_MULTIPLIER / 1000)
+            over = runs_over_limit(task, limit)
+            line = (
+                f"{task.title} (ID: {task.id}): reference {reference_ms:.1f} ms -> adaptive limit {limit:.2f}s "
+                f"(current {task.effective_time_limit():.2f}s); {over} accepted runs would exceed it"
+            )
+            self.stdout.write(self.style.WARNING(line) if over else line)
+
+            if options['apply']:
+                task.reference_runtime_ms = reference_ms
+                task.adaptive_time_limit = True
+                task.save(update_fields=['reference_runtime_ms', 'adaptive_time_limit'])
+
+        if options['apply']:
+            self.stdout.write(self.style.SUCCESS("Adaptive time limits updated"))
@@ -0,0 +1,69 @@
+"""
+Django management command to compare benchmark results against the baseline.
+
+Without a results file the suite is run first, using the sizes and repeat
+count recorded in the baseline. Exits with an error if any benchmark's
+fastest run got slower than the threshold and than the run-to-run noise
+(see ``compare_results``).
+
+Usage:
+    python manage.py compare_benchmarks [results.json] [--baseline benchmarks/baseline.json] [--threshold 10]
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from core.management.commands.benchmark import BASELINE_PATH, run_suite
+from core.services.benchmarks import compare_results
+
+
+class Command(BaseCommand):
+    help = 'Compare micro-benchmark results against the stored baseline and flag regressions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('results', nargs='?', type=str, help='Results file from "benchmark --output" (default: run now)')
+        parser.add_argument('--baseline', type=str, default=BASELINE_PATH, help='Baseline results file')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Slowdown in percent counted as a regression (default: 10)')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                            help='Ignore slowdowns smaller than this many milliseconds (default: 1)')
+
+    def _load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise CommandError(f"File not found: {path}")
+        except json.JSONDecodeError as e:
+            raise CommandError(f"Invalid JSON in {path}: {e}")
+
+    def handle(self, *args, **options):
+        baseline = self._load(options['baseline'])
+        if options.get('results'):
+            current = self._load(options['results'])
+        else:
+            meta = baseline.get('meta', {})
+            current = run_suite(meta.get('sizes'), meta.get('repeat', 5))
+
+        rows = compare_results(baseline, current, options['threshold'], options['min_delta_ms'])
+        if not rows:
+            raise CommandError('No benchmarks in common between baseline and results')
+
+        for row in rows:
+            line = (
+                f"{row['benchmark']:<36} {row['baseline_ms']:>10.3f} -> {row['current_ms']:>10.3f} ms"
+                f"   {row['change_pct']:>+7.1f}%   noise {row['noise_ms']:.3f} ms"
+            )
+            if row['regression']:
+                self.stdout.write(self.style.ERROR(line + '   REGRESSION'))
+            elif row['change_pct'] < -options['threshold']:
+                self.stdout.write(self.style.SUCCESS(line))
+            else:
+                self.stdout.write(line)
+
+        regressions = [row['benchmark'] for row in rows if row['regression']]
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} benchmark(s) regressed by more than {options['threshold']}% and their noise: "
+                f"{', '.join(regressions)}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"No regressions across {len(rows)} benchmarks"))
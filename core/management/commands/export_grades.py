@@ -0,0 +1,75 @@
+"""
+Django management command to export per-student x per-task grades.
+
+Usage:
+    python manage.py export_grades <assignment_id> [--format csv|parquet] [--output <path>]
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from core.db_router import replica_reads
+from core.models import Assignment
+from core.services.grade_export import GradeExporter, GradeExportError
+
+
+class Command(BaseCommand):
+    help = 'Export the grades of an assignment as CSV or Parquet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'assignment_id',
+            type=int,
+            help='ID of the assignment to export'
+        )
+        parser.add_argument(
+            '--format',
+            type=str,
+            default='csv',
+            choices=GradeExporter.FORMATS,
+            help='Output format (default: csv)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Output file path (default: stdout for CSV, required for Parquet)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per database round trip (default: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        # Exports are read-only; let them run on a replica when one is configured.
+        with replica_reads():
+            self._export(options)
+
+    def _export(self, options):
+        try:
+            assignment = Assignment.objects.get(id=options['assignment_id'])
+        except Assignment.DoesNotExist:
+            raise CommandError(f"Assignment {options['assignment_id']} does not exist")
+
+        exporter = GradeExporter(assignment, chunk_size=options['chunk_size'])
+        output = options.get('output')
+
+        if options['format'] == 'parquet':
+            if not output:
+                raise CommandError("--output is required for Parquet exports")
+            try:
+                count = exporter.write_parquet(output)
+            except GradeExportError as e:
+                raise CommandError(str(e))
+            self.stderr.write(self.style.SUCCESS(f"Exported {count} rows to {output}"))
+            return
+
+        stream = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+        try:
+            for line in exporter.iter_csv():
+                stream.write(line)
+        finally:
+            if output:
+                stream.close()
+        if output:
+            self.stderr.write(self.style.SUCCESS(f"Exported grades to {output}"))
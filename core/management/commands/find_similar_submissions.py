@@ -0,0 +1,67 @@
+"""
+Django management command to screen coding submissions for near-duplicates.
+
+Usage:
+    python manage.py find_similar_submissions (--task <id> | --assignment <id>) [--threshold 0.8] [--backfill]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.models import Task
+from core.services.similarity import SimilarityFinder
+
+
+class Command(BaseCommand):
+    help = 'List pairs of students with near-duplicate submissions (MinHash/LSH)'
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument(
+            '--task',
+            type=int,
+            help='ID of the task to screen'
+        )
+        target.add_argument(
+            '--assignment',
+            type=int,
+            help='Screen every coding task of this assignment'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.8,
+            help='Minimum estimated similarity between 0 and 1 (default: 0.8)'
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Compute signatures for submissions that do not have one yet'
+        )
+
+    def handle(self, *args, **options):
+        if not 0 < options['threshold'] <= 1:
+            raise CommandError("--threshold must be between 0 and 1")
+
+        tasks = Task.objects.filter(task_type='CODING')
+        if options.get('task'):
+            tasks = tasks.filter(id=options['task'])
+        else:
+            tasks = tasks.filter(assignment_id=options['assignment'])
+        if not tasks.exists():
+            raise CommandError("No matching coding tasks found")
+
+        for task in tasks:
+            finder = SimilarityFinder(task, threshold=options['threshold'])
+            if options['backfill']:
+                created = finder.backfill()
+                self.stdout.write(f"Computed {created} missing signatures for '{task.title}'")
+
+            pairs = finder.find_pairs()
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{task.title} (ID: {task.id}): {len(pairs)} similar pairs"))
+            if finder.skipped_buckets:
+                self.stdout.write(self.style.WARNING(
+                    f"  Skipped {finder.skipped_buckets} LSH buckets shared by too many submissions to compare pairwise"
+                ))
+            for pair in pairs:
+                self.stdout.write(
+                    f"  {pair['similarity']:.2f}  {pair['student_a']} (#{pair['submission_a']})"
+                    f"  <->  {pair['student_b']} (#{pair['submission_b']})"
+                )
@@ -0,0 +1,26 @@
+"""
+Django management command to show judge queue wait times per priority class.
+
+Usage:
+    python manage.py judge_stats [--minutes 60]
+"""
+from django.core.management.base import BaseCommand
+from core.services.judge_queue import JudgeQueue
+
+
+class Command(BaseCommand):
+    help = 'Show queue length and wait-time percentiles of the judge queue per priority class'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=60,
+                            help='Window of started jobs to compute wait percentiles over (default: 60)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'class':<26}{'queued':>8}{'oldest s':>10}{'started':>9}{'p50 s':>8}{'p95 s':>8}{'mean s':>8}"
+        )
+        for row in JudgeQueue.wait_stats(options['minutes']):
+            self.stdout.write(
+                f"{row['label']:<26}{row['queued']:>8}{row['oldest_wait_s']:>10}{row['started']:>9}"
+                f"{row['p50_wait_s']:>8}{row['p95_wait_s']:>8}{row['mean_wait_s']:>8}"
+            )
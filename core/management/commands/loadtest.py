@@ -0,0 +1,167 @@
+"""
+Django management command to simulate an exam rush against the app in-process.
+
+Seeds synthetic teachers, students, assignments and submission histories,
+replays a mix of dashboard, assignment, leaderboard, submit and teacher
+requests with many concurrent clients, and reports latency percentiles,
+throughput and queries per view.
+
+By default everything runs in a throwaway test database; --live-db seeds the
+configured database instead (remove the data again with --cleanup).
+
+Usage:
+    python manage.py loadtest [--students 500] [--clients 50] [--requests 20] [--output results.json] [--compare old.json]
+"""
+import json
+import os
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from core.services.loadtest import LoadTestSeeder, TrafficReplayer
+
+
+def _sqlite_wal(sender, connection, **kwargs):
+    """Let SQLite readers and the single writer proceed concurrently."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
+
+
+def create_loadtest_db():
+    """Create a throwaway test database that many threads can share; returns the old name."""
+    if connection.vendor == 'sqlite':
+        # Threads need a shared file, not a per-connection in-memory database.
+        handle, path = tempfile.mkstemp(suffix='.sqlite3', prefix='loadtest_')
+        os.close(handle)
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = path
+        connection.settings_dict.setdefault('OPTIONS', {}).setdefault('timeout', 30)
+        connection_created.connect(_sqlite_wal)
+    return connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+class Command(BaseCommand):
+    help = 'Seed synthetic data and replay exam-rush traffic, reporting latency and queries per view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teachers', type=int, default=2, help='Number of teachers (default: 2)')
+        parser.add_argument('--students', type=int, default=500, help='Number of students (default: 500)')
+        parser.add_argument('--assignments', type=int, default=2, help='Number of live assignments (default: 2)')
+        parser.add_argument('--tasks', type=int, default=4, help='Tasks per assignment (default: 4)')
+        parser.add_argument('--test-cases', type=int, default=5, help='Test cases per task (default: 5)')
+        parser.add_argument('--history', type=int, default=5, help='Past submissions per student (default: 5)')
+        parser.add_argument('--clients', type=int, default=50, help='Concurrent clients (default: 50)')
+        parser.add_argument('--requests', type=int, default=20, help='Requests per client after login (default: 20)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+        parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+        parser.add_argument('--compare', type=str, help='Print deltas against a previous JSON report')
+        parser.add_argument('--live-db', action='store_true', help='Use the configured database instead of a test database')
+        parser.add_argument('--cleanup', action='store_true', help='Delete data left by a previous --live-db run and exit')
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            deleted = LoadTestSeeder.cleanup()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} load test objects"))
+            return
+
+        if '*' not in settings.ALLOWED_HOSTS and 'testserver' not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = list(settings.ALLOWED_HOSTS) + ['testserver']
+
+        old_name = None
+        if not options['live_db']:
+            old_name = create_loadtest_db()
+
+        try:
+            report = self._run(options)
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self._print(report)
+        if options.get('compare'):
+            self._compare(report, options['compare'])
+        if options.get('output'):
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def _run(self, options):
+        self.stdout.write(
+            f"Seeding {options['students']} students, {options['assignments']} assignments "
+            f"x {options['tasks']} tasks, {options['history']} past submissions each..."
+        )
+        seeder = LoadTestSeeder(
+            teachers=options['teachers'],
+            students=options['students'],
+            assignments=options['assignments'],
+            tasks_per_assignment=options['tasks'],
+            test_cases_per_task=options['test_cases'],
+            history_per_student=options['history'],
+            seed=options['seed'],
+        )
+        dataset = seeder.seed()
+
+        self.stdout.write(f"Replaying traffic with {options['clients']} concurrent clients...")
+        replayer = TrafficReplayer(
+            dataset,
+            clients=options['clients'],
+            requests_per_client=options['requests'],
+            seed=options['seed'],
+        )
+        report = replayer.run()
+        report['meta'] = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'revision': self._revision(),
+            'database': connection.vendor,
+            'parameters': {
+                key: options[key] for key in
+                ('teachers', 'students', 'assignments', 'tasks', 'test_cases', 'history', 'clients', 'requests', 'seed')
+            },
+        }
+        return report
+
+    def _print(self, report):
+        summary = report['summary']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{summary['requests']} requests in {summary['elapsed_s']}s "
+            f"({summary['throughput_rps']} served req/s, {summary['errors']} errors, "
+            f"{summary['rejected']} throttled or shed)"
+        ))
+        self.stdout.write(
+            f"{'view':<20}{'reqs':>7}{'429':>6}{'503':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+        )
+        for view, stats in report['views'].items():
+            self.stdout.write(
+                f"{view:<20}{stats['requests']:>7}{stats['throttled']:>6}{stats['shed']:>6}"
+                f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['queries_per_request']:>9}"
+            )
+
+    def _compare(self, report, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f"Cannot read baseline report: {e}")
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Compared with {path} ({baseline.get('meta', {}).get('revision', '?')})"))
+        for view, stats in report['views'].items():
+            old = baseline.get('views', {}).get(view)
+            if not old or not old['p95_ms']:
+                continue
+            delta = 100.0 * (stats['p95_ms'] - old['p95_ms']) / old['p95_ms']
+            self.stdout.write(
+                f"{view:<20} p95 {old['p95_ms']:>8} -> {stats['p95_ms']:>8} ms ({delta:+.1f}%)"
+                f"  queries {old['queries_per_request']} -> {stats['queries_per_request']}"
+            )
+
+    @staticmethod
+    def _revision():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
@@ -0,0 +1,193 @@
+"""
+Django management command measuring how fast the app starts and how much
+memory its gunicorn workers take.
+
+* Cold start: ``--runs`` fresh interpreters each time ``django.setup()``,
+  the URLconf import and ``core.warmup.warm_up``, and report their RSS.
+* Serving: gunicorn is started with ``gunicorn.conf.py`` twice, with and
+  without ``GUNICORN_PRELOAD``. For each profile the report shows the time
+  until the first response, and the RSS, PSS (pages shared between processes
+  are split among them) and USS (pages only this process has) of the master
+  and of every worker after ``--requests`` requests. Preloading shows up as a
+  much lower USS per worker.
+
+PSS and USS need Linux; elsewhere only RSS is shown.
+
+Usage:
+    python manage.py measure_startup [--runs 5] [--workers 2] [--requests 20] [--path /login/] [--no-serve] [--output results.json]
+"""
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import psutil
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+COLD_START_SCRIPT = """
+import json, os, time
+import psutil
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+from core.warmup import warm_up
+warm_up()
+warmed = time.perf_counter()
+print(json.dumps({
+    'setup_ms': (setup - started) * 1000,
+    'urls_ms': (urls - setup) * 1000,
+    'warm_up_ms': (warmed - urls) * 1000,
+    'rss_mb': psutil.Process().memory_info().rss / 2 ** 20,
+}))
+"""
+MB = 2 ** 20
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _memory(process: psutil.Process) -> dict:
+    try:
+        info = process.memory_full_info()
+    except psutil.AccessDenied:
+        info = process.memory_info()
+    return {
+        field: round(getattr(info, field) / MB, 1)
+        for field in ('rss', 'pss', 'uss') if hasattr(info, field)
+    }
+
+
+class Command(BaseCommand):
+    help = 'Measure cold start time and per-worker memory with and without a preloaded gunicorn master'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Cold starts to time (default: 5)')
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn workers (default: 2)')
+        parser.add_argument('--requests', type=int, default=20,
+                            help='Requests sent before measuring memory (default: 20)')
+        parser.add_argument('--path', type=str, default='/login/', help='Path requested (default: /login/)')
+        parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for gunicorn (default: 60)')
+        parser.add_argument('--no-serve', action='store_true', help='Only time cold starts, do not start gunicorn')
+        parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1 or options['workers'] < 1:
+            raise CommandError("--runs and --workers must be at least 1")
+        report = {'cold_start': self.cold_start(options['runs'])}
+        if not options['no_serve']:
+            report['serving'] = {
+                profile: self.serve(preload, options)
+                for profile, preload in (('preload', True), ('no_preload', False))
+            }
+            self.print_serving(report['serving'])
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def _env(self, **extra) -> dict:
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'))
+        env.update(extra)
+        return env
+
+    def cold_start(self, runs: int) -> dict:
+        self.stdout.write(f"Timing {runs} cold starts...")
+        samples = []
+        for _ in range(runs):
+            result = subprocess.run(
+                [sys.executable, '-c', COLD_START_SCRIPT], cwd=settings.BASE_DIR, env=self._env(),
+                capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(f"Cold start failed:\n{result.stderr}")
+            samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        medians = {key: round(statistics.median(s[key] for s in samples), 1) for key in samples[0]}
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Cold start (median)"))
+        self.stdout.write(
+            f"django.setup {medians['setup_ms']:.0f} ms, URLconf {medians['urls_ms']:.0f} ms, "
+            f"warm-up {medians['warm_up_ms']:.0f} ms, RSS {medians['rss_mb']:.0f} MB"
+        )
+        return medians
+
+    def _get(self, url: str):
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def serve(self, preload: bool, options) -> dict:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}{options['path']}"
+        self.stdout.write(f"Starting gunicorn ({'preload' if preload else 'no preload'}, {options['workers']} workers)...")
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f"127.0.0.1:{port}",
+             '--workers', str(options['workers']), 'config.wsgi:application'],
+            cwd=settings.BASE_DIR, env=self._env(GUNICORN_PRELOAD=str(preload)),
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        try:
+            master = psutil.Process(server.pid)
+            first_response_ms = None
+            deadline = started + options['timeout']
+            while first_response_ms is None:
+                if server.poll() is not None:
+                    raise CommandError(f"gunicorn exited:\n{server.stderr.read()}")
+                if time.perf_counter() > deadline:
+                    raise CommandError("gunicorn did not answer in time")
+                try:
+                    status = self._get(url)
+                    first_response_ms = (time.perf_counter() - started) * 1000
+                except OSError:
+                    time.sleep(0.05)
+            # Every worker has to be up, and to have served something, before it is measured.
+            while len(master.children()) < options['workers'] and time.perf_counter() < deadline:
+                time.sleep(0.05)
+            for _ in range(options['requests']):
+                self._get(url)
+
+            workers = [_memory(worker) for worker in master.children()]
+            return {
+                'first_response_ms': round(first_response_ms),
+                'status': status,
+                'master': _memory(master),
+                'workers': workers,
+                'worker_avg': {
+                    field: round(statistics.mean(w[field] for w in workers), 1) for field in workers[0]
+                } if workers else {},
+            }
+        finally:
+            server.send_signal(signal.SIGTERM)
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    def print_serving(self, serving: dict) -> None:
+        self.stdout.write(self.style.MIGRATE_HEADING("gunicorn (memory in MB, worker figures are averages)"))
+        fields = list(serving['preload']['master'])
+        header = f"{'profile':<12}{'first resp ms':>14}" + ''.join(f"{'master ' + f:>12}" for f in fields)
+        header += ''.join(f"{'worker ' + f:>12}" for f in fields)
+        self.stdout.write(header)
+        for profile, result in serving.items():
+            line = f"{profile:<12}{result['first_response_ms']:>14}"
+            line += ''.join(f"{result['master'].get(f, 0):>12}" for f in fields)
+            line += ''.join(f"{result['worker_avg'].get(f, 0):>12}" for f in fields)
+            self.stdout.write(line)
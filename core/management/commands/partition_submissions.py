@@ -0,0 +1,110 @@
+"""
+Django management command to range-partition the Submission table by
+``submitted_at`` on MySQL.
+
+MySQL requires the partitioning column in every unique key and does not
+allow foreign keys on partitioned InnoDB tables, so the generated SQL drops
+the table's foreign key constraints and widens the primary key to
+(id, submitted_at). Tables with foreign keys pointing at core_submission
+must drop those constraints first. The SQL is only printed unless --apply is given.
+
+Usage:
+    python manage.py partition_submissions [--since 2025-01] [--months-ahead 12] [--apply]
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.models import Submission
+
+
+class Command(BaseCommand):
+    help = 'Generate (and optionally apply) MySQL range partitioning of submissions by submitted_at'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='First monthly partition as YYYY-MM (default: month of the oldest submission)'
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=12,
+            help='Number of future monthly partitions to create (default: 12)'
+        )
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help='Execute the statements instead of printing them'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'mysql':
+            raise CommandError("Range partitioning is only supported on MySQL")
+
+        table = Submission._meta.db_table
+        first = self._first_month(options.get('since'))
+        today = date.today()
+        last = self._add_months(date(today.year, today.month, 1), options['months_ahead'])
+
+        statements = [
+            f"ALTER TABLE `{table}` DROP FOREIGN KEY `{name}`"
+            for name in self._foreign_keys(table)
+        ]
+        statements.append(
+            f"ALTER TABLE `{table}` DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `submitted_at`)"
+        )
+
+        partitions = []
+        month = first
+        while month <= last:
+            upper = self._add_months(month, 1)
+            partitions.append(
+                f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{upper:%Y-%m-%d}')"
+            )
+            month = upper
+        partitions.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+        statements.append(
+            f"ALTER TABLE `{table}` PARTITION BY RANGE COLUMNS(`submitted_at`) (\n    "
+            + ",\n    ".join(partitions)
+            + "\n)"
+        )
+
+        if not options['apply']:
+            for statement in statements:
+                self.stdout.write(statement + ';')
+            return
+
+        with connection.cursor() as cursor:
+            for statement in statements:
+                self.stdout.write(f"Executing: {statement.splitlines()[0]}")
+                cursor.execute(statement)
+        self.stdout.write(self.style.SUCCESS(f"Partitioned {table} into {len(partitions)} partitions"))
+
+    def _first_month(self, since):
+        if since:
+            try:
+                year, month = since.split('-')
+                return date(int(year), int(month), 1)
+            except ValueError:
+                raise CommandError(f"Invalid --since value: {since}. Use YYYY-MM")
+        oldest = Submission.objects.order_by('submitted_at').values_list('submitted_at', flat=True).first()
+        today = date.today()
+        if oldest is None:
+            return date(today.year, today.month, 1)
+        return date(oldest.year, oldest.month, 1)
+
+    def _foreign_keys(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_TYPE = 'FOREIGN KEY'",
+                [table],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _add_months(day, months):
+        month_index = day.month - 1 + months
+        return date(day.year + month_index // 12, month_index % 12 + 1, 1)
@@ -0,0 +1,98 @@
+"""
+Django management command to create user accounts from a CSV roster.
+
+The roster needs a ``username`` column and may have ``email``, ``password``,
+``role`` (STUDENT or TEACHER), ``first_name`` and ``last_name``. Existing
+usernames are skipped, so the command can be re-run with a grown roster.
+Rows without a password get a generated one, written to ``--credentials-out``
+(created with mode 0600, and synced to disk before any account is created).
+
+Usage:
+    python manage.py provision_users <roster.csv> [--default-role STUDENT] [--approve-teachers] [--workers 8] [--credentials-out passwords.csv] [--dry-run]
+"""
+import csv
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from core.services.roster import RosterError, RosterProvisioner
+
+
+def write_credentials(path, credentials, replace=False):
+    """Write username,password rows to a new file only the owner can read, and sync it to disk."""
+    target = f"{path}.tmp" if replace else path
+    fd = os.open(target, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['username', 'password'])
+        writer.writeheader()
+        writer.writerows(credentials)
+        f.flush()
+        os.fsync(f.fileno())
+    if replace:
+        os.replace(target, path)
+
+
+class Command(BaseCommand):
+    help = 'Create user accounts from a CSV roster, hashing passwords in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('roster', type=str, help='Path to the CSV roster')
+        parser.add_argument('--default-role', type=str, default='STUDENT',
+                            help='Role for rows without one (default: STUDENT)')
+        parser.add_argument('--approve-teachers', action='store_true',
+                            help='Approve teacher accounts immediately instead of leaving them pending')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes hashing passwords (default: one per CPU)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Users per INSERT (default: 500)')
+        parser.add_argument('--credentials-out', type=str,
+                            help='Write username,password of generated passwords to this CSV file')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the roster and report without creating users')
+
+    def handle(self, *args, **options):
+        try:
+            provisioner = RosterProvisioner(
+                workers=options['workers'], default_role=options['default_role'].upper(),
+                approve_teachers=options['approve_teachers'], batch_size=options['batch_size'],
+            )
+            with open(options['roster'], newline='', encoding='utf-8-sig') as f:
+                entries = provisioner.read(f)
+        except FileNotFoundError:
+            raise CommandError(f"File not found: {options['roster']}")
+        except RosterError as e:
+            raise CommandError(str(e))
+
+        if any(not entry['password'] for entry in entries) and not options['dry_run']:
+            if not options['credentials_out']:
+                raise CommandError(
+                    'Some rows have no password; pass --credentials-out to receive the generated ones'
+                )
+            if os.path.exists(options['credentials_out']):
+                raise CommandError(f"{options['credentials_out']} already exists; refusing to overwrite credentials")
+
+        written = []
+
+        def save_credentials(credentials):
+            try:
+                write_credentials(options['credentials_out'], credentials)
+            except OSError as e:
+                raise CommandError(f"Cannot write {options['credentials_out']}: {e}; no users were created")
+            written.extend(credentials)
+
+        stats = provisioner.provision(
+            entries, dry_run=options['dry_run'], progress=self.stdout.write, before_insert=save_credentials,
+        )
+
+        if written:
+            if len(stats['credentials']) < len(written):
+                # Another run created some of these usernames first; drop their unused passwords.
+                write_credentials(options['credentials_out'], stats['credentials'], replace=True)
+            self.stdout.write(f"Generated passwords written to {options['credentials_out']}")
+
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stats['created']} users, skipped {stats['skipped']} existing ({stats['rows']} rows)"
+        ))
+        if stats['created'] and not options['dry_run']:
+            self.stdout.write(
+                f"  {stats['users_per_second']} users/s: hashing {stats['hash_seconds']}s on "
+                f"{stats['workers']} workers, inserts {stats['insert_seconds']}s, total {stats['total_seconds']}s"
+            )
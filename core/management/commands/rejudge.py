@@ -0,0 +1,44 @@
+"""
+Django management command to queue submissions for a manual re-judge.
+
+Re-judges run in their own priority class, below live assignments, so a bulk
+re-judge never delays students taking an exam.
+
+Usage:
+    python manage.py rejudge (--task <id> | --assignment <id> | --submission <id>) [--all-attempts]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from core.models import JudgeJob, Submission
+from core.services.judge_queue import JudgeQueue
+
+
+class Command(BaseCommand):
+    help = 'Queue submissions of auto-validated coding tasks for a re-judge'
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--task', type=int, help='ID of the task to re-judge')
+        target.add_argument('--assignment', type=int, help='Re-judge every auto-validated task of this assignment')
+        target.add_argument('--submission', type=int, help='ID of a single submission')
+        parser.add_argument('--all-attempts', action='store_true',
+                            help="Re-judge every attempt, not only each student's latest")
+
+    def handle(self, *args, **options):
+        submissions = Submission.objects.filter(task__task_type='CODING', task__validation_type='AUTO')
+        if options.get('submission'):
+            submissions = submissions.filter(id=options['submission'])
+        elif options.get('task'):
+            submissions = submissions.filter(task_id=options['task'])
+        else:
+            submissions = submissions.filter(task__assignment_id=options['assignment'])
+
+        if not options['all_attempts'] and not options.get('submission'):
+            latest = submissions.values('student_id', 'task_id').annotate(latest=Max('id')).values('latest')
+            submissions = Submission.objects.filter(id__in=latest)
+
+        submissions = submissions.only('id', 'student_id', 'task_id')
+        queued = JudgeQueue.enqueue_many(submissions.iterator(chunk_size=1000), JudgeJob.PRIORITY_REJUDGE)
+        if not queued:
+            raise CommandError("No matching submissions found")
+        self.stdout.write(self.style.SUCCESS(f"Queued {queued} submissions for re-judging"))
@@ -0,0 +1,40 @@
+"""
+Django management command to show configured read replicas and their lag.
+
+Locally two SQLite files are enough to try replica routing. A copied file
+never receives newer heartbeats, so it reads as lagging after
+REPLICA_MAX_LAG_SECONDS; keep copying it to stand in for replication:
+
+    while sleep 1; do sqlite3 db.sqlite3 '.backup replica.sqlite3'; done &
+    REPLICA_DATABASE_URLS=sqlite:///replica.sqlite3 python manage.py runserver
+
+Heartbeats are written by the web processes (see core/db_router.py), so
+with none running every replica reads as lagging.
+
+Usage:
+    python manage.py replica_status
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.db_router import replica_aliases, replica_lag
+
+
+class Command(BaseCommand):
+    help = 'Show read replicas, their lag behind the primary and whether reads are routed to them'
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            self.stdout.write('No replicas configured (set REPLICA_DATABASE_URLS).')
+            return
+        for alias in aliases:
+            lag = replica_lag(alias)
+            name = settings.DATABASES[alias]['NAME']
+            if lag is None:
+                self.stdout.write(self.style.ERROR(f"{alias} ({name}): unreachable, reads go to the primary"))
+            elif lag > settings.REPLICA_MAX_LAG_SECONDS:
+                self.stdout.write(self.style.WARNING(
+                    f"{alias} ({name}): {lag:.1f}s behind (limit {settings.REPLICA_MAX_LAG_SECONDS:g}s), reads go to the primary"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{alias} ({name}): {lag:.1f}s behind, in use"))
@@ -0,0 +1,60 @@
+"""
+Django management command running bulk admin actions queued as background
+jobs (re-judge, export, archive) and imports with generated test cases.
+Several instances may share the queue.
+
+Jobs can run for minutes and the queue can sit empty for hours, so the
+connection is health-checked and renewed around every claim and job
+(``db_job()``, see core/db_connections.py), and a claim that loses its
+connection is retried.
+
+Usage:
+    python manage.py run_background_jobs [--once] [--poll-interval 2]
+"""
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from core.db_connections import db_job, retry_on_disconnect
+from core.services import background_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs created by admin bulk actions and imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to wait when the queue is empty (default: 2)')
+        parser.add_argument('--stale-after', type=float, default=3600,
+                            help='Requeue jobs running longer than this many seconds at startup (default: 3600)')
+
+    def handle(self, *args, **options):
+        requeued = background_jobs.requeue_stale(options['stale_after'])
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale jobs"))
+
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        claim = retry_on_disconnect(background_jobs.claim)
+        completed = 0
+        try:
+            while True:
+                with db_job():
+                    job = claim(worker)
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                started = time.perf_counter()
+                with db_job():
+                    background_jobs.run(job)
+                completed += 1
+                style = self.style.SUCCESS if job.status == 'DONE' else self.style.ERROR
+                self.stdout.write(style(
+                    f"Job {job.id} ({job.kind}) {job.status.lower()} in {time.perf_counter() - started:.1f}s: {job.result}"
+                ))
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Ran {completed} jobs")
@@ -0,0 +1,108 @@
+"""
+Django management command running server-side judge workers.
+
+Each worker thread claims the next job from the judge queue (priority class,
+fair share per student, shortest expected job first), runs the submission in
+a separate, sandboxed process (see core/services/judge.py) and stores the
+verdict. Several run_judge processes may share the queue; the fair share is
+computed from JUDGE_TOTAL_WORKERS, the workers of all of them together.
+
+Every worker thread keeps its own database connection. It is health-checked
+and renewed around each job (``db_job()``, see core/db_connections.py), so a
+connection the server dropped while the queue was idle is replaced instead of
+failing the next claim, and claiming or storing a verdict is retried once
+when the connection is lost mid-query.
+
+Usage:
+    python manage.py run_judge [--workers 4] [--total-workers 8] [--once] [--poll-interval 0.5]
+"""
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.db_connections import db_job, retry_on_disconnect
+from core.models import JudgeJob
+from core.services.judge import JudgeError, JudgeRunner, sandbox_command
+from core.services.judge_queue import JudgeQueue
+
+
+class Command(BaseCommand):
+    help = 'Run server-side judge workers that process the judge queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.JUDGE_WORKERS,
+                            help=f'Worker threads (default: JUDGE_WORKERS={settings.JUDGE_WORKERS})')
+        parser.add_argument('--total-workers', type=int, default=settings.JUDGE_TOTAL_WORKERS,
+                            help='Workers of all run_judge processes, for the fair share '
+                                 f'(default: JUDGE_TOTAL_WORKERS={settings.JUDGE_TOTAL_WORKERS})')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is queued')
+        parser.add_argument('--poll-interval', type=float, default=0.5,
+                            help='Seconds to wait when nothing can be scheduled (default: 0.5)')
+        parser.add_argument('--stale-after', type=float, default=600,
+                            help='Requeue jobs running longer than this many seconds at startup (default: 600)')
+
+    def handle(self, *args, **options):
+        try:
+            sandbox_command([], os.getcwd())
+        except JudgeError as e:
+            raise CommandError(str(e))
+        requeued = JudgeQueue.requeue_stale(options['stale_after'])
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale jobs"))
+
+        queue = JudgeQueue(total_workers=max(options['total_workers'], options['workers']))
+        runner = JudgeRunner()
+        self._stop = threading.Event()
+        self._judged = 0
+        self._lock = threading.Lock()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+        threads = [
+            threading.Thread(
+                target=self._work, args=(queue, runner, f"{prefix}:{i}", options), daemon=True,
+            )
+            for i in range(options['workers'])
+        ]
+        self.stdout.write(f"Starting {len(threads)} judge workers (max {queue.share_limit()} per student)")
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        self.stdout.write(self.style.SUCCESS(f"Judged {self._judged} submissions"))
+
+    def _work(self, queue, runner, name, options):
+        claim = retry_on_disconnect(queue.claim)
+        finish = retry_on_disconnect(JudgeQueue.finish)
+        fail = retry_on_disconnect(JudgeQueue.fail)
+        try:
+            while not self._stop.is_set():
+                with db_job():
+                    job = claim(name)
+                    if job is None:
+                        # Jobs of students at their fair share are still queued.
+                        if options['once'] and not JudgeJob.objects.filter(status='QUEUED').exists():
+                            return
+                        time.sleep(options['poll_interval'])
+                        continue
+                    started = time.perf_counter()
+                    try:
+                        result, output, runs = runner.judge(job.submission)
+                    except JudgeError as e:
+                        fail(job, str(e))
+                        self.stderr.write(self.style.ERROR(f"Job {job.id}: {e}"))
+                        continue
+                    finish(job, result, output, (time.perf_counter() - started) * 1000, runs)
+                with self._lock:
+                    self._judged += 1
+        finally:
+            connection.close()
@@ -0,0 +1,57 @@
+"""
+Django management command rewriting the public scoreboard snapshots served
+at /scoreboard/<id>/. Run one instance next to the web servers (it must
+write to the SCOREBOARD_DIR they read from).
+
+Usage:
+    python manage.py snapshot_scoreboards [--once] [--interval 10] [--assignment-id 1]
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.models import Assignment
+from core.services import scoreboard
+
+
+class Command(BaseCommand):
+    help = 'Render public scoreboards to static snapshot files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Render every snapshot once and exit')
+        parser.add_argument('--interval', type=float, default=None,
+                            help='Seconds between rounds (default: SCOREBOARD_SNAPSHOT_SECONDS)')
+        parser.add_argument('--assignment-id', type=int, help='Only this assignment')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or settings.SCOREBOARD_SNAPSHOT_SECONDS
+        try:
+            while True:
+                started = time.perf_counter()
+                self._round(options['assignment_id'], verbose=options['once'])
+                if options['once']:
+                    break
+                time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+        except KeyboardInterrupt:
+            pass
+
+    def _round(self, assignment_id, verbose):
+        assignments = Assignment.objects.filter(public_scoreboard=True).order_by('id')
+        if assignment_id:
+            assignments = assignments.filter(id=assignment_id)
+        assignments = list(assignments)
+        if not assignment_id:
+            removed = scoreboard.prune_snapshots(a.id for a in assignments)
+            if removed:
+                self.stdout.write(f"Took down {removed} scoreboards that are no longer public")
+        for assignment in assignments:
+            try:
+                changed = scoreboard.write_snapshot(assignment)
+            except Exception as e:
+                # One broken assignment must not stop the others from updating.
+                self.stderr.write(self.style.ERROR(f"Assignment {assignment.id}: {type(e).__name__}: {e}"))
+                continue
+            if changed:
+                self.stdout.write(f"Updated scoreboard of '{assignment.title}'")
+            elif verbose:
+                self.stdout.write(f"Scoreboard of '{assignment.title}' unchanged")
@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-19 02:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('dump_path', models.CharField(blank=True, help_text='Optional compressed JSONL/Parquet copy', max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archives', to='core.assignment')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField()),
+                ('content_zlib', models.BinaryField()),
+                ('auto_result', models.CharField(choices=[('PENDING', 'Pending'), ('PASS', 'Pass'), ('FAIL', 'Fail'), ('ERROR', 'Runtime Error')], default='PENDING', max_length=10)),
+                ('auto_output_zlib', models.BinaryField(blank=True, null=True)),
+                ('manual_grade', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('teacher_comments', models.TextField(blank=True)),
+                ('submitted_at', models.DateTimeField()),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_submissions', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_submissions', to='core.task')),
+                ('archive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='core.submissionarchive')),
+            ],
+        ),
+    ]
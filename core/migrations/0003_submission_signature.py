@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-19 02:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_submission_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionSignature',
+            fields=[
+                ('submission', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='core.submission')),
+                ('token_count', models.PositiveIntegerField(default=0)),
+                ('minhash', models.BinaryField()),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signatures', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signatures', to='core.task')),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-19 02:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_submission_signature'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JudgeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(0, 'Live assignment'), (1, 'Manual re-judge'), (2, 'Background verification')], default=0)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='QUEUED', max_length=10)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('enqueued_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('runtime_ms', models.FloatField(blank=True, help_text='Wall time of the whole judge run', null=True)),
+                ('error', models.TextField(blank=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='judge_jobs', to=settings.AUTH_USER_MODEL)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='judge_jobs', to='core.submission')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='judge_jobs', to='core.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'priority', 'enqueued_at'], name='core_judgej_status_507efa_idx'), models.Index(fields=['task', 'status'], name='core_judgej_task_id_0ad55a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0 on 2026-10-19 02:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_judge_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='adaptive_time_limit',
+            field=models.BooleanField(default=False, help_text="Derive the time limit from the reference solution's runtime"),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='reference_runtime_ms',
+            field=models.FloatField(blank=True, help_text='CPU time of the reference solution on its slowest test case', null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='reference_solution',
+            field=models.TextField(blank=True, help_text='Known-good solution, used to calibrate the adaptive time limit'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='time_limit',
+            field=models.FloatField(blank=True, help_text='Seconds per test case for the server judge; empty uses the default or the adaptive limit', null=True),
+        ),
+        migrations.CreateModel(
+            name='TestCaseResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('verdict', models.CharField(choices=[('PASS', 'Pass'), ('FAIL', 'Wrong Answer'), ('ERROR', 'Runtime Error'), ('TLE', 'Time Limit Exceeded')], max_length=5)),
+                ('cpu_ms', models.FloatField(blank=True, help_text='User + system CPU time', null=True)),
+                ('wall_ms', models.FloatField()),
+                ('peak_rss_kb', models.PositiveIntegerField(blank=True, null=True)),
+                ('output_bytes', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_case_results', to='core.submission')),
+                ('test_case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='core.testcase')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['test_case', 'verdict'], name='core_testca_test_ca_ecf3f4_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-19 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_test_case_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testcase',
+            name='fail_count',
+            field=models.PositiveIntegerField(default=0, help_text='Runs that did not pass'),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='run_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='total_ms',
+            field=models.FloatField(default=0.0, help_text='Summed run time of all runs'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-19 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_test_case_judge_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='comparator',
+            field=models.CharField(choices=[('EXACT', 'Exact (trimmed)'), ('WHITESPACE', 'Ignore whitespace'), ('TOKEN', 'Token by token'), ('FLOAT', 'Tokens with float tolerance')], default='EXACT', help_text='How output is compared with the expected output (see services.comparators)', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='float_tolerance',
+            field=models.FloatField(default=1e-06, help_text='Allowed difference of numeric tokens for the FLOAT comparator'),
+        ),
+    ]
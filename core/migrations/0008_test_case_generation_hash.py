@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_task_comparator'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testcase',
+            name='generation_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='Identity of a generated case (see services.test_generation)', max_length=64),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0 on 2026-10-19 03:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_test_case_generation_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('REJUDGE', 'Re-judge submissions'), ('EXPORT', 'Export submissions'), ('ARCHIVE', 'Archive old attempts')], max_length=10)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='QUEUED', max_length=10)),
+                ('query', models.BinaryField()),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('result', models.TextField(blank=True)),
+                ('result_path', models.CharField(blank=True, help_text='File written by an export', max_length=500)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['auto_result', 'id'], name='core_submis_auto_re_de8059_idx'),
+        ),
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='background_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='backgroundjob',
+            index=models.Index(fields=['status', 'created_at'], name='core_backgr_status_e66a68_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-19 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_background_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='public_scoreboard',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='scoreboard_freeze_minutes',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
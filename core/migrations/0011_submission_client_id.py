@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-19 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_assignment_public_scoreboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='client_id',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', 'client_id'], name='core_submis_student_4c6411_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0 on 2026-10-19 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_submission_client_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='submit_student_burst',
+            field=models.PositiveIntegerField(blank=True, help_text='Submissions per student allowed in a burst, all tasks', null=True),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='submit_student_rate',
+            field=models.PositiveIntegerField(blank=True, help_text='Submissions per minute per student, all tasks', null=True),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='submit_task_burst',
+            field=models.PositiveIntegerField(blank=True, help_text='Submissions per student and task allowed in a burst', null=True),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='submit_task_rate',
+            field=models.PositiveIntegerField(blank=True, help_text='Submissions per minute per student and task', null=True),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='attempt_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', 'task', 'id'], name='core_submis_student_9793e5_idx'),
+        ),
+    ]
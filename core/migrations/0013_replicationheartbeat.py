@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-19 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_submission_throttling'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReplicationHeartbeat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('beat_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_replicationheartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='test_cases_version',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Changes whenever the task or its test cases change'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_task_test_cases_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='reference_runtime_ms',
+            field=models.FloatField(blank=True, help_text='Wall time in ms of the reference solution on its slowest test case', null=True),
+        ),
+    ]
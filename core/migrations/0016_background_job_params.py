@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-19 03:44
+
+from django.db import migrations, models
+
+
+def fail_unfinished_jobs(apps, schema_editor):
+    # Their selection was stored as a pickled query, which is no longer read.
+    apps.get_model('core', 'BackgroundJob').objects.filter(status__in=['QUEUED', 'RUNNING']).update(
+        status='FAILED', result='Queued before the selection format changed; queue it again.',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_reference_runtime_wall_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_unfinished_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='backgroundjob',
+            name='query',
+        ),
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='params',
+            field=models.JSONField(default=dict),
+        ),
+    ]
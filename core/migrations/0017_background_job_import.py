@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_background_job_params'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='backgroundjob',
+            name='kind',
+            field=models.CharField(choices=[('REJUDGE', 'Re-judge submissions'), ('EXPORT', 'Export submissions'), ('ARCHIVE', 'Archive old attempts'), ('IMPORT', 'Import assignment')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-19 03:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_background_job_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedsubmission',
+            name='attempt_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='SubmissionAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.CharField(db_index=True, max_length=64)),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='core.submission')),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-19 03:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_submission_attempts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarityReport',
+            fields=[
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='similarity_report', serialize=False, to='core.task')),
+                ('signature_count', models.PositiveIntegerField(default=0)),
+                ('newest_submission_id', models.BigIntegerField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField()),
+                ('pairs', models.JSONField(default=list)),
+                ('skipped_buckets', models.PositiveIntegerField(default=0, help_text='LSH buckets too large to compare pairwise')),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='backgroundjob',
+            name='kind',
+            field=models.CharField(choices=[('REJUDGE', 'Re-judge submissions'), ('EXPORT', 'Export submissions'), ('ARCHIVE', 'Archive old attempts'), ('IMPORT', 'Import assignment'), ('SIMILARITY', 'Find similar submissions')], max_length=10),
+        ),
+    ]
@@ -22,6 +22,22 @@ class Assignment(models.Model):
     start_time = models.DateTimeField(null=True, blank=True)
     end_time = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Publishes a snapshot of the standings at /scoreboard/<id>/ (see snapshot_scoreboards).
+    public_scoreboard = models.BooleanField(default=False)
+    # Snapshots stop counting submissions this many minutes before end_time.
+    scoreboard_freeze_minutes = models.PositiveIntegerField(null=True, blank=True)
+    # Submission rate limits (token buckets, see services.rate_limit); empty uses the SUBMIT_* settings, 0 disables.
+    submit_task_rate = models.PositiveIntegerField(null=True, blank=True, help_text="Submissions per minute per student and task")
+    submit_task_burst = models.PositiveIntegerField(null=True, blank=True, help_text="Submissions per student and task allowed in a burst")
+    submit_student_rate = models.PositiveIntegerField(null=True, blank=True, help_text="Submissions per minute per student, all tasks")
+    submit_student_burst = models.PositiveIntegerField(null=True, blank=True, help_text="Submissions per student allowed in a burst, all tasks")
+
+    def scoreboard_frozen_at(self):
+        """When the public scoreboard freezes, or None if it never does."""
+        if not self.end_time or not self.scoreboard_freeze_minutes:
+            return None
+        from datetime import timedelta
+        return self.end_time - timedelta(minutes=self.scoreboard_freeze_minutes)
 
     def is_live(self):
         from django.utils import timezone
@@ -44,12 +60,26 @@ class Task(models.Model):
         ('MANUAL', 'Manual Grading'),
         ('AUTO', 'Auto Validation'),
     )
+    COMPARATOR_CHOICES = (
+        ('EXACT', 'Exact (trimmed)'),
+        ('WHITESPACE', 'Ignore whitespace'),
+        ('TOKEN', 'Token by token'),
+        ('FLOAT', 'Tokens with float tolerance'),
+    )
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='tasks')
     title = models.CharField(max_length=200)
     description = models.TextField()
     task_type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='CODING')
     validation_type = models.CharField(max_length=10, choices=VALIDATION_CHOICES, default='MANUAL')
     order = models.PositiveIntegerField(default=0)
+    comparator = models.CharField(max_length=12, choices=COMPARATOR_CHOICES, default='EXACT', help_text="How output is compared with the expected output (see services.comparators)")
+    float_tolerance = models.FloatField(default=1e-6, help_text="Allowed difference of numeric tokens for the FLOAT comparator")
+    time_limit = models.FloatField(null=True, blank=True, help_text="Seconds per test case for the server judge; empty uses the default or the adaptive limit")
+    adaptive_time_limit = models.BooleanField(default=False, help_text="Derive the time limit from the reference solution's runtime")
+    reference_solution = models.TextField(blank=True, help_text="Known-good solution, used to calibrate the adaptive time limit")
+    reference_runtime_ms = models.FloatField(null=True, blank=True, help_text="Wall time in ms of the reference solution on its slowest test case")
+    # Stored with the task rather than in the cache, so every process agrees on it (see core.cache_versions).
+    test_cases_version = models.BigIntegerField(default=0, editable=False, help_text="Changes whenever the task or its test cases change")
 
     class Meta:
         ordering = ['order']
@@ -57,15 +87,34 @@ class Task(models.Model):
     def __str__(self):
         return f"{self.assignment.title} - {self.title}"
 
+    def effective_time_limit(self):
+        """Seconds the server judge allows per test case."""
+        from django.conf import settings
+        if self.time_limit:
+            return self.time_limit
+        if self.adaptive_time_limit and self.reference_runtime_ms:
+            return max(
+                settings.JUDGE_ADAPTIVE_MIN_SECONDS,
+                self.reference_runtime_ms * settings.JUDGE_ADAPTIVE_MULTIPLIER / 1000,
+            )
+        return settings.JUDGE_TIME_LIMIT_SECONDS
+
 class TestCase(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='test_cases')
     input_data = models.TextField(blank=True, help_text="Input to pass to the script via stdin")
     expected_output = models.TextField(help_text="Expected output from stdout")
+    generation_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="Identity of a generated case (see services.test_generation)")
+    # Judge statistics, updated with F() expressions as verdicts arrive (see services.test_ordering).
+    run_count = models.PositiveIntegerField(default=0)
+    fail_count = models.PositiveIntegerField(default=0, help_text="Runs that did not pass")
+    total_ms = models.FloatField(default=0.0, help_text="Summed run time of all runs")
 
     def __str__(self):
         return f"Test Case for {self.task.title}"
 
 class Submission(models.Model):
+    is_archived = False
+
     RESULT_CHOICES = (
         ('PENDING', 'Pending'),
         ('PASS', 'Pass'),
@@ -80,6 +129,204 @@ class Submission(models.Model):
     manual_grade = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     teacher_comments = models.TextField(blank=True)
     submitted_at = models.DateTimeField(auto_now_add=True)
+    # Random id chosen by the browser's submission queue, so a retried batch is not stored twice.
+    client_id = models.CharField(max_length=64, blank=True, default='')
+    # Byte-identical consecutive resubmissions are stored once; attempt_count counts them.
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    attempt_count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            # Admin changelist: filter by result, newest first.
+            models.Index(fields=['auto_result', 'id']),
+            models.Index(fields=['student', 'client_id']),
+            # A student's latest submission to a task (resubmission check).
+            models.Index(fields=['student', 'task', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.student.username} - {self.task.title}"
+
+class SubmissionAttempt(models.Model):
+    """A resubmission counted in an earlier Submission's attempt_count, kept for its browser client_id."""
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='attempts')
+    client_id = models.CharField(max_length=64, db_index=True)
+    submitted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Attempt {self.client_id} of submission {self.submission_id}"
+
+class SubmissionSignature(models.Model):
+    """MinHash signature of a coding submission, used for near-duplicate detection."""
+    submission = models.OneToOneField(Submission, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='signatures')
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='signatures')
+    token_count = models.PositiveIntegerField(default=0)
+    minhash = models.BinaryField()
+
+    def __str__(self):
+        return f"Signature of submission {self.submission_id}"
+
+class SimilarityReport(models.Model):
+    """Similar submission pairs of a task, computed by a background job (see services.similarity)."""
+    task = models.OneToOneField(Task, on_delete=models.CASCADE, primary_key=True, related_name='similarity_report')
+    # The task's signatures when the pairs were computed: their count and the newest submission.
+    signature_count = models.PositiveIntegerField(default=0)
+    newest_submission_id = models.BigIntegerField(null=True, blank=True)
+    computed_at = models.DateTimeField()
+    pairs = models.JSONField(default=list)
+    skipped_buckets = models.PositiveIntegerField(default=0, help_text="LSH buckets too large to compare pairwise")
+
+    def __str__(self):
+        return f"Similarity report of task {self.task_id}"
+
+class SubmissionArchive(models.Model):
+    """A batch of submissions moved out of the hot Submission table."""
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name='archives')
+    row_count = models.PositiveIntegerField(default=0)
+    dump_path = models.CharField(max_length=500, blank=True, help_text="Optional compressed JSONL/Parquet copy")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archive of {self.assignment_id} ({self.row_count} submissions)"
+
+class ArchivedSubmission(models.Model):
+    """Compact, read-only copy of a Submission; text fields are zlib-compressed."""
+    is_archived = True
+
+    archive = models.ForeignKey(SubmissionArchive, on_delete=models.CASCADE, related_name='submissions')
+    original_id = models.BigIntegerField()
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_submissions')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='archived_submissions')
+    content_zlib = models.BinaryField()
+    auto_result = models.CharField(max_length=10, choices=Submission.RESULT_CHOICES, default='PENDING')
+    auto_output_zlib = models.BinaryField(blank=True, null=True)
+    manual_grade = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    teacher_comments = models.TextField(blank=True)
+    submitted_at = models.DateTimeField()
+    attempt_count = models.PositiveIntegerField(default=1)
+
+    @staticmethod
+    def compress(text):
+        import zlib
+        return zlib.compress((text or '').encode('utf-8'), 9)
+
+    @staticmethod
+    def decompress(data):
+        import zlib
+        return zlib.decompress(bytes(data)).decode('utf-8') if data else ''
+
+    @property
+    def content(self):
+        return self.decompress(self.content_zlib)
+
+    @property
+    def auto_output(self):
+        return self.decompress(self.auto_output_zlib)
+
+    def __str__(self):
+        return f"{self.student.username} - {self.task.title} (archived)"
+
+class ReplicationHeartbeat(models.Model):
+    """A timestamp written to the primary; how far behind a replica's newest beat is gives its lag (see db_router)."""
+    beat_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Heartbeat at {self.beat_at}"
+
+class JudgeJob(models.Model):
+    """A submission waiting for (or judged by) the server-side judge."""
+    PRIORITY_LIVE = 0
+    PRIORITY_REJUDGE = 1
+    PRIORITY_BACKGROUND = 2
+    PRIORITY_CHOICES = (
+        (PRIORITY_LIVE, 'Live assignment'),
+        (PRIORITY_REJUDGE, 'Manual re-judge'),
+        (PRIORITY_BACKGROUND, 'Background verification'),
+    )
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    )
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='judge_jobs')
+    # Denormalized from the submission so scheduling never needs a join.
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='judge_jobs')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='judge_jobs')
+    priority = models.PositiveSmallIntegerField(choices=PRIORITY_CHOICES, default=PRIORITY_LIVE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    worker = models.CharField(max_length=100, blank=True)
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    runtime_ms = models.FloatField(null=True, blank=True, help_text="Wall time of the whole judge run")
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'priority', 'enqueued_at']),
+            models.Index(fields=['task', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Judge job {self.id} for submission {self.submission_id} ({self.get_status_display()})"
+
+class TestCaseResult(models.Model):
+    """Resource usage of one submission on one test case, recorded by the server judge."""
+    VERDICT_CHOICES = (
+        ('PASS', 'Pass'),
+        ('FAIL', 'Wrong Answer'),
+        ('ERROR', 'Runtime Error'),
+        ('TLE', 'Time Limit Exceeded'),
+    )
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='test_case_results')
+    test_case = models.ForeignKey(TestCase, on_delete=models.CASCADE, related_name='results')
+    verdict = models.CharField(max_length=5, choices=VERDICT_CHOICES)
+    cpu_ms = models.FloatField(null=True, blank=True, help_text="User + system CPU time")
+    wall_ms = models.FloatField()
+    peak_rss_kb = models.PositiveIntegerField(null=True, blank=True)
+    output_bytes = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['test_case', 'verdict'])]
+
+    def __str__(self):
+        return f"Submission {self.submission_id} on test case {self.test_case_id}: {self.verdict}"
+
+class BackgroundJob(models.Model):
+    """A bulk admin action run by 'manage.py run_background_jobs' instead of inside the request."""
+    KIND_CHOICES = (
+        ('REJUDGE', 'Re-judge submissions'),
+        ('EXPORT', 'Export submissions'),
+        ('ARCHIVE', 'Archive old attempts'),
+        ('IMPORT', 'Import assignment'),
+        ('SIMILARITY', 'Find similar submissions'),
+    )
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='background_jobs')
+    # The selected rows: {"ids": [...]} or, for "select all", {"filters": {...}} with
+    # the changelist's query parameters; {"data": {...}} for an import (see services.background_jobs).
+    # A similarity job holds the {"ids": [...]} of its assignment.
+    params = models.JSONField(default=dict)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    processed = models.PositiveIntegerField(default=0)
+    result = models.TextField(blank=True)
+    result_path = models.CharField(max_length=500, blank=True, help_text="File written by an export")
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} job {self.id} ({self.get_status_display()})"
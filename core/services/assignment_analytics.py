@@ -0,0 +1,183 @@
+"""
+Service computing per-task statistics for an assignment.
+
+All submissions, including attempts moved to the archive table (see
+``SubmissionArchiver``), are fetched with ``values_list`` queries and analysed
+with vectorized pandas/NumPy operations. The hardest test cases come from the
+per-test-case failure counters (see ``core.services.test_ordering``) and
+judge resource usage from ``core.services.runtime_stats``. Results are
+cached per assignment version (see ``core.cache_versions``), so they are
+recomputed only after a submission, task or test case of the assignment
+changes; the failure counters alone are refreshed at the cache timeout.
+"""
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from core.cache_versions import get_version
+from core.models import ArchivedSubmission, Assignment, Submission, TestCase
+from core.services.runtime_stats import assignment_runtime_stats
+
+ATTEMPT_BUCKETS = ['1', '2', '3', '4', '5-9', '10+']
+PERCENTILES = [50, 75, 90]
+
+
+class AssignmentAnalytics:
+    """Pass rates, attempts-to-solve, time-to-first-pass and hardest test cases."""
+
+    CACHE_TIMEOUT = 60 * 60
+    HARDEST_LIMIT = 10
+
+    def __init__(self, assignment: Assignment):
+        self.assignment = assignment
+
+    def get(self) -> Dict:
+        """Return cached statistics, computing them if the assignment changed."""
+        version = get_version('assignment', self.assignment.id)
+        key = f"analytics:{self.assignment.id}:{version}"
+        stats = cache.get(key)
+        if stats is None:
+            stats = self.compute()
+            cache.set(key, stats, self.CACHE_TIMEOUT)
+        return stats
+
+    def _frame(self) -> pd.DataFrame:
+        fields = ('task_id', 'student_id', 'auto_result', 'submitted_at', 'attempt_count')
+        rows = list(Submission.objects.filter(task__assignment=self.assignment).values_list(*fields))
+        if self.assignment.archives.exists():
+            rows += ArchivedSubmission.objects.filter(task__assignment=self.assignment).values_list(*fields)
+        frame = pd.DataFrame.from_records(rows, columns=['task', 'student', 'result', 'submitted_at', 'attempts'])
+        # Nanoseconds since the epoch; integer arithmetic is far cheaper than datetimes.
+        frame['submitted_at'] = pd.to_datetime(frame['submitted_at'], utc=True).astype('int64')
+        frame['passed'] = frame['result'].to_numpy() == 'PASS'
+        return frame
+
+    def hardest_test_cases(self) -> List[Dict]:
+        """
+        Test cases failed most often, from the counters the judges keep.
+
+        Failures are counted on runs that reached the test case, by the server
+        judge and the browser runner alike. Test cases are numbered in creation
+        order within their task, independent of the order they are run in.
+        """
+        test_cases = TestCase.objects.filter(task__assignment=self.assignment)
+        hardest = list(
+            test_cases.filter(fail_count__gt=0)
+            .annotate(fail_rate=Cast('fail_count', FloatField()) / F('run_count'))
+            .order_by('-fail_count', '-fail_rate', 'id')
+            .values('id', 'task_id', 'task__title', 'fail_count', 'run_count', 'fail_rate')[:self.HARDEST_LIMIT]
+        )
+        numbers, counts = {}, Counter()
+        task_ids = {case['task_id'] for case in hardest}
+        for task_id, case_id in test_cases.filter(task_id__in=task_ids).order_by('id').values_list('task_id', 'id'):
+            counts[task_id] += 1
+            numbers[case_id] = counts[task_id]
+        return [
+            {
+                'task': case['task__title'],
+                'test_case': numbers[case['id']],
+                'failures': case['fail_count'],
+                'runs': case['run_count'],
+                'fail_rate': round(100.0 * case['fail_rate'], 1),
+            }
+            for case in hardest
+        ]
+
+    def compute(self) -> Dict:
+        """Compute statistics for every task of the assignment."""
+        tasks = list(self.assignment.tasks.values('id', 'title', 'validation_type'))
+        frame = self._frame()
+        stats = {t['id']: self._empty_task_stats(t) for t in tasks}
+        if frame.empty:
+            return {
+                'tasks': list(stats.values()),
+                'hardest_test_cases': self.hardest_test_cases(),
+                'total_submissions': 0,
+            }
+
+        task_ids = frame['task'].to_numpy(dtype=np.int64)
+        student_ids = frame['student'].to_numpy(dtype=np.int64)
+        order = np.lexsort((frame['submitted_at'].to_numpy(), student_ids, task_ids))
+        frame = frame.take(order).reset_index(drop=True)
+        # One integer key per (task, student) pair groups much faster than two columns.
+        frame['pair'] = frame['task'].to_numpy(dtype=np.int64) * (int(student_ids.max()) + 1) + frame['student'].to_numpy(dtype=np.int64)
+        pairs = frame.groupby('pair', sort=False)
+        row = pairs.cumcount().to_numpy()
+        # A row stands for attempt_count identical attempts; number its first one.
+        attempts = frame['attempts'].to_numpy(dtype=np.int64)
+        frame['attempt'] = pairs['attempts'].cumsum().to_numpy() - attempts + 1
+        frame['passing_attempts'] = attempts * frame['passed'].to_numpy()
+        # Rows are sorted by time within each pair, so a pair's first row sits row rows earlier.
+        first_row = np.arange(len(frame)) - row
+        submitted_at = frame['submitted_at'].to_numpy()
+        frame['seconds'] = (submitted_at - submitted_at[first_row]) / 1e9
+
+        per_task = frame.groupby('task').agg(
+            submissions=('attempts', 'sum'),
+            passing_submissions=('passing_attempts', 'sum'),
+        )
+        per_task['students'] = frame.loc[row == 0].groupby('task').size()
+
+        first_pass = frame[frame['passed'].to_numpy()].drop_duplicates('pair')
+        solved = first_pass.groupby('task').agg(solvers=('student', 'size'))
+        buckets = pd.cut(
+            first_pass['attempt'], bins=[0, 1, 2, 3, 4, 9, np.inf], labels=ATTEMPT_BUCKETS
+        )
+        distribution = pd.crosstab(first_pass['task'], buckets).reindex(columns=ATTEMPT_BUCKETS, fill_value=0)
+
+        for task_id, row in per_task.iterrows():
+            entry = stats.get(task_id)
+            if entry is None:
+                continue
+            solvers = int(solved['solvers'].get(task_id, 0))
+            entry.update({
+                'submissions': int(row['submissions']),
+                'students': int(row['students']),
+                'solvers': solvers,
+                'pass_rate': round(100.0 * solvers / float(row['students']), 1),
+                'submission_pass_rate': round(100.0 * float(row['passing_submissions']) / float(row['submissions']), 1),
+            })
+            if solvers:
+                task_passes = first_pass[first_pass['task'].to_numpy() == task_id]
+                entry['attempts_distribution'] = [
+                    {'bucket': bucket, 'count': int(count),
+                     'percent': round(100.0 * count / solvers, 1)}
+                    for bucket, count in distribution.loc[task_id].items()
+                ]
+                entry['mean_attempts'] = round(float(task_passes['attempt'].mean()), 2)
+                entry['time_to_first_pass'] = [
+                    {'percentile': p, 'seconds': int(s)}
+                    for p, s in zip(PERCENTILES, np.percentile(task_passes['seconds'].to_numpy(), PERCENTILES))
+                ]
+
+        runtime = assignment_runtime_stats(self.assignment)
+        for task_id, entry in stats.items():
+            entry['runtime'] = runtime.get(task_id)
+
+        return {
+            'tasks': list(stats.values()),
+            'hardest_test_cases': self.hardest_test_cases(),
+            'total_submissions': int(attempts.sum()),
+        }
+
+    @staticmethod
+    def _empty_task_stats(task: Dict) -> Dict:
+        return {
+            'id': task['id'],
+            'title': task['title'],
+            'validation_type': task['validation_type'],
+            'submissions': 0,
+            'students': 0,
+            'solvers': 0,
+            'pass_rate': 0.0,
+            'submission_pass_rate': 0.0,
+            'mean_attempts': None,
+            'attempts_distribution': [],
+            'time_to_first_pass': [],
+            'runtime': None,
+        }
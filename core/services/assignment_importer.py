@@ -7,6 +7,7 @@ from typing import Dict, List, Optional
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from core.models import Assignment, Task, TestCase
+from core.services.test_generation import TestCaseGenerator, TestGenerationError, case_size, generation_hash
 
 User = get_user_model()
 
@@ -23,17 +24,21 @@ class AssignmentImporter:
     TASK_REQUIRED_FIELDS = ['title', 'description']
     VALID_TASK_TYPES = ['DESCRIPTION_ONLY', 'CODING']
     VALID_VALIDATION_TYPES = ['MANUAL', 'AUTO']
+    VALID_COMPARATORS = ['EXACT', 'WHITESPACE', 'TOKEN', 'FLOAT']
+    MAX_GENERATED_CASES = 1000
     
-    def __init__(self, teacher_user: User):
+    def __init__(self, teacher_user: User, generator: Optional[TestCaseGenerator] = None):
         """
         Initialize the importer with a teacher user.
         
         Args:
             teacher_user: The User object who will own the imported assignment
+            generator: Runs test-case generators; by default sandboxed processes, one per CPU at a time
         """
         if not teacher_user.is_teacher():
             raise AssignmentImportError(f"User {teacher_user.username} is not a teacher")
         self.teacher = teacher_user
+        self.generator = generator or TestCaseGenerator()
     
     def validate_json_structure(self, data: Dict) -> None:
         """
@@ -61,6 +66,11 @@ class AssignmentImporter:
         for idx, task in enumerate(data['tasks'], 1):
             self._validate_task(task, idx)
     
+    @staticmethod
+    def has_generators(data: Dict) -> bool:
+        """Whether any task of validated ``data`` generates its test cases (which runs teacher code)."""
+        return any(task.get('generator') for task in data['tasks'])
+    
     def _validate_task(self, task: Dict, task_num: int) -> None:
         """Validate a single task structure."""
         # Check required fields
@@ -84,6 +94,28 @@ class AssignmentImporter:
                 f"Must be one of: {', '.join(self.VALID_VALIDATION_TYPES)}"
             )
         
+        # Validate comparator if provided
+        if 'comparator' in task and task['comparator'] not in self.VALID_COMPARATORS:
+            raise AssignmentImportError(
+                f"Task {task_num}: Invalid comparator '{task['comparator']}'. "
+                f"Must be one of: {', '.join(self.VALID_COMPARATORS)}"
+            )
+        if 'float_tolerance' in task and (
+            isinstance(task['float_tolerance'], bool)
+            or not isinstance(task['float_tolerance'], (int, float))
+            or task['float_tolerance'] < 0
+        ):
+            raise AssignmentImportError(
+                f"Task {task_num}: 'float_tolerance' must be a non-negative number"
+            )
+        
+        if 'reference_solution' in task and not isinstance(task['reference_solution'], str):
+            raise AssignmentImportError(
+                f"Task {task_num}: 'reference_solution' must be a string"
+            )
+        if 'generator' in task:
+            self._validate_generator(task, task_num)
+        
         # Validate test_cases if provided
         if 'test_cases' in task:
             if not isinstance(task['test_cases'], list):
@@ -94,6 +126,27 @@ class AssignmentImporter:
             for tc_idx, test_case in enumerate(task['test_cases'], 1):
                 self._validate_test_case(test_case, task_num, tc_idx)
     
+    def _validate_generator(self, task: Dict, task_num: int) -> None:
+        """Validate a task's test-case generator."""
+        generator = task['generator']
+        if not isinstance(generator, dict) or not isinstance(generator.get('script'), str) or not generator['script'].strip():
+            raise AssignmentImportError(
+                f"Task {task_num}: 'generator' must be an object with a 'script'"
+            )
+        if not str(task.get('reference_solution') or '').strip():
+            raise AssignmentImportError(
+                f"Task {task_num}: A generator requires a 'reference_solution'"
+            )
+        count = generator.get('count', 0)
+        if isinstance(count, bool) or not isinstance(count, int) or not 1 <= count <= self.MAX_GENERATED_CASES:
+            raise AssignmentImportError(
+                f"Task {task_num}: Generator 'count' must be between 1 and {self.MAX_GENERATED_CASES}"
+            )
+        if not isinstance(generator.get('seed', 0), (int, str)):
+            raise AssignmentImportError(
+                f"Task {task_num}: Generator 'seed' must be a number or string"
+            )
+    
     def _validate_test_case(self, test_case: Dict, task_num: int, tc_num: int) -> None:
         """Validate a single test case structure."""
         if 'expected_output' not in test_case:
@@ -120,11 +173,13 @@ class AssignmentImporter:
         except ValueError as e:
             raise AssignmentImportError(f"Invalid datetime format: {dt_string}. Use ISO format (e.g., 2026-02-15T10:00:00Z)")
     
-    @transaction.atomic
     def import_from_dict(self, data: Dict) -> Assignment:
         """
         Import assignment from dictionary.
         
+        Generated test cases are produced before the database transaction
+        starts, so a slow generator does not hold it open.
+        
         Args:
             data: Parsed JSON data
             
@@ -136,7 +191,63 @@ class AssignmentImporter:
         """
         # Validate structure
         self.validate_json_structure(data)
+        generated = self._generate_test_cases(data['tasks'])
+        return self._create(data, generated)
+    
+    def _generate_test_cases(self, tasks: List[Dict]) -> Dict[int, List[TestCase]]:
+        """
+        Produce the generated test cases of every task that declares a generator.
+        
+        Cases this teacher generated before from the same generator,
+        reference solution and seed are copied instead of being run again;
+        other teachers' cases are never reused. Copied and generated cases
+        together count towards the generator's total size limit.
+        
+        Returns:
+            Task index -> unsaved TestCase objects
+        """
+        wanted = {}
+        for task_idx, task_data in enumerate(tasks):
+            generator = task_data.get('generator')
+            if not generator:
+                continue
+            seed = str(generator.get('seed', 0))
+            wanted[task_idx] = [
+                (generation_hash(generator['script'], task_data['reference_solution'], seed, index),
+                 (generator['script'], task_data['reference_solution'], seed, index))
+                for index in range(generator['count'])
+            ]
+        if not wanted:
+            return {}
+        
+        hashes = [h for cases in wanted.values() for h, _ in cases]
+        known = {}
+        for start in range(0, len(hashes), 500):
+            rows = TestCase.objects.filter(
+                generation_hash__in=hashes[start:start + 500], task__assignment__teacher=self.teacher,
+            ).values_list('generation_hash', 'input_data', 'expected_output')
+            for h, input_data, expected_output in rows:
+                known.setdefault(h, (input_data, expected_output))
+        
+        missing = {h: job for cases in wanted.values() for h, job in cases if h not in known}
+        reused_bytes = sum(case_size(known[h]) for cases in wanted.values() for h, _ in cases if h in known)
+        try:
+            results = self.generator.generate(list(missing.values()), reserved_bytes=reused_bytes)
+        except TestGenerationError as e:
+            raise AssignmentImportError(f"Test case generation failed: {e}")
+        known.update(zip(missing.keys(), results))
         
+        return {
+            task_idx: [
+                TestCase(input_data=known[h][0], expected_output=known[h][1], generation_hash=h)
+                for h, _ in cases
+            ]
+            for task_idx, cases in wanted.items()
+        }
+    
+    @transaction.atomic
+    def _create(self, data: Dict, generated: Dict[int, List[TestCase]]) -> Assignment:
+        """Create the assignment, its tasks and all test cases."""
         # Parse datetime fields
         start_time = self._parse_datetime(data.get('start_time'))
         end_time = self._parse_datetime(data.get('end_time'))
@@ -151,25 +262,32 @@ class AssignmentImporter:
         )
         
         # Create tasks
-        for task_data in data['tasks']:
+        test_cases = []
+        for task_idx, task_data in enumerate(data['tasks']):
             task = Task.objects.create(
                 assignment=assignment,
                 title=task_data['title'],
                 description=task_data['description'],
                 task_type=task_data.get('task_type', 'CODING'),
                 validation_type=task_data.get('validation_type', 'MANUAL'),
+                comparator=task_data.get('comparator', 'EXACT'),
+                float_tolerance=task_data.get('float_tolerance', 1e-6),
+                reference_solution=task_data.get('reference_solution', ''),
                 order=task_data.get('order', 0)
             )
             
-            # Create test cases if provided
-            if 'test_cases' in task_data:
-                for tc_data in task_data['test_cases']:
-                    TestCase.objects.create(
-                        task=task,
-                        input_data=tc_data.get('input_data', ''),
-                        expected_output=tc_data['expected_output']
-                    )
+            # Hand-written test cases first, then generated ones
+            for tc_data in task_data.get('test_cases', []):
+                test_cases.append(TestCase(
+                    task=task,
+                    input_data=tc_data.get('input_data', ''),
+                    expected_output=tc_data['expected_output']
+                ))
+            for test_case in generated.get(task_idx, []):
+                test_case.task = task
+                test_cases.append(test_case)
         
+        TestCase.objects.bulk_create(test_cases, batch_size=500)
         return assignment
     
     def import_from_file(self, file_path: str) -> Assignment:
@@ -210,6 +328,15 @@ class AssignmentImporter:
         Raises:
             AssignmentImportError: If import fails
         """
+        return self.import_from_dict(self.read_uploaded_file(uploaded_file))
+    
+    def read_uploaded_file(self, uploaded_file) -> Dict:
+        """
+        Parse a Django uploaded file without importing it.
+        
+        Raises:
+            AssignmentImportError: If the file is not UTF-8 encoded JSON
+        """
         try:
             content = uploaded_file.read().decode('utf-8')
             data = json.loads(content)
@@ -220,4 +347,4 @@ class AssignmentImporter:
         except Exception as e:
             raise AssignmentImportError(f"Error reading file: {e}")
         
-        return self.import_from_dict(data)
+        return data
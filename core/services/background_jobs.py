@@ -0,0 +1,234 @@
+"""
+Background jobs for bulk admin actions.
+
+Admin actions only record the selected rows and return immediately: the
+primary keys of the rows ticked on the page, or, for "select all", the
+changelist's filter and search parameters, so a selection over millions of
+rows costs a few hundred bytes. The worker rebuilds the queryset from the
+parameters through the model's ``ModelAdmin``, accepting only the lookups the
+changelist itself allows. Nothing executable is stored with a job.
+``run_background_jobs`` claims queued jobs with a conditional UPDATE, like
+the judge queue, and runs them:
+
+* REJUDGE: queue auto-validated coding submissions for the server judge.
+* EXPORT: write the selected submissions (without code) to a CSV file in
+  ``EXPORT_DIR``, downloadable from the job's admin page.
+* ARCHIVE: move old attempts of the selected, ended assignments to the
+  archive table (see ``SubmissionArchiver``).
+* IMPORT: import an assignment JSON whose test cases are generated, which
+  runs the teacher's scripts (see ``core.services.test_generation``) for far
+  longer than a request may take. Queued by the import view for the
+  teacher, who is ``created_by``.
+* SIMILARITY: recompute the similar submission pairs of an assignment's
+  coding tasks (see ``core.services.similarity``). Queued by the
+  submissions page when the stored pairs are out of date.
+"""
+import csv
+import os
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.utils import prepare_lookup_value
+from django.contrib.admin.views.main import ERROR_FLAG, IGNORED_PARAMS, PAGE_VAR, SEARCH_VAR
+from django.db.models import QuerySet
+from django.http import QueryDict
+from django.utils import timezone
+
+from core.models import Assignment, BackgroundJob, JudgeJob, Submission
+from core.services.assignment_importer import AssignmentImporter
+from core.services.judge_queue import JudgeQueue
+from core.services.similarity import refresh_report
+from core.services.submission_archiver import SubmissionArchiver
+
+# Rows fetched per database round trip.
+CHUNK_SIZE = 2000
+# Largest selection stored as primary keys; larger ones must be stored as filters.
+MAX_SELECTED_IDS = 10_000
+
+
+class BackgroundJobError(Exception):
+    """Custom exception for background job errors."""
+    pass
+
+
+MODELS = {'REJUDGE': Submission, 'EXPORT': Submission, 'ARCHIVE': Assignment, 'SIMILARITY': Assignment}
+
+
+def changelist_filters(params: QueryDict) -> Dict[str, List[str]]:
+    """The filter and search parameters of a changelist URL's query string."""
+    ignored = (set(IGNORED_PARAMS) | {PAGE_VAR, ERROR_FLAG}) - {SEARCH_VAR}
+    return {key: values for key, values in params.lists() if key not in ignored}
+
+
+def enqueue(kind: str, queryset: QuerySet, user=None, filters: Optional[Dict[str, List[str]]] = None) -> BackgroundJob:
+    """
+    Queue ``kind`` over the rows of ``queryset``.
+
+    Args:
+        kind: One of ``HANDLERS``
+        queryset: The selected rows; stored as primary keys unless ``filters`` is given
+        user: Who queued the job
+        filters: Changelist parameters (see ``changelist_filters``) selecting the
+            rows, stored instead of primary keys for "select all"
+
+    Raises:
+        BackgroundJobError: If the rows do not fit the job, or too many are selected by key
+    """
+    if MODELS.get(kind) is not queryset.model:
+        raise BackgroundJobError(f"A {kind} job cannot run on {queryset.model.__name__} rows")
+    if filters is not None:
+        params = {'filters': filters}
+    else:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:MAX_SELECTED_IDS + 1])
+        if len(ids) > MAX_SELECTED_IDS:
+            raise BackgroundJobError(f"More than {MAX_SELECTED_IDS} rows selected; select them with filters")
+        params = {'ids': ids}
+    return BackgroundJob.objects.create(kind=kind, created_by=user, params=params)
+
+
+def enqueue_import(data: Dict, user) -> BackgroundJob:
+    """Queue the import of validated assignment JSON ``data`` for the teacher ``user``."""
+    return BackgroundJob.objects.create(kind='IMPORT', created_by=user, params={'data': data})
+
+
+def selected(job: BackgroundJob) -> QuerySet:
+    """
+    The rows the job was queued for.
+
+    Raises:
+        BackgroundJobError: If the stored filters use a lookup the changelist does not allow
+    """
+    model = MODELS[job.kind]
+    if 'ids' in job.params:
+        return model.objects.filter(pk__in=job.params['ids'])
+    model_admin = admin.site._registry[model]
+    filters = dict(job.params['filters'])
+    search = filters.pop(SEARCH_VAR, [''])[-1]
+    queryset, may_have_duplicates = model_admin.get_search_results(None, model.objects.all(), search)
+    for key, values in filters.items():
+        if not model_admin.lookup_allowed(key, values[-1], None):
+            raise BackgroundJobError(f"Filtering {model.__name__} rows by '{key}' is not allowed")
+        queryset = queryset.filter(**{key: prepare_lookup_value(key, values[-1])})
+    return queryset.distinct() if may_have_duplicates else queryset
+
+
+def claim(worker: str) -> Optional[BackgroundJob]:
+    """Mark the oldest queued job as running for ``worker`` and return it."""
+    for _ in range(5):  # another worker may claim our pick first
+        job_id = (
+            BackgroundJob.objects.filter(status='QUEUED')
+            .order_by('created_at', 'id').values_list('id', flat=True).first()
+        )
+        if job_id is None:
+            return None
+        if BackgroundJob.objects.filter(id=job_id, status='QUEUED').update(
+            status='RUNNING', worker=worker, started_at=timezone.now(),
+        ):
+            return BackgroundJob.objects.get(id=job_id)
+    return None
+
+
+def requeue_stale(older_than_seconds: float) -> int:
+    """Put jobs back whose worker died while running them."""
+    cutoff = timezone.now() - timedelta(seconds=older_than_seconds)
+    return BackgroundJob.objects.filter(status='RUNNING', started_at__lt=cutoff).update(
+        status='QUEUED', worker='', started_at=None,
+    )
+
+
+def run(job: BackgroundJob) -> None:
+    """Run a claimed job and record its outcome; errors mark the job FAILED."""
+    try:
+        HANDLERS[job.kind](job)
+    except Exception as e:
+        job.status = 'FAILED'
+        job.result = f"{type(e).__name__}: {e}"
+    else:
+        job.status = 'DONE'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'result_path', 'processed', 'finished_at'])
+
+
+def _rejudge(job: BackgroundJob) -> None:
+    submissions = (
+        selected(job)
+        .filter(task__task_type='CODING', task__validation_type='AUTO')
+        .only('id', 'student_id', 'task_id')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    batch = []
+    for submission in submissions:
+        batch.append(submission)
+        if len(batch) == CHUNK_SIZE:
+            job.processed += JudgeQueue.enqueue_many(batch, JudgeJob.PRIORITY_REJUDGE)
+            batch = []
+    if batch:
+        job.processed += JudgeQueue.enqueue_many(batch, JudgeJob.PRIORITY_REJUDGE)
+    job.result = f"Queued {job.processed} submissions for re-judging"
+
+
+EXPORT_COLUMNS = [
+    'id', 'student', 'assignment', 'task', 'auto_result', 'manual_grade', 'submitted_at',
+]
+
+
+def _export(job: BackgroundJob) -> None:
+    os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+    path = os.path.join(settings.EXPORT_DIR, f"submissions_job{job.id}.csv")
+    rows = (
+        selected(job)
+        .order_by('id')
+        .values_list('id', 'student__username', 'task__assignment__title', 'task__title',
+                     'auto_result', 'manual_grade', 'submitted_at')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            job.processed += 1
+    job.result_path = path
+    job.result = f"Exported {job.processed} submissions"
+
+
+def _archive(job: BackgroundJob) -> None:
+    archiver = SubmissionArchiver()
+    skipped = []
+    moved = 0
+    for assignment in selected(job).order_by('id'):
+        if not assignment.end_time or assignment.end_time > timezone.now():
+            skipped.append(assignment.title)
+            continue
+        moved += archiver.archive_assignment(assignment)
+        job.processed += 1
+    job.result = f"Archived {moved} old attempts from {job.processed} assignments"
+    if skipped:
+        job.result += f"; skipped {len(skipped)} that have not ended: {', '.join(skipped[:10])}"
+
+
+def _import(job: BackgroundJob) -> None:
+    if job.created_by is None:
+        raise BackgroundJobError("The teacher who queued the import no longer exists")
+    assignment = AssignmentImporter(job.created_by).import_from_dict(job.params['data'])
+    job.processed = assignment.tasks.count()
+    job.result = f"Imported '{assignment.title}' (ID: {assignment.id}) with {job.processed} tasks"
+
+
+def _similarity(job: BackgroundJob) -> None:
+    for assignment in selected(job):
+        for task in assignment.tasks.filter(task_type='CODING'):
+            refresh_report(task)
+            job.processed += 1
+    job.result = f"Found similar pairs in {job.processed} tasks"
+
+
+HANDLERS: Dict[str, Callable[[BackgroundJob], None]] = {
+    'REJUDGE': _rejudge,
+    'EXPORT': _export,
+    'ARCHIVE': _archive,
+    'IMPORT': _import,
+    'SIMILARITY': _similarity,
+}
@@ -0,0 +1,259 @@
+"""
+Micro-benchmarks for the hot paths of the app.
+
+Each benchmark is registered with ``@benchmark`` and receives a
+``BenchmarkFixture`` holding a synthetic assignment of a given size. The
+runner builds the fixture for every size inside a transaction that is rolled
+back afterwards, times each benchmark ``repeat`` times and reports min, median
+and mean milliseconds and the standard deviation. Results are stored as JSON
+(see ``benchmarks/``) and can be compared against a baseline to catch
+regressions: the fastest runs are compared, and a slowdown only counts when
+it exceeds both the threshold and the run-to-run noise of either side.
+"""
+import platform
+import statistics
+import time
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core.models import Submission, User
+from core.services.assignment_importer import AssignmentImporter
+from core.services.leaderboard import build_leaderboard
+from core.services.test_case_delivery import _cache_key, encoded_test_cases
+
+DEFAULT_SIZES = [100, 1000, 10000]
+TASKS_PER_ASSIGNMENT = 5
+SUBMISSIONS_PER_STUDENT = 5
+
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+class BenchmarkError(Exception):
+    """Custom exception for benchmark errors."""
+    pass
+
+
+def benchmark(name: str):
+    """Register ``func(fixture) -> callable`` under ``name``; the returned callable is timed."""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+class BenchmarkFixture:
+    """
+    Synthetic data set scaled by ``size``.
+
+    ``size`` is the number of submissions for the assignment and the number of
+    test cases spread over its tasks; there is one student per
+    ``SUBMISSIONS_PER_STUDENT`` submissions.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.password = make_password('benchmark-password')
+        self.teacher = User.objects.create(
+            username='bench_teacher', role='TEACHER', is_approved=True, password=self.password
+        )
+        User.objects.bulk_create([
+            User(username=f"bench_student{i}", role='STUDENT', password=self.password)
+            for i in range(max(1, size // SUBMISSIONS_PER_STUDENT))
+        ], batch_size=1000)
+        self.students = list(User.objects.filter(username__startswith='bench_student').order_by('id'))
+        self.assignment = AssignmentImporter(self.teacher).import_from_dict(self.assignment_data('Benchmark'))
+        self.tasks = list(self.assignment.tasks.all())
+
+        results = ['PASS', 'FAIL', 'FAIL', 'ERROR']
+        Submission.objects.bulk_create([
+            Submission(
+                student=self.students[i % len(self.students)],
+                task=self.tasks[i % len(self.tasks)],
+                content=f"a = int(input())\nb = int(input())\nprint(a + b + {i % 3})\n",
+                auto_result=results[i % len(results)],
+                auto_output='Test Case 1 Passed.\n',
+            )
+            for i in range(size)
+        ], batch_size=1000)
+
+    def assignment_data(self, title: str) -> Dict:
+        now = timezone.now()
+        cases_per_task = max(1, self.size // TASKS_PER_ASSIGNMENT)
+        return {
+            'title': title,
+            'description': 'Synthetic assignment created by the benchmark command.',
+            'start_time': (now - timedelta(hours=1)).isoformat(),
+            'end_time': (now + timedelta(hours=3)).isoformat(),
+            'tasks': [
+                {
+                    'title': f"Task {t + 1}",
+                    'description': 'Read two integers and print their sum.',
+                    'task_type': 'CODING',
+                    'validation_type': 'AUTO',
+                    'order': t,
+                    'test_cases': [
+                        {'input_data': f"{c}\n{c * 2}\n", 'expected_output': str(c * 3)}
+                        for c in range(cases_per_task)
+                    ],
+                }
+                for t in range(TASKS_PER_ASSIGNMENT)
+            ],
+        }
+
+
+@benchmark('import_from_dict')
+def bench_import(fixture: BenchmarkFixture):
+    importer = AssignmentImporter(fixture.teacher)
+    data = fixture.assignment_data('Benchmark import')
+    return lambda: importer.import_from_dict(data)
+
+
+@benchmark('leaderboard_aggregation')
+def bench_leaderboard(fixture: BenchmarkFixture):
+    return lambda: build_leaderboard(fixture.assignment, fixture.assignment.tasks.all())
+
+
+@benchmark('test_case_payload')
+def bench_payload(fixture: BenchmarkFixture):
+    # What task_test_cases does on a cache miss: query, serialize and compress each task's test cases.
+    keys = [_cache_key(task.id, 'full', task.test_cases_version) for task in fixture.tasks]
+
+    def encode_all():
+        cache.delete_many(keys)
+        return [encoded_test_cases(task) for task in fixture.tasks]
+    return encode_all
+
+
+@benchmark('leaderboard_render')
+def bench_render(fixture: BenchmarkFixture):
+    context = {
+        'assignment': fixture.assignment,
+        'tasks': fixture.tasks,
+        'students': build_leaderboard(fixture.assignment, fixture.tasks),
+    }
+    return lambda: render_to_string('core/partials/leaderboard_table.html', context)
+
+
+@benchmark('submission_insert')
+def bench_insert(fixture: BenchmarkFixture):
+    student = fixture.students[0]
+    task = fixture.tasks[0]
+    content = "x = int(input())\ny = int(input())\nprint(x + y)\n"
+    return lambda: Submission.objects.create(
+        student=student, task=task, content=content,
+        auto_result='PASS', auto_output='Test Case 1 Passed.\n',
+    )
+
+
+class BenchmarkRunner:
+    """Runs registered benchmarks at several data sizes."""
+
+    def __init__(self, sizes: Optional[List[int]] = None, repeat: int = 5,
+                 only: Optional[List[str]] = None):
+        """
+        Initialize the runner.
+
+        Args:
+            sizes: Data sizes to run every benchmark at
+            repeat: Timed runs per benchmark and size (after one warm-up run)
+            only: Names of the benchmarks to run; all registered ones by default
+
+        Raises:
+            BenchmarkError: If an unknown benchmark is requested
+        """
+        unknown = set(only or []) - set(BENCHMARKS)
+        if unknown:
+            raise BenchmarkError(
+                f"Unknown benchmark(s): {', '.join(sorted(unknown))}. Available: {', '.join(BENCHMARKS)}"
+            )
+        self.sizes = sizes or DEFAULT_SIZES
+        self.repeat = max(1, repeat)
+        self.names = only or list(BENCHMARKS)
+
+    def run(self, progress: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+        """Run every benchmark at every size and return the results document."""
+        results = {}
+        for size in self.sizes:
+            with transaction.atomic():
+                fixture = BenchmarkFixture(size)
+                for name in self.names:
+                    key = f"{name}[{size}]"
+                    results[key] = self._time(BENCHMARKS[name](fixture))
+                    if progress is not None:
+                        progress(key, results[key])
+                transaction.set_rollback(True)
+        return {'meta': self.meta(), 'results': results}
+
+    def _time(self, func: Callable) -> Dict:
+        func()  # warm-up: template loading, query compilation, caches
+        samples = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - started) * 1000)
+        return {
+            'min_ms': round(min(samples), 3),
+            'median_ms': round(statistics.median(samples), 3),
+            'mean_ms': round(statistics.fmean(samples), 3),
+            'stdev_ms': round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        }
+
+    def meta(self) -> Dict:
+        return {
+            'sizes': self.sizes,
+            'repeat': self.repeat,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'machine': platform.machine(),
+        }
+
+
+# Standard deviations of run-to-run noise a slowdown must exceed to count.
+NOISE_SIGMAS = 3.0
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 10.0,
+                    min_delta_ms: float = 1.0) -> List[Dict]:
+    """
+    Compare the fastest runs (``min_ms``) of two results documents.
+
+    The minimum is the timing least disturbed by other work on the machine.
+    A slowdown is a regression only if it exceeds ``threshold`` percent,
+    ``min_delta_ms`` and ``NOISE_SIGMAS`` times the larger standard deviation
+    of the two runs, so a noisy benchmark needs a larger change to fail.
+
+    Args:
+        baseline: Previously stored results
+        current: Fresh results
+        threshold: Percentage slowdown above which a benchmark may count as a regression
+        min_delta_ms: Absolute slowdowns below this are treated as noise
+
+    Returns:
+        One entry per benchmark present in both documents, with the change in
+        percent, the noise allowance and whether it is a regression
+    """
+    rows = []
+    for key, base in baseline.get('results', {}).items():
+        now = current.get('results', {}).get(key)
+        if now is None:
+            continue
+        before, after = base['min_ms'], now['min_ms']
+        change = 100.0 * (after - before) / before if before else 0.0
+        noise_ms = NOISE_SIGMAS * max(base.get('stdev_ms', 0.0), now.get('stdev_ms', 0.0))
+        rows.append({
+            'benchmark': key,
+            'baseline_ms': before,
+            'current_ms': after,
+            'change_pct': round(change, 1),
+            'noise_ms': round(noise_ms, 3),
+            'regression': change > threshold and after - before >= max(min_delta_ms, noise_ms),
+        })
+    return rows
@@ -0,0 +1,197 @@
+"""
+Output comparators shared by the server judge and the browser runner.
+
+``core/static/core/js/comparators.js`` implements the same rules and the
+same excerpt format; keep the two in step.
+
+Expected and actual output are read chunk by chunk, split into items (lines
+or tokens, depending on the task's comparator) and compared item by item.
+Comparison stops at the first mismatch, so a solution printing megabytes is
+rejected after reading only up to its first wrong line. A mismatch is
+reported as a bounded excerpt: the line number and up to ``CONTEXT_LINES``
+preceding lines of both outputs, each cut to ``EXCERPT_LINE_CHARS``.
+
+Comparators:
+
+* EXACT: the whole output after trimming leading and trailing whitespace
+  (the original ``actual.trim() === expected.trim()`` rule).
+* WHITESPACE: line by line, with runs of whitespace collapsed and blank
+  lines ignored.
+* TOKEN: whitespace-separated tokens in order; line breaks do not matter.
+* FLOAT: like TOKEN, but numeric tokens may differ by the task's tolerance
+  (absolute, or relative for values larger than 1).
+"""
+import re
+from collections import deque
+from itertools import zip_longest
+from typing import IO, Iterable, Iterator, Optional, Tuple, Union
+
+CHUNK_SIZE = 64 * 1024
+CONTEXT_LINES = 2
+EXCERPT_LINE_CHARS = 120
+# Upper bound for a stored auto_output, whoever produced it.
+MAX_AUTO_OUTPUT_CHARS = 4000
+
+# Deliberately narrower than float(): no "nan", "inf" or "1_000", matching the JS twin.
+NUMBER_RE = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\Z')
+
+Source = Union[str, IO[str]]
+Item = Tuple[int, str]
+
+
+def iter_chunks(source: Source) -> Iterator[str]:
+    """Yield a string, or the contents of a text file, in ``CHUNK_SIZE`` pieces."""
+    if isinstance(source, str):
+        for start in range(0, len(source), CHUNK_SIZE):
+            yield source[start:start + CHUNK_SIZE]
+        return
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + '…'
+
+
+class _Lines:
+    """Splits chunks into numbered lines and remembers the last few for excerpts."""
+
+    def __init__(self, source: Source):
+        self.source = source
+        self.recent = deque(maxlen=CONTEXT_LINES + 16)
+
+    def __iter__(self) -> Iterator[Item]:
+        lineno = 0
+        partial = ''
+        for chunk in iter_chunks(self.source):
+            lines = (partial + chunk).split('\n')
+            partial = lines.pop()
+            for line in lines:
+                lineno += 1
+                self.recent.append((lineno, truncate(line, EXCERPT_LINE_CHARS)))
+                yield lineno, line
+        if partial:
+            lineno += 1
+            self.recent.append((lineno, truncate(partial, EXCERPT_LINE_CHARS)))
+            yield lineno, partial
+
+    def context(self, lineno: int) -> list:
+        return [(n, text) for n, text in self.recent if lineno - CONTEXT_LINES <= n <= lineno]
+
+
+class Comparator:
+    """Base class: ``items`` turns numbered lines into the units that are compared."""
+
+    def items(self, lines: Iterable[Item]) -> Iterator[Item]:
+        raise NotImplementedError
+
+    def equal(self, expected: str, actual: str) -> bool:
+        return expected == actual
+
+    def compare(self, expected: Source, actual: Source) -> Optional[str]:
+        """
+        Compare two outputs.
+
+        Returns:
+            None if they match, otherwise the bounded mismatch excerpt
+        """
+        expected_lines, actual_lines = _Lines(expected), _Lines(actual)
+        pairs = zip_longest(self.items(expected_lines), self.items(actual_lines))
+        for expected_item, actual_item in pairs:
+            if expected_item is None or actual_item is None or not self.equal(expected_item[1], actual_item[1]):
+                return self._excerpt(expected_lines, expected_item, actual_lines, actual_item)
+        return None
+
+    @staticmethod
+    def _excerpt(expected_lines: _Lines, expected_item: Optional[Item],
+                 actual_lines: _Lines, actual_item: Optional[Item]) -> str:
+        line = actual_item[0] if actual_item else (expected_item[0] if expected_item else 1)
+        parts = [f"First difference at line {line}."]
+        for label, lines, item in (('Expected', expected_lines, expected_item),
+                                   ('Actual', actual_lines, actual_item)):
+            parts.append(f"{label}:")
+            if item is None:
+                last = lines.recent[-1][0] if lines.recent else 0
+                parts.extend(f"  {n}| {text}" for n, text in lines.context(last))
+                parts.append("  (end of output)")
+            else:
+                context = lines.context(item[0])
+                if not context or context[-1][0] != item[0]:
+                    context.append((item[0], truncate(item[1], EXCERPT_LINE_CHARS)))
+                parts.extend(f"  {n}| {text}" for n, text in context)
+        return '\n'.join(parts)
+
+
+class ExactComparator(Comparator):
+    """Line by line after trimming the output as a whole."""
+
+    def items(self, lines):
+        started = False
+        last = None
+        blank = []
+        for lineno, line in lines:
+            if not started:
+                if not line.strip():
+                    continue
+                started = True
+                line = line.lstrip()
+            if not line.strip():
+                blank.append((lineno, line))
+                continue
+            if last is not None:
+                yield last
+            yield from blank
+            blank = []
+            last = (lineno, line)
+        if last is not None:
+            yield last[0], last[1].rstrip()
+
+
+class WhitespaceComparator(Comparator):
+    def items(self, lines):
+        for lineno, line in lines:
+            normalized = ' '.join(line.split())
+            if normalized:
+                yield lineno, normalized
+
+
+class TokenComparator(Comparator):
+    def items(self, lines):
+        for lineno, line in lines:
+            for token in line.split():
+                yield lineno, token
+
+
+class FloatComparator(TokenComparator):
+    def __init__(self, tolerance: float):
+        self.tolerance = tolerance
+
+    def equal(self, expected, actual):
+        if expected == actual:
+            return True
+        if not (NUMBER_RE.match(expected) and NUMBER_RE.match(actual)):
+            return False
+        a, b = float(actual), float(expected)
+        return abs(a - b) <= self.tolerance * max(1.0, abs(b))
+
+
+def get_comparator(name: str, tolerance: float = 1e-6) -> Comparator:
+    """Comparator for a ``Task.comparator`` value (unknown names compare exactly)."""
+    if name == 'WHITESPACE':
+        return WhitespaceComparator()
+    if name == 'TOKEN':
+        return TokenComparator()
+    if name == 'FLOAT':
+        return FloatComparator(tolerance)
+    return ExactComparator()
+
+
+def bound_output(text: Optional[str]) -> str:
+    """Cap an ``auto_output`` at ``MAX_AUTO_OUTPUT_CHARS``."""
+    text = text or ''
+    if len(text) <= MAX_AUTO_OUTPUT_CHARS:
+        return text
+    return text[:MAX_AUTO_OUTPUT_CHARS] + '\n… (truncated)'
@@ -0,0 +1,303 @@
+"""
+Server-side judge for auto-validated coding tasks.
+
+Runs a submission against its task's test cases in a separate Python process,
+with the same semantics as the browser runner in ``assignment_detail.html``:
+output is compared with the task's comparator (streamed from the stdout
+file, see ``services.comparators``), test cases run in ``judge_order``,
+judging stops at the first failing one and ``auto_output`` uses the same
+wording and bounded excerpt.
+CPU time, wall time, peak RSS and output size of every run are reported so
+they can be stored as ``TestCaseResult`` rows.
+
+Solutions are untrusted code. Each run happens inside a bubblewrap (``bwrap``)
+sandbox, as ``JUDGE_SANDBOX`` selects by default: a new user, network, PID
+and IPC namespace, running as ``nobody``, with the system directories and the
+Python installation mounted read-only, the solution's directory mounted
+read-only and a private tmpfs as the only writable place. Resource limits are
+applied inside the sandbox. ``JUDGE_SANDBOX=none`` runs solutions with the
+resource limits only and is refused unless ``DEBUG`` is on.
+"""
+import math
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from core.models import Submission
+from core.services.comparators import EXCERPT_LINE_CHARS, bound_output, get_comparator, truncate
+from core.services.test_ordering import judge_order
+
+
+class JudgeError(Exception):
+    """Custom exception for judge errors."""
+    pass
+
+
+# Applies resource limits inside the child, seeds ``random`` if asked to, then
+# runs the script as __main__ with the remaining arguments as its sys.argv.
+# (preexec_fn is not safe in the multi-threaded judge workers.)
+_BOOTSTRAP = """
+import os, runpy, sys
+path, cpu, memory, output, seed = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]), sys.argv[5]
+if os.name == 'posix':
+    import resource
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (output, output))
+if seed:
+    import random
+    random.seed(seed)
+sys.argv = sys.argv[6:] or [path]
+runpy.run_path(path, run_name='__main__')
+"""
+
+
+_CHILD_ENV = {'PYTHONIOENCODING': 'utf-8'}
+# Where the solution's directory is mounted inside the sandbox.
+_SANDBOX_DIR = '/sandbox'
+# Read-only system directories; the Python installation is added to these.
+_SANDBOX_SYSTEM_DIRS = ('/usr', '/bin', '/lib', '/lib64', '/etc/alternatives')
+_SANDBOX_NOBODY = '65534'
+
+
+def sandbox_command(command: List[str], workdir: str) -> List[str]:
+    """
+    Wrap a command so it runs in the ``JUDGE_SANDBOX`` sandbox.
+
+    Args:
+        command: The command, referring to files in ``workdir`` by their
+            path inside the sandbox (see ``sandbox_path``)
+        workdir: Directory mounted read-only into the sandbox, and the
+            working directory of the command
+
+    Returns:
+        The command to run with ``cwd=workdir``
+
+    Raises:
+        JudgeError: If the sandbox is not available, or disabled outside DEBUG
+    """
+    kind = settings.JUDGE_SANDBOX
+    if kind == 'none':
+        if not settings.DEBUG:
+            raise JudgeError("JUDGE_SANDBOX=none runs untrusted code unconfined; it is only allowed with DEBUG on")
+        return command
+    if kind != 'bwrap':
+        raise JudgeError(f"Unknown JUDGE_SANDBOX '{kind}'. Must be one of: bwrap, none")
+    bwrap = shutil.which('bwrap')
+    if bwrap is None:
+        raise JudgeError("JUDGE_SANDBOX=bwrap but bubblewrap is not installed")
+    wrapped = [
+        bwrap, '--unshare-all', '--unshare-user', '--uid', _SANDBOX_NOBODY, '--gid', _SANDBOX_NOBODY,
+        '--die-with-parent', '--new-session', '--clearenv',
+    ]
+    for directory in dict.fromkeys(_SANDBOX_SYSTEM_DIRS + (sys.base_prefix, sys.prefix)):
+        wrapped += ['--ro-bind-try', directory, directory]
+    wrapped += [
+        '--proc', '/proc', '--dev', '/dev', '--tmpfs', '/tmp',
+        '--ro-bind', workdir, _SANDBOX_DIR, '--chdir', _SANDBOX_DIR,
+    ]
+    for name, value in _CHILD_ENV.items():
+        wrapped += ['--setenv', name, value]
+    return wrapped + ['--'] + command
+
+
+def sandbox_path(workdir: str, name: str) -> str:
+    """Path of ``workdir``/``name`` as the sandboxed process sees it."""
+    if settings.JUDGE_SANDBOX == 'none':
+        return os.path.join(workdir, name)
+    return f"{_SANDBOX_DIR}/{name}"
+
+# Only the end of stderr is read; the last line is the exception message.
+_STDERR_TAIL_BYTES = 8192
+
+
+class JudgeRunner:
+    """Judges one submission at a time; safe to share between worker threads."""
+
+    def __init__(self, time_limit: Optional[float] = None, memory_limit_mb: Optional[int] = None,
+                 output_limit_mb: Optional[int] = None):
+        """
+        Initialize the runner.
+
+        Args:
+            time_limit: Wall-clock seconds allowed per test case; by default each
+                task's ``effective_time_limit()``
+            memory_limit_mb: Address-space limit of the solution process (POSIX only)
+            output_limit_mb: Largest stdout/stderr the solution may write (POSIX only)
+        """
+        self.time_limit = time_limit
+        self.memory_limit_mb = memory_limit_mb or settings.JUDGE_MEMORY_LIMIT_MB
+        self.output_limit_mb = output_limit_mb or settings.JUDGE_OUTPUT_LIMIT_MB
+
+    def judge(self, submission: Submission) -> Tuple[str, str, List[Dict]]:
+        """
+        Run a submission against all test cases of its task.
+
+        Args:
+            submission: The submission to judge (only ``task`` and ``content`` are used)
+
+        Returns:
+            (auto_result, auto_output, runs): the verdict as the browser runner
+            would report it, plus one dict per executed test case with
+            test_case_id, verdict, cpu_ms, wall_ms, peak_rss_kb and output_bytes
+
+        Raises:
+            JudgeError: If the solution process cannot be started, or the sandbox
+                is not available
+        """
+        result, output, runs = self._judge(submission)
+        return result, bound_output(output), runs
+
+    def run_script(self, source: str, input_data: str = '', argv: Optional[List[str]] = None,
+                   seed: str = '', name: str = 'script') -> str:
+        """
+        Run a script once, in the same sandbox and with the same limits as a solution.
+
+        Args:
+            source: Python source to run as ``__main__``
+            input_data: Its stdin
+            argv: Its ``sys.argv``; by default the script's path
+            seed: Seed for ``random`` before the script starts (unseeded if empty)
+            name: What to call the script in error messages
+
+        Returns:
+            What the script wrote to stdout
+
+        Raises:
+            JudgeError: If the script cannot be started, fails or exceeds a limit
+        """
+        time_limit = self.time_limit or settings.JUDGE_TIME_LIMIT_SECONDS
+        with tempfile.TemporaryDirectory(prefix='judge_') as workdir:
+            path = os.path.join(workdir, 'script.py')
+            stdout_path = os.path.join(workdir, 'stdout.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            run = self._run(path, workdir, input_data, time_limit, stdout_path, argv=argv, seed=seed)
+            if run['timed_out']:
+                raise JudgeError(f"{name} took longer than {time_limit:g}s")
+            if run['returncode'] != 0:
+                lines = run['stderr'].strip().splitlines()
+                message = lines[-1] if lines else f"exited with status {run['returncode']}"
+                raise JudgeError(f"{name} failed: {message}")
+            with open(stdout_path, encoding='utf-8', errors='replace', newline='') as stdout:
+                return stdout.read()
+
+    def _judge(self, submission: Submission) -> Tuple[str, str, List[Dict]]:
+        task = submission.task
+        time_limit = self.time_limit or task.effective_time_limit()
+        comparator = get_comparator(task.comparator, task.float_tolerance)
+        output_limit = self.output_limit_mb * 1024 * 1024
+        test_cases = judge_order(task.test_cases.all()).values_list('id', 'input_data', 'expected_output')
+        output = ''
+        runs = []
+        with tempfile.TemporaryDirectory(prefix='judge_') as workdir:
+            path = os.path.join(workdir, 'solution.py')
+            stdout_path = os.path.join(workdir, 'stdout.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(submission.content or '')
+
+            for index, (test_case_id, input_data, expected_output) in enumerate(test_cases, start=1):
+                run = self._run(path, workdir, input_data, time_limit, stdout_path)
+                stats = {
+                    'test_case_id': test_case_id,
+                    'cpu_ms': run['cpu_ms'],
+                    'wall_ms': run['wall_ms'],
+                    'peak_rss_kb': run['peak_rss_kb'],
+                    'output_bytes': run['output_bytes'],
+                }
+                runs.append(stats)
+                if run['timed_out']:
+                    stats['verdict'] = 'TLE'
+                    return 'ERROR', f"Time limit exceeded on test case {index} ({time_limit:g}s)", runs
+                # Python ignores SIGXFSZ, so hitting the limit usually shows up as an OSError exit.
+                if run['returncode'] != 0 and (run['output_bytes'] >= output_limit
+                                               or run['returncode'] == -getattr(signal, 'SIGXFSZ', 0)):
+                    stats['verdict'] = 'ERROR'
+                    return 'ERROR', f"Output limit exceeded on test case {index} ({self.output_limit_mb} MB)", runs
+                if run['returncode'] != 0:
+                    stats['verdict'] = 'ERROR'
+                    lines = run['stderr'].strip().splitlines()
+                    message = lines[-1] if lines else f"Exited with status {run['returncode']}"
+                    return 'ERROR', truncate(message, EXCERPT_LINE_CHARS * 4), runs
+
+                # newline='' keeps "\r" as the browser runner sees it.
+                with open(stdout_path, encoding='utf-8', errors='replace', newline='') as stdout:
+                    mismatch = comparator.compare(expected_output, stdout)
+                if mismatch:
+                    stats['verdict'] = 'FAIL'
+                    output += f"Test Case {index} Failed.\n{mismatch}\n\n"
+                    return 'FAIL', output, runs
+                stats['verdict'] = 'PASS'
+                output += f"Test Case {index} Passed.\n"
+        return 'PASS', output, runs
+
+    def _run(self, path: str, workdir: str, input_data: str, time_limit: float, stdout_path: str,
+             argv: Optional[List[str]] = None, seed: str = '') -> Dict:
+        """Run the solution once into ``stdout_path``, measuring wall time and (where available) rusage."""
+        command = sandbox_command([
+            sys.executable, '-I', '-c', _BOOTSTRAP, sandbox_path(workdir, os.path.basename(path)),
+            str(math.ceil(time_limit) + 1), str(self.memory_limit_mb * 1024 * 1024),
+            str(self.output_limit_mb * 1024 * 1024), seed, *(argv or []),
+        ], workdir)
+        with tempfile.TemporaryFile('w+', encoding='utf-8', dir=workdir) as stdin, \
+                open(stdout_path, 'wb') as stdout, \
+                tempfile.TemporaryFile('w+b', dir=workdir) as stderr:
+            stdin.write(input_data or '')
+            stdin.seek(0)
+            started = time.perf_counter()
+            if not hasattr(os, 'wait4'):
+                try:
+                    completed = subprocess.run(
+                        command, stdin=stdin, stdout=stdout, stderr=stderr, cwd=workdir,
+                        timeout=time_limit, env=_CHILD_ENV,
+                    )
+                    returncode, timed_out = completed.returncode, False
+                except subprocess.TimeoutExpired:
+                    returncode, timed_out = -1, True
+                except OSError as e:
+                    raise JudgeError(f"Cannot start the solution process: {e}")
+                return self._result(returncode, stdout, stderr, started, None, timed_out)
+
+            # Reaping the child with wait4() gives us its rusage.
+            try:
+                process = subprocess.Popen(
+                    command, stdin=stdin, stdout=stdout, stderr=stderr, cwd=workdir, env=_CHILD_ENV,
+                )
+            except OSError as e:
+                raise JudgeError(f"Cannot start the solution process: {e}")
+            killed = threading.Event()
+            killer = threading.Timer(time_limit, lambda: (killed.set(), process.kill()))
+            killer.start()
+            try:
+                _, status, usage = os.wait4(process.pid, 0)
+            finally:
+                killer.cancel()
+            process.returncode = os.waitstatus_to_exitcode(status)
+            return self._result(
+                process.returncode, stdout, stderr, started, usage,
+                timed_out=killed.is_set() or process.returncode == -getattr(signal, 'SIGXCPU', 0),
+            )
+
+    @staticmethod
+    def _result(returncode: int, stdout, stderr, started: float, usage, timed_out: bool) -> Dict:
+        wall_ms = (time.perf_counter() - started) * 1000
+        size = os.fstat(stderr.fileno()).st_size
+        stderr.seek(max(0, size - _STDERR_TAIL_BYTES))
+        return {
+            'returncode': returncode,
+            'stderr': stderr.read().decode('utf-8', errors='replace'),
+            'output_bytes': os.fstat(stdout.fileno()).st_size,
+            'timed_out': timed_out,
+            'wall_ms': wall_ms,
+            'cpu_ms': (usage.ru_utime + usage.ru_stime) * 1000 if usage else None,
+            # ru_maxrss is in kilobytes on Linux (bytes on macOS).
+            'peak_rss_kb': (usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss) if usage else None,
+        }
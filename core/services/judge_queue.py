@@ -0,0 +1,236 @@
+"""
+Database-backed judge queue with priority classes and fair-share scheduling.
+
+Jobs are picked in three steps:
+
+1. Priority class: live assignments first, then manual re-judges, then
+   background verification of results reported by the browser.
+2. Fair share: students already holding ``JUDGE_MAX_SHARE`` of the workers
+   are skipped, so one student resubmitting in a loop cannot take over.
+   Running jobs are counted across all processes and the share is taken of
+   ``JUDGE_TOTAL_WORKERS``, the workers of all ``run_judge`` processes. Two
+   processes claiming at the same moment can each let a student exceed the
+   share by one job.
+3. Shortest expected job first within the class, using each task's average
+   judge runtime; a job waiting longer than ``JUDGE_MAX_WAIT_SECONDS`` is
+   taken first regardless, so long tasks cannot starve.
+
+Jobs are claimed with a conditional UPDATE, so several ``run_judge``
+processes can share one queue without row locks.
+"""
+import statistics
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db.models import Avg, Count, Min
+from django.utils import timezone
+
+from core.models import JudgeJob, Submission, TestCaseResult
+from core.services.test_ordering import record_runs
+
+PRIORITY_CLASSES = [JudgeJob.PRIORITY_LIVE, JudgeJob.PRIORITY_REJUDGE, JudgeJob.PRIORITY_BACKGROUND]
+
+
+class JudgeQueue:
+    """Enqueues submissions and hands the next job to judge workers."""
+
+    # Queued jobs per class considered for shortest-job-first ordering.
+    CANDIDATE_WINDOW = 200
+    # Seconds the per-task runtime estimates are reused.
+    ESTIMATE_TTL = 30
+
+    def __init__(self, total_workers: Optional[int] = None, max_share: Optional[float] = None,
+                 max_wait_seconds: Optional[float] = None):
+        """
+        Initialize the queue.
+
+        Args:
+            total_workers: Number of judge workers sharing this queue, in all
+                processes; by default ``JUDGE_TOTAL_WORKERS``
+            max_share: Fraction of the workers one student may occupy at once
+            max_wait_seconds: Queue wait after which a job is served first in its class
+        """
+        self.total_workers = settings.JUDGE_TOTAL_WORKERS if total_workers is None else total_workers
+        self.max_share = settings.JUDGE_MAX_SHARE if max_share is None else max_share
+        self.max_wait = timedelta(seconds=settings.JUDGE_MAX_WAIT_SECONDS if max_wait_seconds is None else max_wait_seconds)
+        self._estimates: Dict[int, float] = {}
+        self._default_estimate = settings.JUDGE_DEFAULT_RUNTIME_MS
+        self._estimated_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enqueue(submission: Submission, priority: Optional[int] = None) -> JudgeJob:
+        """
+        Queue a submission for judging.
+
+        Args:
+            submission: The submission to judge
+            priority: Priority class; by default live assignments get PRIORITY_LIVE
+                and everything else PRIORITY_BACKGROUND
+        """
+        if priority is None:
+            live = submission.task.assignment.is_live()
+            priority = JudgeJob.PRIORITY_LIVE if live else JudgeJob.PRIORITY_BACKGROUND
+        return JudgeJob.objects.create(
+            submission=submission, student_id=submission.student_id,
+            task_id=submission.task_id, priority=priority,
+        )
+
+    @staticmethod
+    def enqueue_many(submissions: Iterable[Submission], priority: int) -> int:
+        """Queue many submissions in one class (e.g. a bulk re-judge); returns the count."""
+        jobs = JudgeJob.objects.bulk_create([
+            JudgeJob(submission=s, student_id=s.student_id, task_id=s.task_id, priority=priority)
+            for s in submissions
+        ], batch_size=1000)
+        return len(jobs)
+
+    def share_limit(self) -> int:
+        """Maximum number of running jobs per student."""
+        return max(1, int(self.total_workers * self.max_share))
+
+    def expected_runtime_ms(self, task_id: int) -> float:
+        with self._lock:
+            if time.monotonic() - self._estimated_at > self.ESTIMATE_TTL:
+                self._refresh_estimates()
+            return self._estimates.get(task_id, self._default_estimate)
+
+    def _refresh_estimates(self) -> None:
+        recent = timezone.now() - timedelta(days=7)
+        rows = (
+            JudgeJob.objects
+            .filter(status='DONE', finished_at__gte=recent, runtime_ms__isnull=False)
+            .values('task_id')
+            .annotate(avg=Avg('runtime_ms'))
+        )
+        self._estimates = {row['task_id']: row['avg'] for row in rows}
+        if self._estimates:
+            self._default_estimate = statistics.median(self._estimates.values())
+        self._estimated_at = time.monotonic()
+
+    def claim(self, worker: str) -> Optional[JudgeJob]:
+        """
+        Mark the next job as running for ``worker`` and return it.
+
+        Returns:
+            The claimed job (with submission and task loaded), or None if
+            nothing can be scheduled right now
+        """
+        for _ in range(5):  # another worker may claim our pick first
+            job_id = self._pick_next()
+            if job_id is None:
+                return None
+            claimed = JudgeJob.objects.filter(id=job_id, status='QUEUED').update(
+                status='RUNNING', worker=worker, started_at=timezone.now(),
+            )
+            if claimed:
+                return JudgeJob.objects.select_related('submission__task__assignment').get(id=job_id)
+        return None
+
+    def _pick_next(self) -> Optional[int]:
+        limit = self.share_limit()
+        running = (
+            JudgeJob.objects.filter(status='RUNNING')
+            .values('student_id').annotate(jobs=Count('id'))
+        )
+        saturated = [row['student_id'] for row in running if row['jobs'] >= limit]
+        now = timezone.now()
+
+        for priority in PRIORITY_CLASSES:
+            candidates = list(
+                JudgeJob.objects
+                .filter(status='QUEUED', priority=priority)
+                .exclude(student_id__in=saturated)
+                .order_by('enqueued_at', 'id')
+                .values_list('id', 'task_id', 'enqueued_at')[:self.CANDIDATE_WINDOW]
+            )
+            if not candidates:
+                continue
+            oldest = candidates[0]
+            if now - oldest[2] >= self.max_wait:
+                return oldest[0]
+            return min(candidates, key=lambda c: (self.expected_runtime_ms(c[1]), c[2]))[0]
+        return None
+
+    @staticmethod
+    def finish(job: JudgeJob, result: str, output: str, runtime_ms: float,
+               runs: Optional[List[Dict]] = None) -> None:
+        """Store the verdict and per-test-case results, update test-case statistics and complete the job."""
+        submission = job.submission
+        if runs:
+            # Replace the runs of a previous judge of this submission (re-judge).
+            TestCaseResult.objects.filter(submission=submission).delete()
+            TestCaseResult.objects.bulk_create([
+                TestCaseResult(submission=submission, **run) for run in runs
+            ])
+            record_runs(submission.task_id, runs)
+        submission.auto_result = result
+        submission.auto_output = output
+        submission.save(update_fields=['auto_result', 'auto_output'])
+        JudgeJob.objects.filter(id=job.id).update(
+            status='DONE', finished_at=timezone.now(), runtime_ms=runtime_ms,
+        )
+
+    @staticmethod
+    def fail(job: JudgeJob, error: str) -> None:
+        """Complete a job that could not be judged."""
+        JudgeJob.objects.filter(id=job.id).update(status='FAILED', finished_at=timezone.now(), error=error)
+
+    @staticmethod
+    def requeue_stale(older_than_seconds: float) -> int:
+        """Put jobs back whose worker died while running them."""
+        cutoff = timezone.now() - timedelta(seconds=older_than_seconds)
+        return JudgeJob.objects.filter(status='RUNNING', started_at__lt=cutoff).update(
+            status='QUEUED', worker='', started_at=None,
+        )
+
+    @staticmethod
+    def wait_stats(since_minutes: int = 60) -> List[Dict]:
+        """
+        Queue wait per priority class.
+
+        Args:
+            since_minutes: Window of started jobs the percentiles are computed over
+
+        Returns:
+            One entry per class with the current queue length, the wait of the
+            oldest queued job and p50/p95/mean wait of recently started jobs (seconds)
+        """
+        import numpy as np  # only needed here; keeps numpy out of web worker startup
+
+        now = timezone.now()
+        queued = {
+            row['priority']: row
+            for row in JudgeJob.objects.filter(status='QUEUED').values('priority').annotate(
+                queued=Count('id'), oldest=Min('enqueued_at'),
+            )
+        }
+        waits = {priority: [] for priority in PRIORITY_CLASSES}
+        started = (
+            JudgeJob.objects
+            .filter(started_at__gte=now - timedelta(minutes=since_minutes))
+            .values_list('priority', 'enqueued_at', 'started_at')
+        )
+        for priority, enqueued_at, started_at in started.iterator(chunk_size=2000):
+            waits[priority].append((started_at - enqueued_at).total_seconds())
+
+        labels = dict(JudgeJob.PRIORITY_CHOICES)
+        stats = []
+        for priority in PRIORITY_CLASSES:
+            samples = waits[priority]
+            p50, p95 = np.percentile(samples, [50, 95]) if samples else (0.0, 0.0)
+            current = queued.get(priority, {})
+            stats.append({
+                'priority': priority,
+                'label': labels[priority],
+                'queued': current.get('queued', 0),
+                'oldest_wait_s': round((now - current['oldest']).total_seconds(), 1) if current else 0.0,
+                'started': len(samples),
+                'p50_wait_s': round(float(p50), 2),
+                'p95_wait_s': round(float(p95), 2),
+                'mean_wait_s': round(statistics.fmean(samples), 2) if samples else 0.0,
+            })
+        return stats
@@ -0,0 +1,102 @@
+"""
+Leaderboard aggregation and assignment payload helpers shared by views,
+commands and benchmarks.
+
+Every helper has an ``a``-prefixed twin for the async views; both share the
+same queries and pure aggregation code.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.models import Assignment, Submission, Task, TestCase
+from core.services.test_ordering import judge_order
+
+
+def _submission_rows(assignment: Assignment, submitted_before: Optional[datetime] = None):
+    submissions = Submission.objects.filter(task__assignment=assignment)
+    if submitted_before is not None:
+        submissions = submissions.filter(submitted_at__lt=submitted_before)
+    return submissions.values_list('student_id', 'student__username', 'task_id', 'auto_result')
+
+
+def rank_students(rows: Iterable[Tuple], tasks: Iterable[Task]) -> List[Dict]:
+    """
+    Aggregate the best result per student and task.
+
+    Args:
+        rows: (student_id, username, task_id, auto_result) tuples
+        tasks: The assignment's tasks, in display order
+
+    Returns:
+        One dict per student with username, solved_count and task_results,
+        sorted by solved_count (desc)
+    """
+    task_ids = [t.id for t in tasks]
+    students_data = {}
+    for student_id, username, task_id, auto_result in rows:
+        entry = students_data.get(student_id)
+        if entry is None:
+            entry = students_data[student_id] = {
+                'username': username,
+                'solved_count': 0,
+                'task_results': dict.fromkeys(task_ids, 'PENDING'),
+            }
+
+        # Keep track of the best result for each task for this student
+        current_status = entry['task_results'].get(task_id, 'PENDING')
+        if auto_result == 'PASS':
+            if current_status != 'PASS':
+                entry['solved_count'] += 1
+            entry['task_results'][task_id] = 'PASS'
+        elif auto_result == 'FAIL' and current_status != 'PASS':
+            entry['task_results'][task_id] = 'FAIL'
+
+    # Sort students by solved_count (desc)
+    return sorted(students_data.values(), key=lambda x: x['solved_count'], reverse=True)
+
+
+def build_leaderboard(assignment: Assignment, tasks: Iterable[Task],
+                      submitted_before: Optional[datetime] = None) -> List[Dict]:
+    """
+    Leaderboard rows of an assignment, see ``rank_students``.
+
+    ``submitted_before`` leaves out later submissions (frozen scoreboards).
+    """
+    return rank_students(_submission_rows(assignment, submitted_before), tasks)
+
+
+async def abuild_leaderboard(assignment: Assignment, tasks: List[Task]) -> List[Dict]:
+    """Async version of ``build_leaderboard``; ``tasks`` must already be evaluated."""
+    return rank_students([row async for row in _submission_rows(assignment)], tasks)
+
+
+def _test_case_rows(tasks: List[Task]):
+    auto_ids = [t.id for t in tasks if t.task_type == 'CODING' and t.validation_type == 'AUTO']
+    return (
+        judge_order(TestCase.objects.filter(task_id__in=auto_ids))
+        .values_list('task_id', 'id', 'input_data', 'expected_output')
+    )
+
+
+def _tasks_payload(tasks: List[Task], test_cases: Iterable[Tuple]) -> List[Dict]:
+    cases_by_task = {t.id: [] for t in tasks}
+    for task_id, test_case_id, input_data, expected_output in test_cases:
+        cases_by_task[task_id].append({
+            'id': test_case_id,
+            'input': input_data,
+            'output': expected_output,
+        })
+    return [
+        {'id': t.id, 'comparator': t.comparator, 'float_tolerance': t.float_tolerance, 'test_cases': cases_by_task[t.id]}
+        for t in tasks
+    ]
+
+
+def build_task_payload(task: Task) -> Dict:
+    """Test cases of a task in judge order, as sent to the browser runner (see ``test_case_delivery``)."""
+    return _tasks_payload([task], _test_case_rows([task]))[0]
+
+
+async def abuild_task_payload(task: Task) -> Dict:
+    """Async version of ``build_task_payload``."""
+    return _tasks_payload([task], [row async for row in _test_case_rows([task])])[0]
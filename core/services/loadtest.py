@@ -0,0 +1,394 @@
+"""
+Synthetic data seeding and in-process traffic replay for load testing.
+
+``LoadTestSeeder`` creates teachers, students, assignments (through
+``AssignmentImporter``) and submission histories. ``TrafficReplayer`` then
+drives an exam-rush mix of requests through Django's request handler with
+many concurrent clients and records latency and query counts per view;
+``AsyncTrafficReplayer`` does the same through the ASGI handler.
+"""
+import asyncio
+import contextlib
+import contextvars
+import math
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+from django.utils import timezone
+
+from core.models import Assignment, Submission, User
+from core.services.assignment_importer import AssignmentImporter
+
+USERNAME_PREFIX = 'loadtest_'
+PASSWORD = 'loadtest-password'
+
+# (view, weight) pairs of what a student does during an exam once logged in.
+EXAM_RUSH_MIX = [
+    ('dashboard', 10),
+    ('assignment_detail', 20),
+    ('leaderboard', 35),
+    ('submit_task', 30),
+    ('view_submissions', 5),
+]
+
+# Only the student side of the exam rush; what the async views are for.
+STUDENT_MIX = [(view, weight) for view, weight in EXAM_RUSH_MIX if view != 'view_submissions']
+
+# Throttled (429) and shed (503) answers return before doing any work; counting
+# them as served would reward a server for turning clients away.
+REJECTED_STATUSES = (429, 503)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)]
+
+
+class LoadTestSeeder:
+    """Creates synthetic users, assignments and submission histories."""
+
+    def __init__(self, teachers: int = 2, students: int = 500, assignments: int = 2,
+                 tasks_per_assignment: int = 4, test_cases_per_task: int = 5,
+                 history_per_student: int = 5, seed: int = 0):
+        self.teachers = teachers
+        self.students = students
+        self.assignments = assignments
+        self.tasks_per_assignment = tasks_per_assignment
+        self.test_cases_per_task = test_cases_per_task
+        self.history_per_student = history_per_student
+        self.random = random.Random(seed)
+
+    def seed(self) -> Dict:
+        """Create the data set and return the ids the replayer needs."""
+        # One hash for everyone: hashing per user would dominate seeding time.
+        password = make_password(PASSWORD)
+        teachers = User.objects.bulk_create([
+            User(username=f"{USERNAME_PREFIX}teacher{i}", role='TEACHER', is_approved=True, password=password)
+            for i in range(self.teachers)
+        ])
+        students = User.objects.bulk_create([
+            User(username=f"{USERNAME_PREFIX}student{i}", role='STUDENT', password=password)
+            for i in range(self.students)
+        ], batch_size=1000)
+        teachers = list(User.objects.filter(username__in=[t.username for t in teachers]))
+        students = list(User.objects.filter(username__startswith=f"{USERNAME_PREFIX}student"))
+
+        now = timezone.now()
+        assignments = []
+        for i in range(self.assignments):
+            importer = AssignmentImporter(teachers[i % len(teachers)])
+            assignments.append(importer.import_from_dict(self._assignment_data(i, now)))
+
+        tasks = [task for assignment in assignments for task in assignment.tasks.all()]
+        history = []
+        for student in students:
+            for _ in range(self.history_per_student):
+                task = self.random.choice(tasks)
+                result = self.random.choice(['PASS', 'FAIL', 'FAIL', 'ERROR'])
+                history.append(Submission(
+                    student=student, task=task, content=self._solution(),
+                    auto_result=result, auto_output=self._output(result),
+                ))
+        Submission.objects.bulk_create(history, batch_size=1000)
+
+        return {
+            'teacher_ids': [t.id for t in teachers],
+            'student_ids': [s.id for s in students],
+            'assignment_ids': [a.id for a in assignments],
+            'task_ids': {a.id: list(a.tasks.values_list('id', flat=True)) for a in assignments},
+        }
+
+    def _assignment_data(self, index: int, now) -> Dict:
+        return {
+            'title': f"Load Test Exam {index + 1}",
+            'description': 'Synthetic assignment created by the loadtest command.',
+            'start_time': (now - timedelta(hours=1)).isoformat(),
+            'end_time': (now + timedelta(hours=3)).isoformat(),
+            'tasks': [
+                {
+                    'title': f"Task {t + 1}",
+                    'description': 'Read two integers and print their sum.',
+                    'task_type': 'CODING',
+                    'validation_type': 'AUTO',
+                    'order': t,
+                    'test_cases': [
+                        {'input_data': f"{a}\n{a * 2}\n", 'expected_output': str(a * 3)}
+                        for a in range(self.test_cases_per_task)
+                    ],
+                }
+                for t in range(self.tasks_per_assignment)
+            ],
+        }
+
+    def _solution(self) -> str:
+        names = self.random.sample(['a', 'b', 'x', 'y', 'left', 'right', 'n', 'm'], 2)
+        return (
+            f"{names[0]} = int(input())\n"
+            f"{names[1]} = int(input())\n"
+            f"print({names[0]} + {names[1]})\n"
+        )
+
+    @staticmethod
+    def _output(result: str) -> str:
+        if result == 'PASS':
+            return 'Test Case 1 Passed.\nTest Case 2 Passed.\n'
+        if result == 'FAIL':
+            return 'Test Case 1 Passed.\nTest Case 2 Failed.\nExpected: 3\nActual: 4\n\n'
+        return 'NameError: name \'z\' is not defined'
+
+    @staticmethod
+    def cleanup() -> int:
+        """Delete everything created by a previous live-database run."""
+        Assignment.objects.filter(teacher__username__startswith=USERNAME_PREFIX).delete()
+        deleted, _ = User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        return deleted
+
+
+# Query counter of the request being replayed; contextvars follow async requests
+# into the threads that run their ORM calls.
+_request_queries = contextvars.ContextVar('loadtest_request_queries', default=None)
+
+
+class DatabaseLatency:
+    """
+    Execute wrapper adding a fixed delay to every query, to emulate a remote
+    database (e.g. managed MySQL a few milliseconds away) on a local SQLite file.
+    It also counts queries for ``AsyncTrafficReplayer``.
+    """
+
+    def __init__(self, seconds: float = 0.0):
+        self.seconds = seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        queries = _request_queries.get()
+        if queries is not None:
+            queries[0] += 1
+        if self.seconds:
+            time.sleep(self.seconds)
+        return execute(sql, params, many, context)
+
+    def install(self) -> None:
+        """Wrap every database connection opened from now on."""
+        connection_created.connect(self._on_connection_created, weak=False)
+
+    def uninstall(self) -> None:
+        connection_created.disconnect(self._on_connection_created)
+
+    def _on_connection_created(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self)
+
+
+class _QueryCounter:
+    """Database execute wrapper counting queries on the current thread's connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class TrafficReplayer:
+    """Replays an exam-rush traffic mix with concurrent in-process clients."""
+
+    def __init__(self, dataset: Dict, clients: int = 50, requests_per_client: int = 20,
+                 mix=None, seed: int = 0, workers: Optional[int] = None, login: bool = True):
+        """
+        Initialize the replayer.
+
+        Args:
+            dataset: Ids returned by ``LoadTestSeeder.seed``
+            clients: Number of concurrent client sessions
+            requests_per_client: Requests per client after login
+            mix: (view, weight) pairs, ``EXAM_RUSH_MIX`` by default
+            seed: Random seed
+            workers: Serve at most this many requests at a time, like that many
+                sync gunicorn workers; queueing time counts towards latency
+            login: Replay the login POST; otherwise sessions start logged in,
+                keeping password hashing out of the measurement
+        """
+        self.dataset = dataset
+        self.clients = clients
+        self.requests_per_client = requests_per_client
+        self.mix = mix or EXAM_RUSH_MIX
+        self.seed = seed
+        self.workers = workers
+        self.login = login
+        self._lock = threading.Lock()
+        self._samples = defaultdict(list)
+        self._slots = threading.BoundedSemaphore(workers) if workers else contextlib.nullcontext()
+
+    def _record(self, view: str, seconds: float, queries: int, status: int) -> None:
+        with self._lock:
+            self._samples[view].append((seconds, queries, status))
+
+    def _timed(self, client: Client, view: str, method: str, path: str, **kwargs):
+        counter = _QueryCounter()
+        started = time.perf_counter()
+        with self._slots, connection.execute_wrapper(counter):
+            response = getattr(client, method)(path, **kwargs)
+        self._record(view, time.perf_counter() - started, counter.count, response.status_code)
+        return response
+
+    def _next_request(self, rng: random.Random) -> Tuple[str, bool, str, str, Dict]:
+        """Pick the next request as (view, as_teacher, method, path, client kwargs)."""
+        views, weights = zip(*self.mix)
+        assignment_id = rng.choice(self.dataset['assignment_ids'])
+        view = rng.choices(views, weights)[0]
+        if view == 'dashboard':
+            return view, False, 'get', '/', {}
+        if view == 'assignment_detail':
+            return view, False, 'get', f'/assignment/{assignment_id}/', {}
+        if view == 'leaderboard':
+            return view, False, 'get', f'/assignment/{assignment_id}/leaderboard/', {'headers': {'HX-Request': 'true'}}
+        if view == 'submit_task':
+            task_id = rng.choice(self.dataset['task_ids'][assignment_id])
+            result = rng.choice(['PASS', 'FAIL', 'FAIL', 'ERROR'])
+            return view, False, 'post', f'/task/{task_id}/submit/', {
+                'data': {
+                    'content': f"a = int(input())\nb = int(input())\nprint(a + b + {rng.randint(0, 3)})\n",
+                    'auto_result': result,
+                    'auto_output': LoadTestSeeder._output(result),
+                },
+                'headers': {'HX-Request': 'true'},
+            }
+        return view, True, 'get', f'/assignment/{assignment_id}/submissions/', {}
+
+    def _student_session(self, index: int) -> None:
+        rng = random.Random(self.seed + index)
+        student_ids = self.dataset['student_ids']
+        student = User.objects.get(id=student_ids[index % len(student_ids)])
+        teacher = User.objects.get(id=self.dataset['teacher_ids'][index % len(self.dataset['teacher_ids'])])
+        client = Client(raise_request_exception=False)
+        try:
+            if self.login:
+                self._timed(client, 'login', 'post', '/login/',
+                            data={'username': student.username, 'password': PASSWORD})
+            else:
+                client.force_login(student)
+            teacher_client = Client(raise_request_exception=False)
+            teacher_client.force_login(teacher)
+
+            for _ in range(self.requests_per_client):
+                view, as_teacher, method, path, kwargs = self._next_request(rng)
+                self._timed(teacher_client if as_teacher else client, view, method, path, **kwargs)
+        finally:
+            connection.close()
+
+    def run(self) -> Dict:
+        """Run all client sessions and return the report."""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.clients) as pool:
+            list(pool.map(self._student_session, range(self.clients)))
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed: float) -> Dict:
+        views = {}
+        total = 0
+        errors = 0
+        rejected = 0
+        all_latencies = []
+        for view, samples in sorted(self._samples.items()):
+            served = [s for s in samples if s[2] not in REJECTED_STATUSES]
+            latencies = [s[0] * 1000 for s in served]
+            view_errors = sum(1 for s in served if s[2] >= 500)
+            total += len(samples)
+            errors += view_errors
+            rejected += len(samples) - len(served)
+            all_latencies.extend(latencies)
+            views[view] = {
+                'requests': len(samples),
+                'errors': view_errors,
+                'throttled': sum(1 for s in samples if s[2] == 429),
+                'shed': sum(1 for s in samples if s[2] == 503),
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'p99_ms': round(percentile(latencies, 99), 2),
+                'mean_ms': round(statistics.fmean(latencies), 2) if latencies else 0.0,
+                'queries_per_request': round(statistics.fmean(s[1] for s in samples), 2),
+            }
+        return {
+            'summary': {
+                'requests': total,
+                'errors': errors,
+                'rejected': rejected,
+                'elapsed_s': round(elapsed, 3),
+                # Only requests that were actually served count as throughput;
+                # latency percentiles likewise leave out the instant rejections.
+                'throughput_rps': round((total - rejected) / elapsed, 2) if elapsed else 0.0,
+                'p50_ms': round(percentile(all_latencies, 50), 2),
+                'p95_ms': round(percentile(all_latencies, 95), 2),
+                'p99_ms': round(percentile(all_latencies, 99), 2),
+            },
+            'views': views,
+        }
+
+
+def _close_connection() -> None:
+    # Resolve ``connection`` inside the worker thread, not on the event loop.
+    connection.close()
+
+
+class AsyncTrafficReplayer(TrafficReplayer):
+    """
+    Replays the same traffic through the ASGI handler: every client is a
+    coroutine on one event loop, as in a single uvicorn worker process.
+    """
+
+    async def _atimed(self, client: AsyncClient, view: str, method: str, path: str, **kwargs):
+        queries = [0]
+        token = _request_queries.set(queries)
+        started = time.perf_counter()
+        try:
+            response = await getattr(client, method)(path, **kwargs)
+        finally:
+            _request_queries.reset(token)
+        self._record(view, time.perf_counter() - started, queries[0], response.status_code)
+        return response
+
+    async def _astudent_session(self, index: int) -> None:
+        # Like the ASGI handler, give each session its own thread for sync code.
+        async with ThreadSensitiveContext():
+            rng = random.Random(self.seed + index)
+            student_ids = self.dataset['student_ids']
+            student = await User.objects.aget(id=student_ids[index % len(student_ids)])
+            teacher = await User.objects.aget(id=self.dataset['teacher_ids'][index % len(self.dataset['teacher_ids'])])
+            client = AsyncClient(raise_request_exception=False)
+            try:
+                if self.login:
+                    await self._atimed(client, 'login', 'post', '/login/',
+                                       data={'username': student.username, 'password': PASSWORD})
+                else:
+                    await client.aforce_login(student)
+                teacher_client = AsyncClient(raise_request_exception=False)
+                await teacher_client.aforce_login(teacher)
+
+                for _ in range(self.requests_per_client):
+                    view, as_teacher, method, path, kwargs = self._next_request(rng)
+                    await self._atimed(teacher_client if as_teacher else client, view, method, path, **kwargs)
+            finally:
+                await sync_to_async(_close_connection)()
+
+    async def _arun(self) -> None:
+        await asyncio.gather(*(self._astudent_session(i) for i in range(self.clients)))
+
+    def run(self) -> Dict:
+        """Run all client sessions on a fresh event loop and return the report."""
+        started = time.perf_counter()
+        asyncio.run(self._arun())
+        return self.report(time.perf_counter() - started)
@@ -0,0 +1,124 @@
+"""
+Cache-backed token buckets for submission throttling.
+
+Each bucket is stored as a single integer, its "theoretical arrival time"
+(GCRA, the generic cell rate algorithm, which admits exactly what a token
+bucket admits). Taking a token is one atomic ``cache.incr`` by the refill
+interval, so concurrent requests across processes never lose an update as
+long as they share the cache. A request is rejected when the bucket would
+run more than ``burst`` intervals ahead of now; its increment is then
+taken back.
+
+The cache must be shared by all web processes (Redis, Memcached) for the
+limits to hold globally; with the default local-memory cache each process
+enforces them on its own. ``DatabaseCache`` is not suitable: its ``incr``
+is a read followed by a write, so concurrent requests can lose updates.
+"""
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.models import Assignment
+
+
+class TokenBucket:
+    """A burst of ``burst`` tokens, refilled at ``rate_per_minute``."""
+
+    def __init__(self, key: str, rate_per_minute: int, burst: int):
+        """
+        Initialize the bucket.
+
+        Args:
+            key: Cache key of the bucket
+            rate_per_minute: Tokens added per minute; 0 disables the bucket
+            burst: Tokens available after a quiet period (at least 1)
+        """
+        self.key = f"ratelimit:{key}"
+        self.enabled = rate_per_minute > 0
+        self.interval_ms = int(60_000 / rate_per_minute) if self.enabled else 0
+        self.burst = max(1, burst)
+        # Long enough to outlive any state that still matters; an expired bucket is a full one.
+        self.timeout = max(3600, 2 * self.burst * self.interval_ms // 1000)
+
+    def take(self) -> Optional[float]:
+        """
+        Take a token.
+
+        Returns:
+            None if a token was taken, otherwise the seconds until one is available
+        """
+        if not self.enabled:
+            return None
+        now = int(time.time() * 1000)
+        try:
+            tat = cache.incr(self.key, self.interval_ms)
+        except ValueError:
+            if cache.add(self.key, now + self.interval_ms, timeout=self.timeout):
+                return None
+            tat = cache.incr(self.key, self.interval_ms)  # another request created it first
+        if tat - self.interval_ms < now:
+            # The bucket was full: restart it from now. Requests racing through
+            # here may each get a token, which only matters right after a pause.
+            tat = now + self.interval_ms
+            cache.set(self.key, tat, timeout=self.timeout)
+        excess = tat - now - self.burst * self.interval_ms
+        if excess > 0:
+            self.refund()
+            return excess / 1000
+        return None
+
+    def refund(self) -> None:
+        """Give back a token taken by ``take``."""
+        if not self.enabled:
+            return
+        try:
+            cache.decr(self.key, self.interval_ms)
+        except ValueError:
+            pass  # expired in between, the bucket is full anyway
+
+
+class SubmissionThrottle:
+    """The two buckets a submission draws from: per (student, task) and per student."""
+
+    def __init__(self, assignment: Assignment):
+        self.assignment = assignment
+
+    @staticmethod
+    def _limit(value: Optional[int], default: int) -> int:
+        return default if value is None else value
+
+    def task_bucket(self, student_id: int, task_id: int) -> TokenBucket:
+        a = self.assignment
+        return TokenBucket(
+            f"task:{student_id}:{task_id}",
+            self._limit(a.submit_task_rate, settings.SUBMIT_TASK_RATE_PER_MINUTE),
+            self._limit(a.submit_task_burst, settings.SUBMIT_TASK_BURST),
+        )
+
+    def student_bucket(self, student_id: int) -> TokenBucket:
+        a = self.assignment
+        return TokenBucket(
+            f"student:{student_id}:{a.id}",
+            self._limit(a.submit_student_rate, settings.SUBMIT_STUDENT_RATE_PER_MINUTE),
+            self._limit(a.submit_student_burst, settings.SUBMIT_STUDENT_BURST),
+        )
+
+    def check(self, student_id: int, task_id: int) -> Optional[int]:
+        """
+        Take a token from both buckets.
+
+        Returns:
+            None if the submission may be stored, otherwise the whole seconds
+            to wait (for ``Retry-After``)
+        """
+        student_bucket = self.student_bucket(student_id)
+        wait = student_bucket.take()
+        if wait is None:
+            wait = self.task_bucket(student_id, task_id).take()
+            if wait is not None:
+                student_bucket.refund()
+        if wait is None:
+            return None
+        return max(1, int(wait + 0.999))
@@ -0,0 +1,201 @@
+"""
+Bulk provisioning of user accounts from a CSV roster.
+
+A roster has a header row with ``username`` and optionally ``email``,
+``password``, ``role``, ``first_name`` and ``last_name``. Usernames that
+already exist are skipped, so the same roster can be provisioned again
+after adding rows. Passwords are hashed across a process pool (each
+PBKDF2 hash takes hundreds of milliseconds of CPU) and the new users are
+written with ``bulk_create``. Generated passwords are handed to the caller
+before any user is written, so they cannot be lost with the accounts created.
+"""
+import csv
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, IO, List, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from core.models import User
+
+ROSTER_FIELDS = ['username', 'email', 'password', 'role', 'first_name', 'last_name']
+ROLES = [role for role, _ in User.ROLE_CHOICES]
+
+
+class RosterError(Exception):
+    """Custom exception for roster errors."""
+    pass
+
+
+def generate_password() -> str:
+    return secrets.token_urlsafe(9)
+
+
+class RosterProvisioner:
+    """Creates the users of a roster that do not exist yet."""
+
+    def __init__(self, workers: Optional[int] = None, default_role: str = 'STUDENT',
+                 approve_teachers: bool = False, batch_size: int = 500):
+        """
+        Initialize the provisioner.
+
+        Args:
+            workers: Processes hashing passwords; by default one per CPU
+            default_role: Role of rows without a ``role`` column value
+            approve_teachers: Approve teacher accounts right away (otherwise
+                they wait for admin approval, as after signup)
+            batch_size: Users per INSERT
+        """
+        if default_role not in ROLES:
+            raise RosterError(f"Invalid role '{default_role}'. Must be one of: {', '.join(ROLES)}")
+        self.workers = workers or os.cpu_count() or 1
+        self.default_role = default_role
+        self.approve_teachers = approve_teachers
+        self.batch_size = batch_size
+
+    def read(self, roster: IO[str]) -> List[Dict]:
+        """
+        Parse and validate a CSV roster.
+
+        Returns:
+            One dict per row with all ``ROSTER_FIELDS`` (empty password if none)
+
+        Raises:
+            RosterError: On the first invalid row, with its line number
+        """
+        reader = csv.DictReader(roster)
+        if not reader.fieldnames or 'username' not in [name.strip() for name in reader.fieldnames]:
+            raise RosterError("The roster needs a header row with a 'username' column")
+        unknown = set(name.strip() for name in reader.fieldnames) - set(ROSTER_FIELDS)
+        if unknown:
+            raise RosterError(f"Unknown columns: {', '.join(sorted(unknown))}")
+
+        entries = []
+        seen = set()
+        for row in reader:
+            line = reader.line_num
+            entry = {field: (row.get(field) or '').strip() for field in ROSTER_FIELDS}
+            entry['password'] = row.get('password') or ''  # passwords keep their spaces
+            if not any(entry.values()):
+                continue
+            username = entry['username']
+            try:
+                User.username_validator(username)
+            except ValidationError:
+                raise RosterError(f"Line {line}: Invalid username '{username}'")
+            if len(username) > User._meta.get_field('username').max_length:
+                raise RosterError(f"Line {line}: Username '{username}' is too long")
+            if username in seen:
+                raise RosterError(f"Line {line}: Duplicate username '{username}'")
+            seen.add(username)
+            entry['role'] = entry['role'].upper() or self.default_role
+            if entry['role'] not in ROLES:
+                raise RosterError(f"Line {line}: Invalid role '{entry['role']}'. Must be one of: {', '.join(ROLES)}")
+            if entry['email']:
+                try:
+                    validate_email(entry['email'])
+                except ValidationError:
+                    raise RosterError(f"Line {line}: Invalid email '{entry['email']}'")
+            entries.append(entry)
+        return entries
+
+    def provision(self, entries: List[Dict], dry_run: bool = False,
+                  progress: Optional[Callable[[str], None]] = None,
+                  before_insert: Optional[Callable[[List[Dict]], None]] = None) -> Dict:
+        """
+        Create the users of ``entries`` that do not exist yet.
+
+        Rows without a password get a generated one, returned in ``credentials``.
+        A username another run creates meanwhile is skipped, not overwritten.
+
+        Args:
+            entries: Rows from ``read``
+            dry_run: Only count what would be created
+            progress: Called with status messages
+            before_insert: Called with the generated credentials after hashing
+                and before any user is written, to store them durably; if it
+                raises, no user is created
+
+        Returns:
+            Stats with ``rows``, ``created``, ``skipped``, ``credentials``
+            (username/password pairs of generated passwords of the users
+            created), ``hash_seconds``, ``insert_seconds``, ``total_seconds``
+            and ``users_per_second``
+        """
+        started = time.perf_counter()
+        usernames = [entry['username'] for entry in entries]
+        existing = set()
+        for start in range(0, len(usernames), 500):
+            existing.update(
+                User.objects.filter(username__in=usernames[start:start + 500]).values_list('username', flat=True)
+            )
+        new = [entry for entry in entries if entry['username'] not in existing]
+
+        credentials = []
+        for entry in new:
+            if not entry['password']:
+                entry['password'] = generate_password()
+                credentials.append({'username': entry['username'], 'password': entry['password']})
+
+        hash_started = time.perf_counter()
+        if progress and new and not dry_run:
+            progress(f"Hashing {len(new)} passwords on {min(self.workers, len(new))} workers...")
+        hashes = [] if dry_run else self._hash([entry['password'] for entry in new])
+        hash_seconds = time.perf_counter() - hash_started
+
+        if before_insert is not None and credentials and not dry_run:
+            before_insert(credentials)
+
+        insert_started = time.perf_counter()
+        created = len(new)
+        if not dry_run and new:
+            users = [
+                User(
+                    username=entry['username'], email=entry['email'], password=password,
+                    first_name=entry['first_name'], last_name=entry['last_name'], role=entry['role'],
+                    is_approved=entry['role'] != 'TEACHER' or self.approve_teachers,
+                )
+                for entry, password in zip(new, hashes)
+            ]
+            with transaction.atomic():
+                # ignore_conflicts keeps a concurrent run from failing the whole roster.
+                User.objects.bulk_create(users, batch_size=self.batch_size, ignore_conflicts=True)
+            # Rows a concurrent run inserted first were ignored; ours carry our (salted) hashes.
+            ours = {user.username: user.password for user in users}
+            inserted = set()
+            names = list(ours)
+            for start in range(0, len(names), 500):
+                inserted.update(
+                    username
+                    for username, password in User.objects.filter(username__in=names[start:start + 500])
+                    .values_list('username', 'password')
+                    if ours[username] == password
+                )
+            created = len(inserted)
+            credentials = [entry for entry in credentials if entry['username'] in inserted]
+        insert_seconds = time.perf_counter() - insert_started
+
+        total_seconds = time.perf_counter() - started
+        return {
+            'rows': len(entries),
+            'created': created,
+            'skipped': len(entries) - created,
+            'credentials': credentials,
+            'workers': min(self.workers, len(new)) if new else 0,
+            'hash_seconds': round(hash_seconds, 3),
+            'insert_seconds': round(insert_seconds, 3),
+            'total_seconds': round(total_seconds, 3),
+            'users_per_second': round(created / total_seconds, 1) if created and total_seconds else 0.0,
+        }
+
+    def _hash(self, passwords: List[str]) -> List[str]:
+        workers = min(self.workers, len(passwords))
+        if workers <= 1:
+            return [make_password(password) for password in passwords]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
@@ -0,0 +1,110 @@
+"""
+Runtime statistics of server-judged solutions and time-limit calibration.
+
+Statistics are computed from ``TestCaseResult`` rows of accepted submissions:
+median and p95 of CPU time, wall time and peak RSS per task and per test
+case. ``measure_reference`` times a task's reference solution, which
+``Task.effective_time_limit`` turns into an adaptive limit. The judge
+enforces time limits on wall time, so the reference is timed in wall time
+as well.
+"""
+import statistics
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.models import Assignment, Submission, Task, TestCaseResult
+from core.services.judge import JudgeError, JudgeRunner
+
+METRICS = ['cpu_ms', 'wall_ms', 'peak_rss_kb']
+
+
+def _summarize(rows: List[tuple]) -> Dict:
+    """Median/p95 of each metric over (cpu_ms, wall_ms, peak_rss_kb) rows."""
+    summary = {'runs': len(rows)}
+    values = np.array(rows, dtype=float).reshape(len(rows), len(METRICS))  # None -> nan
+    for column, metric in enumerate(METRICS):
+        measured = values[:, column][~np.isnan(values[:, column])]
+        if len(measured):
+            median, p95 = np.percentile(measured, [50, 95])
+            summary[metric] = {'median': round(float(median), 1), 'p95': round(float(p95), 1)}
+        else:
+            summary[metric] = None
+    return summary
+
+
+def assignment_runtime_stats(assignment: Assignment) -> Dict[int, Dict]:
+    """
+    Resource usage of accepted solutions for every task of an assignment.
+
+    Returns:
+        Task id -> summary with ``runs``, ``solutions``, per-metric median/p95,
+        the task's effective time limit and a ``test_cases`` list (in creation order)
+    """
+    rows = (
+        TestCaseResult.objects
+        .filter(test_case__task__assignment=assignment, submission__auto_result='PASS', verdict='PASS')
+        .values_list('test_case__task_id', 'test_case_id', 'submission_id', *METRICS)
+    )
+    by_task: Dict[int, Dict] = {}
+    for task_id, test_case_id, submission_id, *metrics in rows.iterator(chunk_size=5000):
+        entry = by_task.setdefault(task_id, {'rows': [], 'solutions': set(), 'cases': {}})
+        entry['rows'].append(metrics)
+        entry['solutions'].add(submission_id)
+        entry['cases'].setdefault(test_case_id, []).append(metrics)
+
+    stats = {}
+    for task in assignment.tasks.all():
+        entry = by_task.get(task.id)
+        if entry is None:
+            continue
+        summary = _summarize(entry['rows'])
+        summary['solutions'] = len(entry['solutions'])
+        summary['time_limit'] = task.effective_time_limit()
+        summary['test_cases'] = [
+            dict(_summarize(case_rows), test_case_id=test_case_id, index=index)
+            for index, (test_case_id, case_rows) in enumerate(sorted(entry['cases'].items()), start=1)
+        ]
+        stats[task.id] = summary
+    return stats
+
+
+def measure_reference(task: Task, repeat: int = 3, runner: Optional[JudgeRunner] = None) -> float:
+    """
+    Time the task's reference solution.
+
+    Args:
+        task: Task with a ``reference_solution``
+        repeat: Runs over all test cases; the median per test case is used
+        runner: Runner to use; by default one with a generous time limit
+
+    Returns:
+        Wall-clock milliseconds of the reference solution on its slowest
+        test case
+
+    Raises:
+        JudgeError: If there is no reference solution or it does not pass
+    """
+    if not task.reference_solution.strip():
+        raise JudgeError(f"Task '{task.title}' has no reference solution")
+    runner = runner or JudgeRunner(time_limit=max(10.0, task.effective_time_limit()))
+    reference = Submission(task=task, content=task.reference_solution)
+
+    per_case: Dict[int, List[float]] = {}
+    for _ in range(max(1, repeat)):
+        result, output, runs = runner.judge(reference)
+        if result != 'PASS':
+            raise JudgeError(f"Reference solution of '{task.title}' does not pass: {output.strip()}")
+        for run in runs:
+            per_case.setdefault(run['test_case_id'], []).append(run['wall_ms'])
+    if not per_case:
+        raise JudgeError(f"Task '{task.title}' has no test cases")
+    return max(statistics.median(samples) for samples in per_case.values())
+
+
+def runs_over_limit(task: Task, limit_seconds: float) -> int:
+    """Number of accepted test-case runs whose wall time exceeds ``limit_seconds``."""
+    return TestCaseResult.objects.filter(
+        test_case__task=task, submission__auto_result='PASS', verdict='PASS',
+        wall_ms__gt=limit_seconds * 1000,
+    ).count()
@@ -0,0 +1,200 @@
+"""
+Public scoreboard snapshots.
+
+Assignments with ``public_scoreboard`` set get their standings rendered to
+``SCOREBOARD_DIR/<assignment id>/`` as ``standings.html`` and
+``standings.json``. ``snapshot_scoreboards`` rewrites them on a schedule and
+the public views serve the files without touching the database, so the
+number of viewers (projectors, spectators) has no effect on database load.
+
+A file is only replaced when its content changes, so its ETag stays valid
+between changes and polling clients mostly get ``304 Not Modified``. With
+``scoreboard_freeze_minutes`` set, submissions from the last minutes before
+``end_time`` are left out until the freeze is lifted.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core.models import Assignment
+from core.services.leaderboard import build_leaderboard
+
+SNAPSHOT_FILES = {'html': 'standings.html', 'json': 'standings.json'}
+CONTENT_TYPES = {'html': 'text/html; charset=utf-8', 'json': 'application/json'}
+
+
+class ScoreboardError(Exception):
+    """Custom exception for scoreboard snapshot errors."""
+    pass
+
+
+def snapshot_path(assignment_id: int, kind: str) -> str:
+    if kind not in SNAPSHOT_FILES:
+        raise ScoreboardError(f"Unknown snapshot kind '{kind}'")
+    return os.path.join(settings.SCOREBOARD_DIR, str(int(assignment_id)), SNAPSHOT_FILES[kind])
+
+
+def _write_if_changed(path: str, content: bytes) -> bool:
+    """Atomically replace ``path`` with ``content``; readers never see a partial file."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+
+def render_snapshot(assignment: Assignment) -> Dict[str, bytes]:
+    """
+    Render the public standings of an assignment.
+
+    Returns:
+        File content per snapshot kind ('html', 'json')
+    """
+    now = timezone.now()
+    frozen_at = assignment.scoreboard_frozen_at()
+    frozen = frozen_at is not None and now >= frozen_at
+    tasks = list(assignment.tasks.all())
+    students = build_leaderboard(assignment, tasks, submitted_before=frozen_at if frozen else None)
+    ended = assignment.end_time is not None and now > assignment.end_time
+    # Nothing can change the standings any more, so clients may cache them for long.
+    final = ended and not frozen
+
+    data = {
+        'assignment': {'id': assignment.id, 'title': assignment.title},
+        'tasks': [{'id': t.id, 'title': t.title} for t in tasks],
+        'standings': [
+            {
+                'rank': rank,
+                'username': student['username'],
+                'solved_count': student['solved_count'],
+                'task_results': {str(task_id): result for task_id, result in student['task_results'].items()},
+            }
+            for rank, student in enumerate(students, start=1)
+        ],
+        'frozen': frozen,
+        'frozen_at': frozen_at.isoformat() if frozen else None,
+        'final': final,
+    }
+    html = render_to_string('core/public_scoreboard.html', {
+        'assignment': assignment,
+        'tasks': tasks,
+        'students': students,
+        'frozen': frozen,
+        'frozen_at': frozen_at,
+        'final': final,
+        'refresh_seconds': settings.SCOREBOARD_SNAPSHOT_SECONDS,
+    })
+    # No timestamp in the content: unchanged standings must produce identical files.
+    return {
+        'html': html.encode('utf-8'),
+        'json': json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8'),
+    }
+
+
+def write_snapshot(assignment: Assignment) -> bool:
+    """
+    Render and store the snapshot of a public scoreboard.
+
+    Returns:
+        Whether any file changed
+
+    Raises:
+        ScoreboardError: If the assignment's scoreboard is not public
+    """
+    if not assignment.public_scoreboard:
+        raise ScoreboardError(f"The scoreboard of '{assignment.title}' is not public")
+    rendered = render_snapshot(assignment)
+    # JSON last: it carries the 'final' flag the views read for the HTML as well.
+    changed = _write_if_changed(snapshot_path(assignment.id, 'html'), rendered['html'])
+    return _write_if_changed(snapshot_path(assignment.id, 'json'), rendered['json']) or changed
+
+
+def remove_snapshot(assignment_id: int) -> None:
+    """Stop publishing a scoreboard."""
+    for kind in SNAPSHOT_FILES:
+        try:
+            os.unlink(snapshot_path(assignment_id, kind))
+        except FileNotFoundError:
+            pass
+
+
+def prune_snapshots(public_ids) -> int:
+    """
+    Remove snapshots of assignments that were deleted or made private elsewhere
+    (e.g. in the admin).
+
+    Returns:
+        Number of scoreboards taken down
+    """
+    public_ids = {int(pk) for pk in public_ids}
+    try:
+        names = os.listdir(settings.SCOREBOARD_DIR)
+    except FileNotFoundError:
+        return 0
+    removed = 0
+    for name in names:
+        if not name.isdigit() or int(name) in public_ids:
+            continue
+        if any(os.path.exists(snapshot_path(int(name), kind)) for kind in SNAPSHOT_FILES):
+            remove_snapshot(int(name))
+            removed += 1
+    return removed
+
+
+def sync_snapshot(assignment: Assignment) -> None:
+    """Write or remove the snapshot to match ``assignment.public_scoreboard``."""
+    if assignment.public_scoreboard:
+        write_snapshot(assignment)
+    else:
+        remove_snapshot(assignment.id)
+
+
+def load_snapshot(assignment_id: int, kind: str) -> Optional[Tuple[bytes, str, float, bool]]:
+    """
+    Read a snapshot for serving, without any database query.
+
+    The content and its ETag are cached per file version (inode and mtime),
+    so requests after the first only ``stat`` the file.
+
+    Returns:
+        (content, etag, modified timestamp, final), or None if not published
+    """
+    path = snapshot_path(assignment_id, kind)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = f"scoreboard:{assignment_id}:{kind}:{stat.st_ino}:{stat.st_mtime_ns}"
+    snapshot = cache.get(key)
+    if snapshot is None:
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            with open(snapshot_path(assignment_id, 'json'), 'rb') as f:
+                final = json.loads(f.read()).get('final', False)
+        except FileNotFoundError:
+            return None  # unpublished in between
+        etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+        snapshot = (content, etag, stat.st_mtime, final)
+        cache.set(key, snapshot, timeout=max(settings.SCOREBOARD_SNAPSHOT_SECONDS * 6, 60))
+    return snapshot
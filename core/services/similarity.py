@@ -0,0 +1,278 @@
+"""
+Near-duplicate detection for coding submissions using MinHash and LSH.
+
+Submissions are tokenized with identifiers, literals, comments and
+formatting normalized away, shingled into k-token windows and summarized
+as a fixed-size MinHash signature when they arrive. Finding similar pairs
+for a task then only compares submissions that share at least one LSH band,
+which is near-linear in the number of submissions instead of O(n^2). A band
+shared by more than ``MAX_BUCKET_SIZE`` submissions (typically starter code
+everyone kept) is not compared pairwise; the report counts such buckets.
+
+Pairs are never computed in a request. ``assignment_similar_pairs`` reads
+the stored ``SimilarityReport`` of each task and queues a background job
+(run by ``run_background_jobs``) for an assignment whose submissions changed
+since its reports were computed and whose reports are older than
+``SIMILARITY_REFRESH_SECONDS``, so teachers watching submissions during a
+live exam do not trigger a screening of every task on each page view.
+"""
+import io
+import keyword
+import re
+import tokenize
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from core.models import Assignment, BackgroundJob, SimilarityReport, Submission, SubmissionSignature, Task
+
+NUM_PERMUTATIONS = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 5
+MIN_TOKENS = 10
+# Larger LSH buckets are skipped: comparing every pair in them would be O(n^2).
+MAX_BUCKET_SIZE = 200
+# Most similar pairs kept per task in its report.
+STORED_PAIRS = 100
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20260101)
+_A = _rng.integers(1, int(_PRIME), NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), NUM_PERMUTATIONS, dtype=np.uint64)
+
+_SKIPPED = {tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER}
+_FALLBACK_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def normalize_tokens(code: str) -> List[str]:
+    """
+    Tokenize Python source, replacing identifiers and literals by placeholders.
+
+    Falls back to a simple regex tokenizer for code that does not tokenize.
+    """
+    tokens = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            if tok.type in _SKIPPED:
+                continue
+            if tok.type == tokenize.NAME:
+                tokens.append(tok.string if keyword.iskeyword(tok.string) else 'ID')
+            elif tok.type == tokenize.NUMBER:
+                tokens.append('NUM')
+            elif tok.type == tokenize.STRING:
+                tokens.append('STR')
+            elif tok.type == tokenize.NEWLINE:
+                tokens.append(';')
+            elif tok.type == tokenize.INDENT:
+                tokens.append('{')
+            elif tok.type == tokenize.DEDENT:
+                tokens.append('}')
+            else:
+                tokens.append(tok.string)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        tokens = []
+        for tok in _FALLBACK_TOKEN.findall(code):
+            if keyword.iskeyword(tok):
+                tokens.append(tok)
+            elif tok[0].isdigit():
+                tokens.append('NUM')
+            elif tok[0].isalpha() or tok[0] == '_':
+                tokens.append('ID')
+            else:
+                tokens.append(tok)
+    return tokens
+
+
+def minhash_signature(tokens: List[str]) -> Optional[np.ndarray]:
+    """Return the MinHash signature of the token shingles, or None if too short."""
+    if len(tokens) < MIN_TOKENS:
+        return None
+    token_hashes = np.fromiter((zlib.crc32(t.encode()) for t in tokens), dtype=np.uint64, count=len(tokens))
+    # Polynomial rolling combination of SHINGLE_SIZE consecutive token hashes.
+    shingles = np.zeros(len(tokens) - SHINGLE_SIZE + 1, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        shingles = (shingles * np.uint64(1000003) + token_hashes[offset:offset + len(shingles)]) % _PRIME
+    shingles = np.unique(shingles)
+    hashed = (np.outer(_A, shingles) + _B[:, None]) % _PRIME
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def estimated_similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(left == right)) / NUM_PERMUTATIONS
+
+
+def record_signature(submission: Submission, created: bool = False) -> Optional[SubmissionSignature]:
+    """
+    Compute and store the signature of a coding submission.
+
+    Args:
+        submission: The submission to sign
+        created: True for a brand-new submission, which cannot have a signature yet
+    """
+    tokens = normalize_tokens(submission.content or '')
+    signature = minhash_signature(tokens)
+    if signature is None:
+        return None
+    fields = {
+        'task_id': submission.task_id,
+        'student_id': submission.student_id,
+        'token_count': len(tokens),
+        'minhash': signature.tobytes(),
+    }
+    if created:
+        return SubmissionSignature.objects.create(submission_id=submission.id, **fields)
+    obj, _ = SubmissionSignature.objects.update_or_create(submission_id=submission.id, defaults=fields)
+    return obj
+
+
+class SimilarityFinder:
+    """Finds pairs of students with near-duplicate submissions for a task."""
+
+    def __init__(self, task: Task, threshold: float = 0.8):
+        """
+        Initialize the finder.
+
+        Args:
+            task: The task whose submissions are compared
+            threshold: Minimum estimated Jaccard similarity to report
+        """
+        self.task = task
+        self.threshold = threshold
+        self.skipped_buckets = 0
+
+    def backfill(self) -> int:
+        """Compute missing signatures for the task's existing submissions."""
+        missing = (
+            Submission.objects
+            .filter(task=self.task, signature__isnull=True)
+            .only('id', 'task_id', 'student_id', 'content')
+        )
+        created = 0
+        for submission in missing.iterator(chunk_size=500):
+            if record_signature(submission) is not None:
+                created += 1
+        return created
+
+    def find_pairs(self) -> List[Dict]:
+        """
+        Return student pairs whose most similar submissions reach the threshold.
+
+        Each entry has both usernames and submission ids plus the estimated similarity,
+        sorted from most to least similar. Buckets of more than ``MAX_BUCKET_SIZE``
+        submissions are skipped and counted in ``skipped_buckets``.
+        """
+        self.skipped_buckets = 0
+        rows = list(
+            SubmissionSignature.objects
+            .filter(task=self.task)
+            .values_list('submission_id', 'student_id', 'student__username', 'minhash')
+        )
+        if len(rows) < 2:
+            return []
+        signatures = np.frombuffer(b''.join(bytes(r[3]) for r in rows), dtype=np.uint32).reshape(len(rows), NUM_PERMUTATIONS)
+
+        buckets = defaultdict(list)
+        for band in range(BANDS):
+            keys = signatures[:, band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+            for index, key in enumerate(map(bytes, keys)):
+                buckets[(band, key)].append(index)
+
+        best = {}
+        checked = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) > MAX_BUCKET_SIZE:
+                self.skipped_buckets += 1
+                continue
+            for i, left in enumerate(members):
+                for right in members[i + 1:]:
+                    a, b = rows[left], rows[right]
+                    if a[1] == b[1] or (left, right) in checked:
+                        continue
+                    checked.add((left, right))
+                    pair = (min(a[1], b[1]), max(a[1], b[1]))
+                    score = estimated_similarity(signatures[left], signatures[right])
+                    if score >= self.threshold and (pair not in best or score > best[pair][0]):
+                        best[pair] = (score, a, b)
+
+        return sorted(
+            (
+                {
+                    'similarity': round(score, 3),
+                    'student_a': a[2], 'submission_a': a[0],
+                    'student_b': b[2], 'submission_b': b[0],
+                }
+                for score, a, b in best.values()
+            ),
+            key=lambda p: p['similarity'],
+            reverse=True,
+        )
+
+
+def refresh_report(task: Task) -> SimilarityReport:
+    """Compute the similar pairs of ``task`` and store them as its ``SimilarityReport``."""
+    state = SubmissionSignature.objects.filter(task=task).aggregate(count=Count('submission'), newest=Max('submission'))
+    finder = SimilarityFinder(task)
+    pairs = finder.find_pairs()
+    report, _ = SimilarityReport.objects.update_or_create(task=task, defaults={
+        'signature_count': state['count'],
+        'newest_submission_id': state['newest'],
+        'computed_at': timezone.now(),
+        'pairs': pairs[:STORED_PAIRS],
+        'skipped_buckets': finder.skipped_buckets,
+    })
+    return report
+
+
+def assignment_similar_pairs(assignment: Assignment, limit: int = 20, user=None) -> List[Dict]:
+    """
+    Stored similar pairs of every coding task of an assignment, queueing a
+    refresh when they are out of date (see the module docstring).
+
+    Args:
+        assignment: The assignment to report on
+        limit: Pairs returned per task
+        user: Who the refresh job is queued for
+
+    Returns:
+        One ``{'task', 'pairs', 'skipped_buckets'}`` entry per task with at
+        least one pair or skipped bucket, each with up to ``limit`` pairs
+    """
+    tasks = list(assignment.tasks.filter(task_type='CODING'))
+    states = {
+        row['task']: (row['signatures'], row['newest'])
+        for row in SubmissionSignature.objects.filter(task__in=tasks)
+        .values('task').annotate(signatures=Count('submission'), newest=Max('submission'))
+    }
+    reports = SimilarityReport.objects.in_bulk([task.id for task in tasks])
+    refresh_before = timezone.now() - timedelta(seconds=settings.SIMILARITY_REFRESH_SECONDS)
+    stale = False
+    result = []
+    for task in tasks:
+        state = states.get(task.id, (0, None))
+        report = reports.get(task.id)
+        if report is None:
+            stale = stale or state[0] > 1
+            continue
+        if (report.signature_count, report.newest_submission_id) != state and report.computed_at <= refresh_before:
+            stale = True
+        if report.pairs or report.skipped_buckets:
+            result.append({'task': task, 'pairs': report.pairs[:limit], 'skipped_buckets': report.skipped_buckets})
+    if stale:
+        _queue_refresh(assignment, user)
+    return result
+
+
+def _queue_refresh(assignment: Assignment, user=None) -> None:
+    params = {'ids': [assignment.id]}
+    if not BackgroundJob.objects.filter(kind='SIMILARITY', status__in=['QUEUED', 'RUNNING'], params=params).exists():
+        BackgroundJob.objects.create(kind='SIMILARITY', created_by=user, params=params)
@@ -0,0 +1,230 @@
+"""
+Service for archiving submissions of assignments that ended long ago.
+
+Only each student's best and last attempt per task stay in the hot
+``Submission`` table; every other attempt is moved to ``ArchivedSubmission``
+(and optionally dumped to a compressed JSONL/Parquet file).
+"""
+import gzip
+import json
+import os
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from core.cache_versions import bump_version
+from core.models import Assignment, ArchivedSubmission, Submission, SubmissionArchive
+from core.signals import bulk_submission_delete
+
+
+class SubmissionArchiveError(Exception):
+    """Custom exception for archival errors."""
+    pass
+
+
+# Higher is better; used to pick the attempt that represents a student's best result.
+RESULT_RANK = Case(
+    When(auto_result='PASS', then=Value(3)),
+    When(auto_result='FAIL', then=Value(2)),
+    When(auto_result='ERROR', then=Value(1)),
+    default=Value(0),
+    output_field=IntegerField(),
+)
+
+
+class SubmissionArchiver:
+    """Moves old attempts of ended assignments out of the hot table."""
+
+    DUMP_FORMATS = ['jsonl', 'parquet']
+
+    def __init__(self, older_than_days: int = 90, dump_dir: Optional[str] = None,
+                 dump_format: str = 'jsonl', batch_size: int = 1000):
+        """
+        Initialize the archiver.
+
+        Args:
+            older_than_days: Only assignments whose end_time is older than this are archived
+            dump_dir: Directory for an additional compressed copy of archived rows
+            dump_format: Either 'jsonl' (gzip) or 'parquet' (needs pandas + pyarrow)
+            batch_size: Number of rows moved per transaction
+        """
+        if dump_format not in self.DUMP_FORMATS:
+            raise SubmissionArchiveError(
+                f"Invalid dump format '{dump_format}'. Must be one of: {', '.join(self.DUMP_FORMATS)}"
+            )
+        if dump_dir and dump_format == 'parquet':
+            try:
+                import pandas  # noqa: F401
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise SubmissionArchiveError("Parquet dumps require pandas and pyarrow to be installed")
+        self.older_than_days = older_than_days
+        self.dump_dir = dump_dir
+        self.dump_format = dump_format
+        self.batch_size = batch_size
+
+    def eligible_assignments(self):
+        """Assignments that ended more than ``older_than_days`` ago."""
+        cutoff = timezone.now() - timedelta(days=self.older_than_days)
+        return Assignment.objects.filter(end_time__isnull=False, end_time__lt=cutoff)
+
+    def archivable_ids(self, assignment: Assignment) -> Iterator[int]:
+        """
+        Yield ids of submissions that are neither the best nor the last
+        attempt of their (student, task) pair.
+        """
+        partition = [F('student_id'), F('task_id')]
+        return (
+            Submission.objects
+            .filter(task__assignment=assignment)
+            .annotate(
+                best_rank=Window(
+                    RowNumber(),
+                    partition_by=partition,
+                    order_by=[
+                        F('manual_grade').desc(nulls_last=True),
+                        RESULT_RANK.desc(),
+                        F('submitted_at').asc(),
+                    ],
+                ),
+                last_rank=Window(
+                    RowNumber(),
+                    partition_by=partition,
+                    order_by=[F('submitted_at').desc(), F('id').desc()],
+                ),
+            )
+            .filter(best_rank__gt=1, last_rank__gt=1)
+            .values_list('id', flat=True)
+            .iterator(chunk_size=self.batch_size)
+        )
+
+    def archive_assignment(self, assignment: Assignment, dry_run: bool = False) -> int:
+        """
+        Archive old attempts of one assignment.
+
+        Args:
+            assignment: The assignment to archive
+            dry_run: Only count what would be moved
+
+        Returns:
+            Number of submissions moved (or that would be moved)
+        """
+        ids = list(self.archivable_ids(assignment))
+        if dry_run or not ids:
+            return len(ids)
+
+        archive = SubmissionArchive.objects.create(assignment=assignment)
+        dump = self._open_dump(archive) if self.dump_dir else None
+        moved = 0
+        try:
+            for start in range(0, len(ids), self.batch_size):
+                rows = self._move_batch(archive, ids[start:start + self.batch_size])
+                if dump is not None:
+                    dump.write(rows)
+                moved += len(rows)
+        finally:
+            if dump is not None:
+                dump.close()
+
+        archive.row_count = moved
+        archive.dump_path = dump.path if dump is not None else ''
+        archive.save(update_fields=['row_count', 'dump_path'])
+        bump_version('assignment', assignment.id)
+        return moved
+
+    @transaction.atomic
+    def _move_batch(self, archive: SubmissionArchive, ids: List[int]) -> List[Dict]:
+        """Copy one batch into the archive table and delete it from the hot table."""
+        rows = list(
+            Submission.objects.filter(id__in=ids).values(
+                'id', 'student_id', 'task_id', 'content', 'auto_result', 'auto_output',
+                'manual_grade', 'teacher_comments', 'submitted_at', 'attempt_count',
+            )
+        )
+        ArchivedSubmission.objects.bulk_create([
+            ArchivedSubmission(
+                archive=archive,
+                original_id=row['id'],
+                student_id=row['student_id'],
+                task_id=row['task_id'],
+                content_zlib=ArchivedSubmission.compress(row['content']),
+                auto_result=row['auto_result'],
+                auto_output_zlib=ArchivedSubmission.compress(row['auto_output']) if row['auto_output'] else None,
+                manual_grade=row['manual_grade'],
+                teacher_comments=row['teacher_comments'],
+                submitted_at=row['submitted_at'],
+                attempt_count=row['attempt_count'],
+            )
+            for row in rows
+        ], batch_size=self.batch_size)
+        with bulk_submission_delete():  # archive_assignment bumps the version once
+            Submission.objects.filter(id__in=ids).delete()
+        return rows
+
+    def _open_dump(self, archive: SubmissionArchive):
+        os.makedirs(self.dump_dir, exist_ok=True)
+        stem = os.path.join(
+            self.dump_dir,
+            f"assignment_{archive.assignment_id}_archive_{archive.id}",
+        )
+        if self.dump_format == 'parquet':
+            return _ParquetDump(stem + '.parquet')
+        return _JsonlDump(stem + '.jsonl.gz')
+
+
+class _JsonlDump:
+    """Gzip-compressed JSON Lines writer."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+
+    def write(self, rows: List[Dict]) -> None:
+        for row in rows:
+            self._file.write(json.dumps(row, default=str))
+            self._file.write('\n')
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetDump:
+    """Parquet writer that appends one row group per batch."""
+
+    def __init__(self, path: str):
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.path = path
+        self._pd, self._pa, self._pq = pd, pa, pq
+        self._schema = pa.schema([
+            ('id', pa.int64()),
+            ('student_id', pa.int64()),
+            ('task_id', pa.int64()),
+            ('content', pa.string()),
+            ('auto_result', pa.string()),
+            ('auto_output', pa.string()),
+            ('manual_grade', pa.float64()),
+            ('teacher_comments', pa.string()),
+            ('submitted_at', pa.timestamp('us', tz='UTC')),
+            ('attempt_count', pa.int32()),
+        ])
+        self._writer = None
+
+    def write(self, rows: List[Dict]) -> None:
+        if not rows:
+            return
+        frame = self._pd.DataFrame(rows)
+        frame['manual_grade'] = frame['manual_grade'].astype('float64')
+        table = self._pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, self._schema, compression='zstd')
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
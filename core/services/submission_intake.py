@@ -0,0 +1,355 @@
+"""
+Submission intake under load.
+
+The browser runner queues submissions locally (IndexedDB) and sends them
+in batches; ``submit_batch`` stores a batch, skipping submissions whose
+``client_id`` was already stored (a retried batch whose response was
+lost). Submissions are rate limited per student and task (see
+``rate_limit``), and a byte-identical resubmission of the student's latest
+code with the same verdict only increments that row's ``attempt_count``
+(its ``client_id`` is kept as a ``SubmissionAttempt``).
+
+``SubmitGate`` sheds load before any work is done: above
+``SUBMIT_MAX_IN_FLIGHT`` concurrent submit requests across all web
+processes (counted in the cache), or a judge backlog above
+``SUBMIT_MAX_JUDGE_BACKLOG``, requests get ``503`` with
+a jittered ``Retry-After`` and the browser's queue waits that long instead
+of retrying at once.
+"""
+import hashlib
+import json
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+
+from core.models import JudgeJob, Submission, SubmissionAttempt, Task
+from core.services.comparators import bound_output
+from core.services.rate_limit import SubmissionThrottle
+from core.services.test_ordering import record_browser_runs
+
+RESULTS = [result for result, _ in Submission.RESULT_CHOICES]
+# Seconds the judge backlog count is reused across requests.
+BACKLOG_TTL = 2
+# Seconds per in-flight counter; a request running longer than this drops out of the count.
+IN_FLIGHT_WINDOW = 60
+IN_FLIGHT_TIMEOUT = 3 * IN_FLIGHT_WINDOW
+
+
+class SubmissionIntakeError(Exception):
+    """Custom exception for submission intake errors."""
+    pass
+
+
+class SubmitGate:
+    """
+    Counts submit requests in flight across all web processes and turns away
+    the excess.
+
+    The count lives in the cache, in one counter per ``IN_FLIGHT_WINDOW``
+    seconds: a request increments the counter of the window it arrived in and
+    decrements that same counter when done, and the requests in flight are
+    the sum of the current and the previous window's counters. A process that
+    dies between the two leaks one count, which expires with its counter
+    instead of shrinking the limit for good. With a per-process cache
+    (``LocMemCache``, the default) every process counts only its own requests,
+    and a sync worker never has more than one, so set ``CACHE_BACKEND`` to a
+    shared cache in production.
+    """
+
+    @staticmethod
+    def retry_after(overload: float = 1.0) -> int:
+        """Seconds clients should wait, growing with the overload and jittered so they do not return together."""
+        base = settings.SUBMIT_RETRY_AFTER_SECONDS * max(1.0, overload)
+        return max(1, round(base * random.uniform(1.0, 2.0)))
+
+    def _backlog_overload(self, backlog: Optional[int]) -> Optional[float]:
+        limit = settings.SUBMIT_MAX_JUDGE_BACKLOG
+        if not limit or backlog is None or backlog <= limit:
+            return None
+        return backlog / limit
+
+    def judge_backlog(self) -> Optional[int]:
+        if not (settings.SERVER_JUDGE and settings.SUBMIT_MAX_JUDGE_BACKLOG):
+            return None
+        backlog = cache.get('submit:judge_backlog')
+        if backlog is None:
+            backlog = JudgeJob.objects.filter(status='QUEUED').count()
+            cache.set('submit:judge_backlog', backlog, timeout=BACKLOG_TTL)
+        return backlog
+
+    async def ajudge_backlog(self) -> Optional[int]:
+        if not (settings.SERVER_JUDGE and settings.SUBMIT_MAX_JUDGE_BACKLOG):
+            return None
+        backlog = await cache.aget('submit:judge_backlog')
+        if backlog is None:
+            backlog = await JudgeJob.objects.filter(status='QUEUED').acount()
+            await cache.aset('submit:judge_backlog', backlog, timeout=BACKLOG_TTL)
+        return backlog
+
+    @staticmethod
+    def _key(window: int) -> str:
+        return f"submit:in_flight:{window}"
+
+    def in_flight(self) -> int:
+        """Submit requests currently in flight, as counted in the cache."""
+        window = int(time.time() // IN_FLIGHT_WINDOW)
+        counts = cache.get_many([self._key(window - 1), self._key(window)])
+        return sum(max(0, count) for count in counts.values())
+
+    def _enter(self) -> Tuple[Optional[int], Optional[int]]:
+        """Count this request in; returns ``(retry_after, window)`` where ``window`` is passed to ``_leave``."""
+        overload = self._backlog_overload(self.judge_backlog())
+        if overload is not None:
+            return self.retry_after(overload), None
+        limit = settings.SUBMIT_MAX_IN_FLIGHT
+        if not limit:
+            return None, None
+        window = int(time.time() // IN_FLIGHT_WINDOW)
+        key = self._key(window)
+        cache.add(key, 0, timeout=IN_FLIGHT_TIMEOUT)
+        try:
+            count = cache.incr(key)
+        except ValueError:  # expired between add and incr
+            cache.set(key, 1, timeout=IN_FLIGHT_TIMEOUT)
+            count = 1
+        count += max(0, cache.get(self._key(window - 1), 0))
+        if count > limit:
+            self._leave(window)
+            return self.retry_after(count / limit), None
+        return None, window
+
+    async def _aenter(self) -> Tuple[Optional[int], Optional[int]]:
+        overload = self._backlog_overload(await self.ajudge_backlog())
+        if overload is not None:
+            return self.retry_after(overload), None
+        limit = settings.SUBMIT_MAX_IN_FLIGHT
+        if not limit:
+            return None, None
+        window = int(time.time() // IN_FLIGHT_WINDOW)
+        key = self._key(window)
+        await cache.aadd(key, 0, timeout=IN_FLIGHT_TIMEOUT)
+        try:
+            count = await cache.aincr(key)
+        except ValueError:
+            await cache.aset(key, 1, timeout=IN_FLIGHT_TIMEOUT)
+            count = 1
+        count += max(0, await cache.aget(self._key(window - 1), 0))
+        if count > limit:
+            await self.arelease(window)
+            return self.retry_after(count / limit), None
+        return None, window
+
+    def _leave(self, window: Optional[int]) -> None:
+        if window is None:
+            return
+        try:
+            cache.decr(self._key(window))
+        except ValueError:  # the counter expired; its count went with it
+            pass
+
+    @contextmanager
+    def admitted(self):
+        """
+        Context manager yielding None when the request may proceed, or the
+        ``Retry-After`` seconds when it must be turned away.
+        """
+        retry_after, window = self._enter()
+        try:
+            yield retry_after
+        finally:
+            self._leave(window)
+
+    async def aadmit(self) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Async version of entering ``admitted``: returns ``(retry_after,
+        window)``; pass ``window`` to ``arelease`` when the request is done.
+        """
+        return await self._aenter()
+
+    async def arelease(self, window: Optional[int]) -> None:
+        if window is None:
+            return
+        try:
+            await cache.adecr(self._key(window))
+        except ValueError:
+            pass
+
+
+submit_gate = SubmitGate()
+
+
+def overloaded_response(retry_after: int) -> HttpResponse:
+    response = HttpResponse("The server is busy; your submission is kept and will be sent again.",
+                            status=503, content_type='text/plain')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def batch_response(request, results: List[Dict]) -> JsonResponse:
+    """JSON response for ``submit_batch`` results, with the result badge HTML of each stored submission."""
+    payload = []
+    for result in results:
+        entry = {'client_id': result['client_id'], 'status': result['status']}
+        if 'submission' in result:
+            entry['submission_id'] = result['submission'].id
+            entry['html'] = render_to_string(
+                'core/partials/submission_result.html', {'submission': result['submission']}, request=request,
+            )
+        else:
+            entry['error'] = result['error']
+            if 'retry_after' in result:
+                entry['retry_after'] = result['retry_after']
+        payload.append(entry)
+    return JsonResponse({'results': payload})
+
+
+def parse_batch(body: bytes) -> List[Dict]:
+    """
+    Parse a batch request body: ``{"submissions": [{client_id, task_id,
+    content, auto_result, auto_output, test_runs}, ...]}``.
+
+    Raises:
+        SubmissionIntakeError: If the body is not a valid batch
+    """
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise SubmissionIntakeError("The request body must be JSON")
+    items = data.get('submissions') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise SubmissionIntakeError("'submissions' must be a non-empty list")
+    if len(items) > settings.SUBMIT_MAX_BATCH:
+        raise SubmissionIntakeError(f"At most {settings.SUBMIT_MAX_BATCH} submissions per batch")
+    if not all(isinstance(item, dict) for item in items):
+        raise SubmissionIntakeError("Every submission must be an object")
+    return items
+
+
+def submit_batch(student, items: List[Dict]) -> List[Dict]:
+    """
+    Store a batch of submissions from the browser's queue.
+
+    Each item is validated on its own, so one bad entry does not fail the
+    others.
+
+    Returns:
+        One dict per item with ``client_id``, ``status`` ('created',
+        'duplicate', 'throttled' or 'error') and the ``submission`` or an
+        ``error`` (plus ``retry_after`` seconds when throttled)
+    """
+    client_ids = [str(item.get('client_id') or '')[:64] for item in items]
+    sent = [client_id for client_id in client_ids if client_id]
+    known = {
+        submission.client_id: submission
+        for submission in Submission.objects.filter(student=student, client_id__in=sent)
+    }
+    known.update(
+        (attempt.client_id, attempt.submission)
+        for attempt in SubmissionAttempt.objects.filter(submission__student=student, client_id__in=sent)
+        .select_related('submission')
+    )
+    task_ids = set()
+    for item in items:
+        try:
+            task_ids.add(int(item.get('task_id')))
+        except (TypeError, ValueError):
+            pass
+    tasks = Task.objects.select_related('assignment').in_bulk(task_ids)
+
+    results = []
+    for client_id, item in zip(client_ids, items):
+        if client_id in known:
+            results.append({'client_id': client_id, 'status': 'duplicate', 'submission': known[client_id]})
+            continue
+        try:
+            task = tasks.get(int(item.get('task_id')))
+        except (TypeError, ValueError):
+            task = None
+        auto_result = item.get('auto_result') or 'PENDING'
+        if task is None:
+            error = "Unknown task"
+        elif auto_result not in RESULTS:
+            error = f"Invalid result '{auto_result}'"
+        elif not isinstance(item.get('content'), str):
+            error = "Missing content"
+        else:
+            error = None
+        if error:
+            results.append({'client_id': client_id, 'status': 'error', 'error': error})
+            continue
+
+        wait = SubmissionThrottle(task.assignment).check(student.id, task.id)
+        if wait is not None:
+            results.append({
+                'client_id': client_id, 'status': 'throttled', 'retry_after': wait,
+                'error': f"Too many submissions; try again in {wait}s",
+            })
+            continue
+
+        submission, created = store_submission(
+            student, task, item['content'], auto_result,
+            bound_output(str(item.get('auto_output') or '')), client_id=client_id,
+        )
+        if client_id:
+            known[client_id] = submission  # the same id twice in one batch
+        if created and auto_result != 'PENDING' and not settings.SERVER_JUDGE:
+            record_browser_runs(task, str(item.get('test_runs') or ''), auto_result)
+        results.append({'client_id': client_id, 'status': 'created', 'submission': submission})
+    return results
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def store_submission(student, task: Task, content: str, auto_result: str, auto_output: str,
+                     client_id: str = '') -> Tuple[Submission, bool]:
+    """
+    Store a submission, or count it as another attempt of the student's
+    latest submission to the task if that one has byte-identical content.
+
+    Without the server judge, a browser verdict that differs from the latest
+    one is stored as a new submission, so neither verdict nor its time is
+    lost (an earlier pass, or a frozen scoreboard). With the server judge on,
+    its verdict for the same code stands. The ``client_id`` of a counted
+    attempt is kept as a ``SubmissionAttempt``, so a retried batch that sent
+    it is still recognised.
+
+    Returns:
+        (submission, created)
+    """
+    digest = content_hash(content or '')
+    latest = (
+        Submission.objects.filter(student=student, task=task)
+        .defer('content', 'auto_output', 'teacher_comments')
+        .order_by('-id').first()
+    )
+    if (latest is None or latest.content_hash != digest
+            or (not settings.SERVER_JUDGE and latest.auto_result != auto_result)):
+        submission = Submission.objects.create(
+            student=student, task=task, content=content, auto_result=auto_result,
+            auto_output=auto_output, client_id=client_id, content_hash=digest,
+        )
+        return submission, True
+
+    latest.task = task
+    latest.attempt_count = F('attempt_count') + 1
+    latest.save(update_fields=['attempt_count'])
+    latest.refresh_from_db(fields=['attempt_count'])
+    if client_id:
+        SubmissionAttempt.objects.create(submission=latest, client_id=client_id)
+    return latest, False
+
+
+def throttled_response(retry_after: int) -> HttpResponse:
+    response = HttpResponse(f"Too many submissions; try again in {retry_after}s.",
+                            status=429, content_type='text/plain')
+    response['Retry-After'] = str(retry_after)
+    return response
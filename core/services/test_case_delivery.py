@@ -0,0 +1,155 @@
+"""
+Per-task test case payloads for the browser runner.
+
+``assignment_detail`` only links to each task's test cases; the runner
+fetches them the first time the task is run. The encoded payload is cached
+per task under ``Task.test_cases_version`` (bumped whenever a task or one of
+its test cases changes, see ``core.cache_versions``), already compressed,
+together with its ETag, so a request costs one cache lookup whatever the
+number of test cases. The version is read from the database, never from the
+cache, so every process agrees on which URL is current.
+
+Two formats are served:
+
+* ``full``: ``{"id", "comparator", "float_tolerance", "test_cases": [{"id", "input", "output"}]}``
+  as ``build_task_payload`` produces.
+* ``compact``: the same, but with ``"cases": [[id, input, output], ...]``
+  instead of ``test_cases``, which avoids repeating the keys per case.
+"""
+import gzip
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+from core.models import Task
+from core.services.leaderboard import abuild_task_payload, build_task_payload
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+FORMATS = ('full', 'compact')
+# Cache lifetime of a versioned URL's response; a change produces a new URL.
+VERSIONED_MAX_AGE = 365 * 24 * 3600
+# Smaller bodies are sent uncompressed; the headers would outweigh the savings.
+MIN_COMPRESS_BYTES = 1024
+
+
+class TestCaseDeliveryError(Exception):
+    """Custom exception for test case delivery errors."""
+    pass
+
+
+def test_cases_url(task: Task) -> str:
+    """
+    URL of a task's test cases, including its current version.
+
+    A changed task gets a new URL, so responses for a versioned URL can be
+    cached by the browser for good.
+    """
+    return f"{reverse('task_test_cases', args=[task.id])}?v={task.test_cases_version}"
+
+
+def _serialize(payload: Dict, fmt: str) -> bytes:
+    if fmt == 'compact':
+        payload = dict(payload)
+        payload['cases'] = [[tc['id'], tc['input'], tc['output']] for tc in payload.pop('test_cases')]
+    return json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8')
+
+
+def _encode(payload: Dict, fmt: str) -> Dict:
+    body = _serialize(payload, fmt)
+    # Weak: the same ETag covers every content coding of the payload.
+    encoded = {'etag': 'W/"%s"' % hashlib.sha256(body).hexdigest()[:32], 'identity': body}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        encoded['gzip'] = gzip.compress(body, compresslevel=6, mtime=0)
+        if brotli is not None:
+            encoded['br'] = brotli.compress(body, quality=5)
+    return encoded
+
+
+def _cache_key(task_id: int, fmt: str, version) -> str:
+    return f"test_cases:{task_id}:{version}:{fmt}"
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in FORMATS:
+        raise TestCaseDeliveryError(f"Invalid format '{fmt}'. Must be one of: {', '.join(FORMATS)}")
+
+
+def encoded_test_cases(task: Task, fmt: str = 'full') -> Dict:
+    """
+    The encoded test case payload of a task.
+
+    Returns:
+        Dict with the 'etag' and the body per content coding ('identity',
+        and 'gzip'/'br' when worth compressing)
+
+    Raises:
+        TestCaseDeliveryError: On an unknown format
+    """
+    _check_format(fmt)
+    key = _cache_key(task.id, fmt, task.test_cases_version)
+    encoded = cache.get(key)
+    if encoded is None:
+        encoded = _encode(build_task_payload(task), fmt)
+        cache.set(key, encoded, timeout=settings.TEST_CASES_CACHE_TIMEOUT)
+    return encoded
+
+
+async def aencoded_test_cases(task: Task, fmt: str = 'full') -> Dict:
+    """Async version of ``encoded_test_cases``."""
+    _check_format(fmt)
+    key = _cache_key(task.id, fmt, task.test_cases_version)
+    encoded = await cache.aget(key)
+    if encoded is None:
+        encoded = _encode(await abuild_task_payload(task), fmt)
+        await cache.aset(key, encoded, timeout=settings.TEST_CASES_CACHE_TIMEOUT)
+    return encoded
+
+
+def choose_encoding(encoded: Dict, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+    """
+    Pick the best content coding the client accepts.
+
+    Returns:
+        (Content-Encoding value or None, body)
+    """
+    accepted = {
+        part.split(';')[0].strip().lower()
+        for part in accept_encoding.split(',')
+        if not part.replace(' ', '').endswith(';q=0')
+    }
+    for coding in ('br', 'gzip'):
+        if coding in encoded and coding in accepted:
+            return coding, encoded[coding]
+    return None, encoded['identity']
+
+
+def test_cases_response(request, task: Task, encoded: Dict) -> HttpResponse:
+    """
+    HTTP response for an encoded payload: compressed as the client accepts,
+    ``304 Not Modified`` on a matching ``If-None-Match``, and cacheable for
+    good when requested under the current version.
+    """
+    response = get_conditional_response(request, etag=encoded['etag'])
+    if response is None:
+        coding, body = choose_encoding(encoded, request.headers.get('Accept-Encoding', ''))
+        response = HttpResponse(body, content_type='application/json')
+        if coding:
+            response['Content-Encoding'] = coding
+    response['ETag'] = encoded['etag']
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if request.GET.get('v') == str(task.test_cases_version):
+        patch_cache_control(response, private=True, max_age=VERSIONED_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,144 @@
+"""
+Test-case generation from a generator script and a reference solution.
+
+For case ``i`` of a task, the generator script is run with
+``sys.argv = ['generator', seed, i]`` and ``random`` seeded from both; what
+it prints becomes the test input. The reference solution is then run on that
+input and its output becomes the expected output.
+
+Both scripts come from the teacher, so they run like submissions: each in
+its own sandboxed process with the judge's resource limits (see
+``core.services.judge``), never inside the calling process. A few threads
+each wait on one such process at a time. Generating many cases takes a
+while, so the web app never does it inside a request: imports with
+generators are queued as background jobs (see
+``core.services.background_jobs``).
+
+Each script's output is capped by the judge's output limit, and all cases of
+one ``generate`` call together by ``TEST_GENERATION_MAX_TOTAL_MB``.
+
+Every case is identified by ``generation_hash`` of the generator, the
+reference solution, the seed and the index, so callers can reuse cases
+generated before (e.g. when the same assignment JSON is imported again;
+the importer only reuses the importing teacher's own cases).
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from core.services.judge import JudgeError, JudgeRunner
+
+# Seconds each script may run for one case.
+CASE_TIMEOUT_SECONDS = 10
+
+# (generator, reference_solution, seed, index)
+Job = Tuple[str, str, str, int]
+
+
+class TestGenerationError(Exception):
+    """Custom exception for test generation errors."""
+    pass
+
+
+def generation_hash(generator: str, reference_solution: str, seed: str, index: int) -> str:
+    """Stable identity of one generated case."""
+    digest = hashlib.sha256()
+    for part in (generator, reference_solution, str(seed), str(index)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def case_size(case: Tuple[str, str]) -> int:
+    """Bytes stored for one (input_data, expected_output) case."""
+    return sum(len(part.encode('utf-8')) for part in case)
+
+
+def generate_case(job: Job, runner: Optional[JudgeRunner] = None) -> Tuple[str, str]:
+    """
+    Produce one test case.
+
+    Args:
+        job: (generator, reference_solution, seed, index)
+        runner: Runs both scripts; by default one with ``CASE_TIMEOUT_SECONDS``
+
+    Returns:
+        (input_data, expected_output)
+
+    Raises:
+        TestGenerationError: If either script fails or exceeds a limit
+    """
+    generator, reference_solution, seed, index = job
+    runner = runner or JudgeRunner(time_limit=CASE_TIMEOUT_SECONDS)
+    case_seed = f"{seed}:{index}"
+    try:
+        input_data = runner.run_script(
+            generator, argv=['generator', str(seed), str(index)], seed=case_seed, name='generator',
+        )
+        expected_output = runner.run_script(
+            reference_solution, input_data, argv=['solution'], seed=case_seed, name='reference solution',
+        )
+    except JudgeError as e:
+        raise TestGenerationError(f"Case {index + 1}: {e}")
+    return input_data, expected_output
+
+
+class TestCaseGenerator:
+    """Runs generation jobs, one child process per thread at a time."""
+
+    def __init__(self, workers: Optional[int] = None, runner: Optional[JudgeRunner] = None,
+                 max_total_mb: Optional[int] = None):
+        """
+        Initialize the generator.
+
+        Args:
+            workers: Scripts run at once; by default one per CPU
+            runner: Runs the scripts; by default one with ``CASE_TIMEOUT_SECONDS``
+            max_total_mb: Largest total size of the cases of one ``generate``
+                call; by default ``TEST_GENERATION_MAX_TOTAL_MB``
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.runner = runner or JudgeRunner(time_limit=CASE_TIMEOUT_SECONDS)
+        self.max_total_mb = max_total_mb or settings.TEST_GENERATION_MAX_TOTAL_MB
+
+    def generate(self, jobs: Sequence[Job], reserved_bytes: int = 0) -> List[Tuple[str, str]]:
+        """
+        Produce the test cases for ``jobs``, in order.
+
+        Args:
+            jobs: (generator, reference_solution, seed, index) per case
+            reserved_bytes: Size of cases the caller already has, counted
+                towards the total limit
+
+        Raises:
+            TestGenerationError: On the first case that cannot be generated,
+                or once all cases together exceed the total limit
+        """
+        total = self._counted(reserved_bytes, 0)
+        workers = min(self.workers, len(jobs))
+        if workers <= 1:
+            cases = []
+            for job in jobs:
+                cases.append(generate_case(job, self.runner))
+                total = self._counted(total, case_size(cases[-1]))
+            return cases
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(generate_case, job, self.runner) for job in jobs]
+            try:
+                # Count cases as they finish, so an oversized import stops early.
+                for future in as_completed(futures):
+                    total = self._counted(total, case_size(future.result()))
+                return [future.result() for future in futures]
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+
+    def _counted(self, total: int, size: int) -> int:
+        """Add ``size`` to the running total, failing past the limit."""
+        total += size
+        if total > self.max_total_mb * 1024 * 1024:
+            raise TestGenerationError(f"Generated test cases exceed {self.max_total_mb} MB in total")
+        return total
@@ -0,0 +1,161 @@
+"""
+Test-case ordering for early exit.
+
+Both the server judge and the browser runner stop at the first failing test
+case, so a wrong solution costs only the test cases run before the one
+that rejects it. Test cases are therefore run in descending order of
+
+    P(fail) / expected run time
+
+(the order that minimizes expected cost up to the first failure). Both
+quantities come from per-test-case counters on ``TestCase`` that are bumped
+with ``F()`` expressions as verdicts arrive, so the order follows the
+statistics without any batch recomputation. Priors keep new test cases from
+being ranked on one or two runs.
+
+The browser runner gets its order with the test case payload, which is
+cached per ``Task.test_cases_version``. ``record_runs`` therefore checks at
+most once per ``ORDER_REFRESH_SECONDS`` per task whether the order changed,
+and bumps the version if it did.
+
+The counts are conditional on a test case being reached, which is exactly
+what matters when it is moved earlier or later in the same order.
+"""
+import json
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, FloatField, IntegerField, QuerySet, Value, When
+from django.db.models.functions import Cast
+
+from core.cache_versions import bump_test_cases_version
+from core.models import Task, TestCase
+
+# Beta prior on the failure rate: one failure in two runs.
+PRIOR_FAILS = 1.0
+PRIOR_RUNS = 2.0
+# Run time assumed for a test case before it has been timed.
+PRIOR_MS = 50.0
+# Ignore reported run times beyond this (e.g. a browser tab left in the background).
+MAX_RUN_MS = 60_000.0
+
+
+def judge_score():
+    """Expression for ``P(fail) / expected ms``; higher runs earlier."""
+    runs = Cast('run_count', FloatField())
+    fail_rate = (Cast('fail_count', FloatField()) + Value(PRIOR_FAILS)) / (runs + Value(PRIOR_RUNS))
+    mean_ms = (F('total_ms') + Value(PRIOR_MS)) / (runs + Value(1.0))
+    return fail_rate / mean_ms
+
+
+def judge_order(test_cases: QuerySet) -> QuerySet:
+    """Order a ``TestCase`` queryset the way judges should run it."""
+    return test_cases.annotate(judge_score=judge_score()).order_by('-judge_score', 'id')
+
+
+def record_runs(task_id: int, runs: Iterable[Dict]) -> int:
+    """
+    Add judged runs of one task to the test-case statistics, in a single UPDATE.
+
+    Args:
+        task_id: Task the test cases belong to; ids of other tasks are ignored
+        runs: Dicts with ``test_case_id``, ``verdict`` and ``cpu_ms``/``wall_ms``
+            (as produced by ``JudgeRunner.judge``); CPU time is preferred
+
+    Returns:
+        Number of test cases updated
+    """
+    ids, failed, elapsed = [], [], []
+    for run in runs:
+        ms = run.get('cpu_ms')
+        if ms is None:
+            ms = run.get('wall_ms') or 0.0
+        ids.append(run['test_case_id'])
+        elapsed.append(When(id=run['test_case_id'], then=Value(min(max(float(ms), 0.0), MAX_RUN_MS))))
+        if run['verdict'] != 'PASS':
+            failed.append(run['test_case_id'])
+    if not ids:
+        return 0
+    updated = TestCase.objects.filter(task_id=task_id, id__in=ids).update(
+        run_count=F('run_count') + 1,
+        fail_count=F('fail_count') + Case(
+            When(id__in=failed, then=Value(1)), default=Value(0), output_field=IntegerField(),
+        ),
+        total_ms=F('total_ms') + Case(*elapsed, default=Value(0.0), output_field=FloatField()),
+    )
+    if updated:
+        refresh_order(task_id)
+    return updated
+
+
+def refresh_order(task_id: int) -> bool:
+    """
+    Give the task's test cases a new version if their order changed.
+
+    Checks at most once per ``ORDER_REFRESH_SECONDS``; the order last seen is
+    kept in the cache. Returns whether the version was bumped.
+    """
+    if not cache.add(f"test_order:checked:{task_id}", True, timeout=settings.ORDER_REFRESH_SECONDS):
+        return False
+    order = list(judge_order(TestCase.objects.filter(task_id=task_id)).values_list('id', flat=True))
+    previous: Optional[List[int]] = cache.get(f"test_order:{task_id}")
+    cache.set(f"test_order:{task_id}", order, timeout=None)
+    if previous is None or previous == order:
+        return False
+    bump_test_cases_version(task_id)
+    return True
+
+
+def parse_browser_runs(raw: str) -> List[Dict]:
+    """
+    Validate the ``test_runs`` field posted by the browser runner.
+
+    The field is a JSON list of ``[test_case_id, verdict, ms]``. Malformed
+    entries, unknown verdicts and repeated test cases are dropped.
+
+    Returns:
+        Runs in the format accepted by ``record_runs``
+    """
+    try:
+        entries = json.loads(raw or '[]')
+    except ValueError:
+        return []
+    if not isinstance(entries, list):
+        return []
+    runs: Dict[int, Dict] = OrderedDict()
+    for entry in entries[:1000]:
+        try:
+            test_case_id, verdict, elapsed = int(entry[0]), str(entry[1]), float(entry[2])
+        except (TypeError, ValueError, IndexError, KeyError):
+            continue
+        if verdict not in ('PASS', 'FAIL', 'ERROR') or test_case_id in runs or elapsed != elapsed:  # NaN
+            continue
+        runs[test_case_id] = {'test_case_id': test_case_id, 'verdict': verdict, 'wall_ms': elapsed}
+    return list(runs.values())
+
+
+def record_browser_runs(task: Task, raw: str, result: str) -> int:
+    """
+    Record runs reported by the browser runner for ``task``; returns the number recorded.
+
+    The report must look like a run of the runner that produced ``result``:
+    test cases of this task only, passes up to the first non-passing one
+    (which ends the run), and every test case when the result is PASS.
+    Anything else is dropped as a whole rather than skewing the statistics.
+    """
+    runs = parse_browser_runs(raw)
+    if not runs:
+        return 0
+    verdicts = [run['verdict'] for run in runs]
+    if result == 'PASS':
+        consistent = 'FAIL' not in verdicts and 'ERROR' not in verdicts
+    else:
+        consistent = verdicts[-1] != 'PASS' and verdicts[:-1] == ['PASS'] * (len(runs) - 1)
+    if not consistent:
+        return 0
+    known = set(task.test_cases.values_list('id', flat=True))
+    if any(run['test_case_id'] not in known for run in runs) or (result == 'PASS' and len(runs) != len(known)):
+        return 0
+    return record_runs(task.id, runs)
@@ -0,0 +1,71 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache_versions import bump_test_cases_version, bump_version
+from .models import Assignment, Submission, Task, TestCase
+
+# Set while code that bumps the versions itself deletes submissions in bulk.
+_bulk_submission_delete = contextvars.ContextVar('bulk_submission_delete', default=False)
+
+
+@contextmanager
+def bulk_submission_delete():
+    """Skip the per-row version bumps of deleted submissions; the caller bumps them once."""
+    token = _bulk_submission_delete.set(True)
+    try:
+        yield
+    finally:
+        _bulk_submission_delete.reset(token)
+
+
+@receiver(post_save, sender=Submission)
+def submission_saved(sender, instance, created, **kwargs):
+    assignment = instance.task.assignment
+    bump_version('assignment', assignment.id)
+    bump_version('dashboard', instance.student_id)
+    bump_version('dashboard', assignment.teacher_id)
+    if created and instance.task.task_type == 'CODING':
+        from .services.similarity import record_signature
+        record_signature(instance, created=True)
+        if settings.SERVER_JUDGE and instance.task.validation_type == 'AUTO':
+            from .services.judge_queue import JudgeQueue
+            JudgeQueue.enqueue(instance)
+
+
+@receiver(post_delete, sender=Submission)
+def submission_deleted(sender, instance, **kwargs):
+    if _bulk_submission_delete.get():
+        return
+    try:
+        assignment = instance.task.assignment
+    except ObjectDoesNotExist:
+        return  # Deleted together with its task, which already bumped the version.
+    bump_version('assignment', assignment.id)
+    bump_version('dashboard', instance.student_id)
+    bump_version('dashboard', assignment.teacher_id)
+
+
+@receiver([post_save, post_delete], sender=Assignment)
+def assignment_changed(sender, instance, **kwargs):
+    bump_version('assignments', 'all')
+
+
+@receiver([post_save, post_delete], sender=Task)
+def task_changed(sender, instance, **kwargs):
+    bump_version('assignment', instance.assignment_id)
+    bump_test_cases_version(instance.id)
+    bump_version('assignments', 'all')
+
+
+@receiver([post_save, post_delete], sender=TestCase)
+def test_case_changed(sender, instance, **kwargs):
+    bump_test_cases_version(instance.task_id)
+    try:
+        bump_version('assignment', instance.task.assignment_id)
+    except ObjectDoesNotExist:
+        pass  # Deleted together with its task, which already bumped the version.
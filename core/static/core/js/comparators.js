@@ -0,0 +1,176 @@
+// Output comparators for the browser runner.
+// Twin of core/services/comparators.py: same comparators, same chunked
+// early-exit comparison and the same bounded excerpt. Keep the two in step.
+const Comparators = (() => {
+    const CHUNK_SIZE = 64 * 1024;
+    const CONTEXT_LINES = 2;
+    const EXCERPT_LINE_CHARS = 120;
+    const MAX_AUTO_OUTPUT_CHARS = 4000;
+    const NUMBER_RE = /^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$/;
+    // Python's str.isspace() characters; JS \s lacks \x1c-\x1f and \x85 and adds \ufeff.
+    const SPACE = '\\t\\n\\v\\f\\r \\x1c-\\x1f\\x85\\xa0\\u1680\\u2000-\\u200a\\u2028\\u2029\\u202f\\u205f\\u3000';
+    const SPACES_RE = new RegExp(`[${SPACE}]+`);
+    const SPACE_RE = new RegExp(`[${SPACE}]`);
+    const LEADING_RE = new RegExp(`^[${SPACE}]+`);
+
+    // The first `limit` code points of `text`, or null if it is not longer than that.
+    // Code points, not UTF-16 units, so cuts match Python's len(); `limit` code
+    // points take at most 2 * limit units.
+    function cut(text, limit) {
+        if (text.length <= limit) return null;
+        const chars = Array.from(text.slice(0, 2 * limit + 1));
+        return chars.length <= limit ? null : chars.slice(0, limit).join('');
+    }
+
+    function truncate(text, limit) {
+        const head = cut(text, limit);
+        return head === null ? text : head + '…';
+    }
+
+    function* iterChunks(text) {
+        for (let start = 0; start < text.length; start += CHUNK_SIZE) {
+            yield text.slice(start, start + CHUNK_SIZE);
+        }
+    }
+
+    class Lines {
+        constructor(text) {
+            this.text = text;
+            this.recent = [];
+        }
+
+        remember(lineno, line) {
+            this.recent.push([lineno, truncate(line, EXCERPT_LINE_CHARS)]);
+            if (this.recent.length > CONTEXT_LINES + 16) this.recent.shift();
+        }
+
+        *[Symbol.iterator]() {
+            let lineno = 0;
+            let partial = '';
+            for (const chunk of iterChunks(this.text)) {
+                const lines = (partial + chunk).split('\n');
+                partial = lines.pop();
+                for (const line of lines) {
+                    lineno += 1;
+                    this.remember(lineno, line);
+                    yield [lineno, line];
+                }
+            }
+            if (partial) {
+                lineno += 1;
+                this.remember(lineno, partial);
+                yield [lineno, partial];
+            }
+        }
+
+        context(lineno) {
+            return this.recent.filter(([n]) => lineno - CONTEXT_LINES <= n && n <= lineno);
+        }
+    }
+
+    const split = line => line.split(SPACES_RE).filter(Boolean);
+    const trimStart = line => line.replace(LEADING_RE, '');
+    // A loop: an unanchored [...]+$ regex backtracks quadratically on long runs of spaces.
+    function trimEnd(line) {
+        let end = line.length;
+        while (end > 0 && SPACE_RE.test(line[end - 1])) end -= 1;
+        return line.slice(0, end);
+    }
+    const isBlank = line => trimStart(line) === '';
+
+    function* exactItems(lines) {
+        let started = false;
+        let last = null;
+        let blank = [];
+        for (let [lineno, line] of lines) {
+            if (!started) {
+                if (isBlank(line)) continue;
+                started = true;
+                line = trimStart(line);
+            }
+            if (isBlank(line)) {
+                blank.push([lineno, line]);
+                continue;
+            }
+            if (last !== null) yield last;
+            yield* blank;
+            blank = [];
+            last = [lineno, line];
+        }
+        if (last !== null) yield [last[0], trimEnd(last[1])];
+    }
+
+    function* whitespaceItems(lines) {
+        for (const [lineno, line] of lines) {
+            const normalized = split(line).join(' ');
+            if (normalized) yield [lineno, normalized];
+        }
+    }
+
+    function* tokenItems(lines) {
+        for (const [lineno, line] of lines) {
+            for (const token of split(line)) yield [lineno, token];
+        }
+    }
+
+    function floatEqual(tolerance) {
+        return (expected, actual) => {
+            if (expected === actual) return true;
+            if (!NUMBER_RE.test(expected) || !NUMBER_RE.test(actual)) return false;
+            const a = parseFloat(actual);
+            const b = parseFloat(expected);
+            return Math.abs(a - b) <= tolerance * Math.max(1, Math.abs(b));
+        };
+    }
+
+    function excerpt(expectedLines, expectedItem, actualLines, actualItem) {
+        const line = actualItem ? actualItem[0] : (expectedItem ? expectedItem[0] : 1);
+        const parts = [`First difference at line ${line}.`];
+        for (const [label, lines, item] of [
+            ['Expected', expectedLines, expectedItem],
+            ['Actual', actualLines, actualItem],
+        ]) {
+            parts.push(`${label}:`);
+            if (item === null) {
+                const last = lines.recent.length ? lines.recent[lines.recent.length - 1][0] : 0;
+                for (const [n, text] of lines.context(last)) parts.push(`  ${n}| ${text}`);
+                parts.push('  (end of output)');
+            } else {
+                const context = lines.context(item[0]);
+                if (!context.length || context[context.length - 1][0] !== item[0]) {
+                    context.push([item[0], truncate(item[1], EXCERPT_LINE_CHARS)]);
+                }
+                for (const [n, text] of context) parts.push(`  ${n}| ${text}`);
+            }
+        }
+        return parts.join('\n');
+    }
+
+    // Returns null if the outputs match, otherwise the bounded mismatch excerpt.
+    function compare(name, tolerance, expected, actual) {
+        const items = { WHITESPACE: whitespaceItems, TOKEN: tokenItems, FLOAT: tokenItems }[name] || exactItems;
+        const equal = name === 'FLOAT' ? floatEqual(tolerance) : (e, a) => e === a;
+        const expectedLines = new Lines(expected);
+        const actualLines = new Lines(actual);
+        const expectedItems = items(expectedLines);
+        const actualItems = items(actualLines);
+        while (true) {
+            const e = expectedItems.next();
+            const a = actualItems.next();
+            if (e.done && a.done) return null;
+            const expectedItem = e.done ? null : e.value;
+            const actualItem = a.done ? null : a.value;
+            if (expectedItem === null || actualItem === null || !equal(expectedItem[1], actualItem[1])) {
+                return excerpt(expectedLines, expectedItem, actualLines, actualItem);
+            }
+        }
+    }
+
+    function boundOutput(text) {
+        text = text || '';
+        const head = cut(text, MAX_AUTO_OUTPUT_CHARS);
+        return head === null ? text : head + '\n… (truncated)';
+    }
+
+    return { compare, boundOutput, truncate, EXCERPT_LINE_CHARS };
+})();
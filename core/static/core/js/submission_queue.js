@@ -0,0 +1,180 @@
+// Persistent submission queue for the browser runner.
+// Submissions are written to IndexedDB before anything is sent, so a failed
+// request or a closed tab never loses one. Everything pending goes to the
+// server in one batch request (core/services/submission_intake.py). When the
+// server answers 503/429 or cannot be reached, the queue waits for its
+// Retry-After, or a jittered exponential backoff, before trying again, so
+// retries spread out instead of piling onto an overloaded server.
+const SubmissionQueue = (() => {
+    const DB_NAME = 'problems-validator';
+    const STORE = 'pending-submissions';
+    const MAX_BATCH = 20;
+    const BASE_DELAY_MS = 1000;
+    const MAX_DELAY_MS = 60000;
+
+    let options = null;
+    let attempt = 0;
+    let timer = null;
+    let flushing = false;
+    let flushAgain = false;
+    let dbPromise = null;
+    const memoryStore = new Map();  // used when IndexedDB is unavailable (private mode, old browsers)
+
+    function openDb() {
+        if (!dbPromise) {
+            dbPromise = new Promise(resolve => {
+                if (!window.indexedDB) return resolve(null);
+                const request = indexedDB.open(DB_NAME, 1);
+                request.onupgradeneeded = () => request.result.createObjectStore(STORE, { keyPath: 'client_id' });
+                request.onsuccess = () => resolve(request.result);
+                request.onerror = () => resolve(null);
+            });
+        }
+        return dbPromise;
+    }
+
+    async function withStore(mode, action) {
+        const db = await openDb();
+        if (!db) return action(null);
+        return new Promise((resolve, reject) => {
+            const tx = db.transaction(STORE, mode);
+            const result = action(tx.objectStore(STORE));
+            tx.oncomplete = () => resolve(result && 'result' in result ? result.result : result);
+            tx.onerror = () => reject(tx.error);
+        });
+    }
+
+    async function allItems() {
+        const items = await withStore('readonly', store => store ? store.getAll() : Array.from(memoryStore.values()));
+        return items.sort((a, b) => a.queued_at - b.queued_at);
+    }
+
+    function putItem(item) {
+        return withStore('readwrite', store => store ? store.put(item) : memoryStore.set(item.client_id, item));
+    }
+
+    function deleteItems(clientIds) {
+        return withStore('readwrite', store => clientIds.forEach(id => store ? store.delete(id) : memoryStore.delete(id)));
+    }
+
+    function newClientId() {
+        if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+        return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    }
+
+    // "Equal jitter": between half and all of the exponential step, so clients
+    // that failed together do not come back together.
+    function backoffDelay(retryAfterSeconds) {
+        if (retryAfterSeconds > 0) return retryAfterSeconds * 1000 * (1 + Math.random() * 0.5);
+        const step = Math.min(MAX_DELAY_MS, BASE_DELAY_MS * 2 ** attempt);
+        return step / 2 + Math.random() * step / 2;
+    }
+
+    function schedule(delayMs) {
+        clearTimeout(timer);
+        timer = setTimeout(flush, delayMs);
+    }
+
+    function retryLater(retryAfterSeconds, pending) {
+        const delay = backoffDelay(retryAfterSeconds);
+        attempt += 1;
+        if (options.onRetry) options.onRetry(pending, delay);
+        schedule(delay);
+    }
+
+    async function flush() {
+        if (!options) return;
+        if (flushing) {
+            flushAgain = true;  // picked up when the running flush ends
+            return;
+        }
+        flushing = true;
+        clearTimeout(timer);
+        try {
+            const pending = await allItems();
+            if (!pending.length) {
+                attempt = 0;
+                return;
+            }
+            const batch = pending.slice(0, MAX_BATCH);
+            let response;
+            try {
+                response = await fetch(options.url, {
+                    method: 'POST',
+                    credentials: 'same-origin',
+                    headers: { 'Content-Type': 'application/json', 'X-CSRFToken': options.csrfToken },
+                    body: JSON.stringify({ submissions: batch.map(({ queued_at, ...item }) => item) }),
+                });
+            } catch (err) {
+                return retryLater(0, batch);  // offline or connection dropped
+            }
+
+            if (response.status === 429 || response.status >= 500) {
+                return retryLater(parseInt(response.headers.get('Retry-After'), 10) || 0, batch);
+            }
+            if (response.status === 401 || response.status === 403 || response.redirected) {
+                // Logged out or stale CSRF token: keep everything for the next page load.
+                if (options.onBlocked) options.onBlocked(batch);
+                return;
+            }
+
+            const byId = new Map(batch.map(item => [item.client_id, item]));
+            if (!response.ok) {
+                // The server cannot accept this batch at all; retrying would fail the same way.
+                await deleteItems(batch.map(item => item.client_id));
+                batch.forEach(item => options.onResult(item, { status: 'error', error: `HTTP ${response.status}` }));
+            } else {
+                let data;
+                try {
+                    data = await response.json();
+                } catch (err) {
+                    // Stored or not, the client ids make a resend safe.
+                    return retryLater(0, batch);
+                }
+                // Throttled submissions stay queued until the rate limit allows them.
+                const throttled = data.results.filter(result => result.status === 'throttled');
+                await deleteItems(data.results.filter(result => result.status !== 'throttled').map(result => result.client_id));
+                data.results.forEach(result => {
+                    const item = byId.get(result.client_id);
+                    if (item && result.status !== 'throttled') options.onResult(item, result);
+                });
+                if (throttled.length) {
+                    return retryLater(
+                        Math.max(...throttled.map(result => result.retry_after || 0)),
+                        throttled.map(result => byId.get(result.client_id)).filter(Boolean),
+                    );
+                }
+            }
+            attempt = 0;
+            if (pending.length > batch.length) schedule(0);
+        } finally {
+            flushing = false;
+            if (flushAgain && attempt === 0) schedule(0);
+            flushAgain = false;
+        }
+    }
+
+    return {
+        // options: {url, csrfToken, onResult(item, result), onRetry(items, delayMs), onBlocked(items)}
+        init(opts) {
+            options = opts;
+            window.addEventListener('online', () => flush());
+            flush();  // submissions left over from an earlier visit
+        },
+
+        async enqueue(submission) {
+            const item = { ...submission, client_id: newClientId(), queued_at: Date.now() };
+            // Pressing the button again with the same code replaces the waiting copy.
+            const duplicates = (await allItems()).filter(
+                other => other.task_id === item.task_id && other.content === item.content
+            );
+            if (duplicates.length && !flushing) await deleteItems(duplicates.map(other => other.client_id));
+            await putItem(item);
+            if (!timer || attempt === 0) schedule(0);
+            return item;
+        },
+
+        flush,
+        pending: allItems,
+    };
+})();
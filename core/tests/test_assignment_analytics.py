@@ -0,0 +1,57 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Submission, TestCase as TaskTestCase
+from core.services.assignment_analytics import AssignmentAnalytics
+from core.services.submission_archiver import SubmissionArchiver
+from core.tests.utils import TEST_STORAGES, make_assignment, make_submission, make_task, make_user
+
+
+class AssignmentAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.assignment = make_assignment(ended_days_ago=200)
+        cls.task = make_task(cls.assignment, cases=[('1', '1'), ('2', '2'), ('3', '3')])
+        cls.alice = make_user('alice')
+        cls.bob = make_user('bob')
+        cls.alice_attempts = [make_submission(cls.alice, cls.task, result) for result in ['FAIL', 'FAIL', 'ERROR', 'PASS']]
+        make_submission(cls.bob, cls.task, 'FAIL')
+
+    def task_stats(self):
+        return AssignmentAnalytics(self.assignment).compute()['tasks'][0]
+
+    def test_pass_rates_and_attempts(self):
+        stats = self.task_stats()
+        self.assertEqual(stats['students'], 2)
+        self.assertEqual(stats['solvers'], 1)
+        self.assertEqual(stats['pass_rate'], 50.0)
+        self.assertEqual(stats['submissions'], 5)
+        self.assertEqual(stats['mean_attempts'], 4.0)
+
+    def test_archived_attempts_still_count(self):
+        before = self.task_stats()
+        self.assertEqual(SubmissionArchiver().archive_assignment(self.assignment), 3)
+        self.assertEqual(self.task_stats(), before)
+
+    def test_collapsed_resubmissions_are_weighted(self):
+        Submission.objects.filter(id=self.alice_attempts[0].id).update(attempt_count=3)
+        stats = self.task_stats()
+        self.assertEqual((stats['students'], stats['submissions'], stats['mean_attempts']), (2, 7, 6.0))
+        self.assertEqual(stats['submission_pass_rate'], round(100.0 / 7, 1))
+        SubmissionArchiver().archive_assignment(self.assignment)
+        self.assertEqual(self.task_stats(), stats)
+
+    def test_hardest_test_cases_come_from_counters(self):
+        first, second, third = TaskTestCase.objects.filter(task=self.task).order_by('id')
+        TaskTestCase.objects.filter(id=second.id).update(run_count=10, fail_count=6)
+        TaskTestCase.objects.filter(id=third.id).update(run_count=4, fail_count=1)
+        hardest = AssignmentAnalytics(self.assignment).compute()['hardest_test_cases']
+        self.assertEqual([(c['test_case'], c['failures'], c['runs']) for c in hardest], [(2, 6, 10), (3, 1, 4)])
+        self.assertEqual(hardest[0]['fail_rate'], 60.0)
+
+    @override_settings(STORAGES=TEST_STORAGES)
+    def test_page_renders_each_card_once(self):
+        self.client.force_login(self.assignment.teacher)
+        response = self.client.get(reverse('assignment_analytics', args=[self.assignment.id]))
+        self.assertContains(response, '<title>Analytics - Assignment', count=1)
+        self.assertContains(response, 'Judge Resource Usage', count=1)
@@ -0,0 +1,55 @@
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import BackgroundJob, Submission, User
+from core.services import background_jobs
+from core.tests.utils import TEST_STORAGES, make_assignment, make_submission, make_task, make_user
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class BackgroundJobSelectionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        task = make_task(make_assignment())
+        cls.alice = make_user('alice')
+        bob = make_user('bob')
+        cls.failed = [make_submission(cls.alice, task, 'FAIL'), make_submission(bob, task, 'FAIL')]
+        cls.passed = make_submission(cls.alice, task, 'PASS')
+        cls.admin = User.objects.create_superuser('admin', password='pw')
+
+    def queue(self, query='', **post):
+        self.client.force_login(self.admin)
+        url = reverse('admin:core_submission_changelist') + query
+        self.client.post(url, dict({'action': 'queue_export', 'index': 0}, **post))
+        return BackgroundJob.objects.get()
+
+    def selected_ids(self, job):
+        return set(background_jobs.selected(job).values_list('id', flat=True))
+
+    def test_ticked_rows_are_stored_as_ids(self):
+        job = self.queue(**{ACTION_CHECKBOX_NAME: [self.passed.id]})
+        self.assertEqual(job.params, {'ids': [self.passed.id]})
+        self.assertEqual(self.selected_ids(job), {self.passed.id})
+
+    def test_select_all_stores_the_changelist_filters(self):
+        job = self.queue('?auto_result__exact=FAIL&p=2&o=1', select_across='1',
+                         **{ACTION_CHECKBOX_NAME: [self.failed[0].id]})
+        self.assertEqual(job.params, {'filters': {'auto_result__exact': ['FAIL']}})
+        self.assertEqual(self.selected_ids(job), {s.id for s in self.failed})
+        # Rows matching the filters when the job runs are included.
+        later = make_submission(self.alice, self.passed.task, 'FAIL')
+        self.assertIn(later.id, self.selected_ids(job))
+
+    def test_select_all_keeps_the_search(self):
+        job = self.queue('?q=alice', select_across='1', **{ACTION_CHECKBOX_NAME: [self.passed.id]})
+        self.assertEqual(self.selected_ids(job), {self.failed[0].id, self.passed.id})
+
+    def test_lookups_the_changelist_does_not_allow_are_refused(self):
+        job = BackgroundJob.objects.create(kind='EXPORT', params={'filters': {'student__password__startswith': ['pbkdf2']}})
+        with self.assertRaises(background_jobs.BackgroundJobError):
+            background_jobs.selected(job)
+
+    def test_wrong_model_is_refused(self):
+        with self.assertRaises(background_jobs.BackgroundJobError):
+            background_jobs.enqueue('ARCHIVE', Submission.objects.all())
@@ -0,0 +1,27 @@
+from django.test import SimpleTestCase
+
+from core.services.benchmarks import compare_results
+
+
+def results(min_ms, stdev_ms=0.0):
+    return {'results': {'bench[100]': {'min_ms': min_ms, 'median_ms': min_ms * 1.5, 'stdev_ms': stdev_ms}}}
+
+
+class CompareResultsTests(SimpleTestCase):
+    def test_slowdown_beyond_threshold_is_a_regression(self):
+        [row] = compare_results(results(100.0, 1.0), results(120.0, 1.0))
+        self.assertEqual((row['change_pct'], row['regression']), (20.0, True))
+
+    def test_fastest_runs_are_compared(self):
+        # A slow outlier moves the median, not the minimum.
+        current = results(101.0)
+        current['results']['bench[100]']['median_ms'] = 300.0
+        self.assertFalse(compare_results(results(100.0), current)[0]['regression'])
+
+    def test_noisy_benchmark_needs_a_larger_slowdown(self):
+        self.assertFalse(compare_results(results(100.0, 10.0), results(120.0, 2.0))[0]['regression'])
+        self.assertTrue(compare_results(results(100.0, 10.0), results(140.0, 2.0))[0]['regression'])
+
+    def test_baseline_without_deviation_still_compares(self):
+        baseline = {'results': {'bench[100]': {'min_ms': 100.0, 'median_ms': 100.0}}}
+        self.assertTrue(compare_results(baseline, results(150.0))[0]['regression'])
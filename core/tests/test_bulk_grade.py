@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.tests.utils import TEST_STORAGES, make_assignment, make_submission, make_task, make_user
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class BulkGradeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = make_user('teacher', role='TEACHER')
+        cls.task = make_task(make_assignment(cls.teacher), validation_type='MANUAL')
+        other_task = make_task(make_assignment(cls.teacher))
+        student = make_user('student')
+        cls.submission = make_submission(student, cls.task)
+        cls.other = make_submission(student, other_task)
+
+    def setUp(self):
+        self.client.force_login(self.teacher)
+
+    def test_malformed_keys_are_ignored(self):
+        response = self.client.post(reverse('bulk_grade', args=[self.task.id]), {
+            'grade-': '5', 'grade-x': '5', f'grade-{self.submission.id}': '80',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.manual_grade, Decimal('80.00'))
+
+    def test_submissions_of_other_tasks_are_not_graded(self):
+        self.client.post(reverse('bulk_grade', args=[self.task.id]), {f'grade-{self.other.id}': '80'})
+        self.other.refresh_from_db()
+        self.assertIsNone(self.other.manual_grade)
+
+    def test_malformed_page_cursor(self):
+        response = self.client.get(reverse('bulk_grade', args=[self.task.id]), {'after': 'x'})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,72 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+
+from core.services.comparators import CHUNK_SIZE, bound_output, get_comparator
+
+JS_COMPARATORS = Path(__file__).resolve().parent.parent / 'static' / 'core' / 'js' / 'comparators.js'
+NODE = shutil.which('node')
+
+# Evaluates comparators.js and runs every [comparator, tolerance, expected, actual] case from stdin.
+NODE_RUNNER = """
+const fs = require('fs');
+const vm = require('vm');
+const { compare, boundOutput } = vm.runInNewContext(fs.readFileSync(process.argv[1], 'utf8') + ';Comparators');
+const input = JSON.parse(fs.readFileSync(0, 'utf8'));
+process.stdout.write(JSON.stringify({
+    compared: input.cases.map(([name, tolerance, expected, actual]) => compare(name, tolerance, expected, actual)),
+    bounded: input.bounded.map(text => boundOutput(text)),
+}));
+"""
+
+COMPARATORS = ['EXACT', 'WHITESPACE', 'TOKEN', 'FLOAT']
+OUTPUTS = [
+    ('1\n2\n3\n', '1\n2\n3'),
+    ('1\n2\n3\n', '1\n2\n4\n'),
+    ('a b\n\nc\n', '  a   b\nc  \n\n'),
+    ('a\n', 'a\r\n'),
+    ('x y\n', 'x y\n'),
+    ('x\x1cy\n', 'x y\n'),
+    ('﻿1\n', '1\n'),
+    ('1\n2\n', '1\n'),
+    ('1\n', '1\n2\n'),
+    ('', '\n\n'),
+    ('0.1 2\n', '0.1000001 2.0\n'),
+    ('1e6\n', '1000001\n'),
+    ('nan\n', 'nan\n'),
+    ('1.0\n', 'inf\n'),
+    ('é' * 200 + '\n', 'é' * 199 + 'e\n'),
+    ('\U0001F600' * 130 + '\n', '\U0001F600' * 129 + ':)\n'),
+    ('\n'.join(str(i) for i in range(50)), '\n'.join(str(i) for i in range(49)) + '\nx'),
+    ('x' * CHUNK_SIZE + '\nend\n', 'x' * CHUNK_SIZE + '\nEnd\n'),
+    ('ab' * CHUNK_SIZE, 'ab' * CHUNK_SIZE + 'c'),
+]
+BOUNDED = ['short', 'a' * 5000, '\U0001F600' * 3999 + 'ab', '\U0001F600' * 4001]
+
+
+@skipIf(NODE is None, 'node is not installed')
+class ComparatorParityTests(SimpleTestCase):
+    """The browser runner must report exactly what the server judge reports."""
+
+    def run_js(self, cases):
+        completed = subprocess.run(
+            [NODE, '-e', NODE_RUNNER, str(JS_COMPARATORS)],
+            input=json.dumps({'cases': cases, 'bounded': BOUNDED}), capture_output=True, text=True,
+            encoding='utf-8', check=True, timeout=60,
+        )
+        return json.loads(completed.stdout)
+
+    def test_comparators_agree(self):
+        cases = [[name, 1e-6, expected, actual] for name in COMPARATORS for expected, actual in OUTPUTS]
+        results = self.run_js(cases)
+        for (name, tolerance, expected, actual), js in zip(cases, results['compared']):
+            with self.subTest(comparator=name, expected=expected[:40], actual=actual[:40]):
+                self.assertEqual(get_comparator(name, tolerance).compare(expected, actual), js)
+
+    def test_bound_output_agrees(self):
+        results = self.run_js([])
+        self.assertEqual([bound_output(text) for text in BOUNDED], results['bounded'])
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.db import InterfaceError, OperationalError, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.db_connections import is_disconnect, retry_on_disconnect
+
+
+class Flaky:
+    """Raises the given errors on the first calls, then returns 'ok'."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+class IsDisconnectTests(SimpleTestCase):
+    def test_mysql_codes_and_messages(self):
+        self.assertTrue(is_disconnect(OperationalError(2006, 'MySQL server has gone away')))
+        self.assertTrue(is_disconnect(InterfaceError('connection already closed')))
+        self.assertTrue(is_disconnect(OperationalError('server closed the connection unexpectedly')))
+
+    def test_driver_error_as_cause(self):
+        error = OperationalError('wrapped')
+        error.__cause__ = OperationalError(2013, 'Lost connection to MySQL server during query')
+        self.assertTrue(is_disconnect(error))
+
+    def test_failing_queries_are_not_disconnects(self):
+        self.assertFalse(is_disconnect(OperationalError(1054, "Unknown column 'x'")))
+        self.assertFalse(is_disconnect(OperationalError('no such table: core_task')))
+        self.assertFalse(is_disconnect(ValueError('server has gone away')))
+
+
+@override_settings(DB_RETRY_ATTEMPTS=2)
+@mock.patch('core.db_connections.time.sleep')
+@mock.patch('core.db_connections.close_old_connections')
+class RetryOnDisconnectTests(SimpleTestCase):
+    def test_retried_on_a_new_connection(self, close_old_connections, sleep):
+        func = Flaky(OperationalError(2006, 'MySQL server has gone away'))
+        self.assertEqual(retry_on_disconnect(func)(), 'ok')
+        self.assertEqual(func.calls, 2)
+        close_old_connections.assert_called_once()
+        sleep.assert_called_once()
+
+    def test_gives_up_after_the_configured_attempts(self, close_old_connections, sleep):
+        func = Flaky(*[OperationalError(2006, 'gone')] * 3)
+        with self.assertRaises(OperationalError):
+            retry_on_disconnect(func)()
+        self.assertEqual(func.calls, 3)
+
+    def test_other_errors_are_not_retried(self, close_old_connections, sleep):
+        func = Flaky(OperationalError(1205, 'Lock wait timeout exceeded'))
+        with self.assertRaises(OperationalError):
+            retry_on_disconnect(attempts=5)(func)()
+        self.assertEqual(func.calls, 1)
+
+
+class RetryInTransactionTests(TestCase):
+    @mock.patch('core.db_connections.time.sleep')
+    def test_nothing_is_retried_inside_atomic(self, sleep):
+        func = Flaky(OperationalError(2006, 'MySQL server has gone away'))
+        with self.assertRaises(OperationalError), transaction.atomic():
+            retry_on_disconnect(func)()
+        self.assertEqual(func.calls, 1)
+        sleep.assert_not_called()
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from core.db_router import (
+    PIN_COOKIE, ReplicaRouter, ReplicaRoutingMiddleware, health, replica_lag, replica_reads,
+    stream_with_replica_reads, use_replica, write_heartbeat,
+)
+from core.models import ReplicationHeartbeat, Submission, User
+
+router = ReplicaRouter()
+
+
+def read_alias():
+    return router.db_for_read(Submission)
+
+
+@mock.patch('core.db_router.replica_aliases', return_value=['replica_0'])
+@mock.patch('core.db_router.health.usable', return_value=True)
+class ReplicaRoutingTests(TestCase):
+    def run_view(self, view, method='get', cookies=None):
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies or {})
+
+        def handler(request):  # the handler runs process_view inside the middleware chain
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        middleware = ReplicaRoutingMiddleware(handler)
+        return middleware(request)
+
+    def test_reads_use_the_primary_outside_marked_code(self, *mocks):
+        self.assertIsNone(read_alias())
+        seen = []
+        self.run_view(lambda request: seen.append(read_alias()) or HttpResponse())
+        self.assertEqual(seen, [None])
+
+    def test_marked_view_reads_from_the_replica(self, *mocks):
+        seen = []
+
+        @use_replica
+        def view(request):
+            seen.append(read_alias())
+            return HttpResponse()
+
+        self.run_view(view)
+        self.assertEqual(seen, ['replica_0'])
+        self.assertIsNone(read_alias())
+
+    def test_pinned_user_reads_from_the_primary(self, *mocks):
+        seen = []
+
+        @use_replica
+        def view(request):
+            seen.append(read_alias())
+            return HttpResponse()
+
+        self.run_view(view, cookies={PIN_COOKIE: '1'})
+        self.assertEqual(seen, [None])
+
+    def test_write_pins_the_user(self, *mocks):
+        response = self.run_view(lambda request: router.db_for_write(User) and HttpResponse())
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_unhealthy_replica_falls_back_to_the_primary(self, usable, aliases):
+        usable.return_value = False
+        with replica_reads():
+            self.assertEqual(read_alias(), 'default')
+
+    def test_streamed_body_keeps_the_view_routing(self, *mocks):
+        @use_replica
+        def view(request):
+            return StreamingHttpResponse(stream_with_replica_reads(iter([1, 2])))
+
+        response = self.run_view(view)
+        self.assertIsNone(read_alias())  # the middleware has returned
+        seen = []
+        for _ in response.streaming_content:
+            seen.append(read_alias())
+        self.assertEqual(seen, ['replica_0', 'replica_0'])
+
+
+class ReplicaLagTests(TestCase):
+    def beat(self, seconds_ago):
+        ReplicationHeartbeat.objects.create(beat_at=timezone.now() - timedelta(seconds=seconds_ago))
+
+    def test_up_to_date_replica_has_no_lag(self):
+        # The primary doubles as a replica that has every heartbeat.
+        write_heartbeat()
+        self.assertLess(replica_lag('default'), 1.0)
+        self.assertEqual(ReplicationHeartbeat.objects.count(), 1)
+
+    def test_heartbeats_are_rate_limited(self):
+        write_heartbeat()
+        write_heartbeat()
+        self.assertEqual(ReplicationHeartbeat.objects.count(), 1)
+
+    def test_replica_without_heartbeats_is_not_used(self):
+        self.assertEqual(replica_lag('default'), float('inf'))
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=5, REPLICA_LAG_CHECK_SECONDS=10)
+    @mock.patch('core.db_router.heartbeats.start')
+    def test_lag_between_the_limit_and_the_check_interval_is_seen(self, start):
+        # The replica stopped replicating 8s ago; the primary kept writing beats since.
+        self.beat(20)
+        self.beat(8)
+        self.assertAlmostEqual(replica_lag('default'), 8.0, delta=1.0)
+        health.reset()
+        self.addCleanup(health.reset)
+        self.assertFalse(health.usable('default'))
+        start.assert_called_once()
@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from core.models import Submission
+from core.services.grade_export import GradeExporter
+from core.services.submission_archiver import SubmissionArchiver
+from core.tests.utils import make_assignment, make_submission, make_task, make_user
+
+
+class GradeExporterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.assignment = make_assignment(ended_days_ago=200)
+        cls.first = make_task(cls.assignment, title='First', order=1)
+        cls.second = make_task(cls.assignment, title='Second', order=2)
+        cls.alice = make_user('alice')
+        cls.bob = make_user('bob')
+        cls.alice_first = make_submission(cls.alice, cls.first, 'FAIL')
+        make_submission(cls.alice, cls.first, 'ERROR')
+        make_submission(cls.alice, cls.first, 'PASS')
+        make_submission(cls.alice, cls.first, 'FAIL')
+        make_submission(cls.bob, cls.second, 'FAIL', manual_grade=Decimal('7.5'))
+
+    def test_one_row_per_student_and_task(self):
+        rows = list(GradeExporter(self.assignment).rows())
+        self.assertEqual([(r['student'], r['task']) for r in rows], [('alice', 'First'), ('bob', 'Second')])
+        alice, bob = rows
+        self.assertEqual(alice['attempts'], 4)
+        self.assertEqual(alice['best_result'], 'PASS')
+        self.assertTrue(alice['passed'])
+        self.assertIsNone(alice['manual_grade'])
+        self.assertEqual(bob['best_result'], 'FAIL')
+        self.assertFalse(bob['passed'])
+        self.assertEqual(bob['manual_grade'], Decimal('7.5'))
+
+    def test_csv_header_and_columns(self):
+        lines = list(GradeExporter(self.assignment).iter_csv())
+        self.assertEqual(lines[0].strip(), ','.join(GradeExporter.COLUMNS))
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith('alice,First,4,PASS,True,,'))
+
+    def test_archived_attempts_are_merged_back(self):
+        before = list(GradeExporter(self.assignment).rows())
+        moved = SubmissionArchiver(older_than_days=90).archive_assignment(self.assignment)
+        self.assertEqual(moved, 2)
+        self.assertEqual(list(GradeExporter(self.assignment).rows()), before)
+
+    def test_collapsed_resubmissions_count_as_attempts(self):
+        Submission.objects.filter(id=self.alice_first.id).update(attempt_count=3)
+        self.assertEqual(next(GradeExporter(self.assignment).rows())['attempts'], 6)
+        SubmissionArchiver(older_than_days=90).archive_assignment(self.assignment)
+        self.assertEqual(next(GradeExporter(self.assignment).rows())['attempts'], 6)
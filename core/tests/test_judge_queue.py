@@ -0,0 +1,101 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.management.commands import run_judge
+from core.models import JudgeJob
+from core.services.judge import JudgeError, sandbox_command
+from core.services.judge_queue import JudgeQueue
+from core.tests.utils import make_assignment, make_submission, make_task, make_user
+
+
+class JudgeQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.task = make_task(make_assignment())
+        cls.alice = make_user('alice')
+        cls.bob = make_user('bob')
+
+    def enqueue(self, student, priority=JudgeJob.PRIORITY_LIVE):
+        return JudgeQueue.enqueue(make_submission(student, self.task), priority)
+
+    def test_higher_priority_class_is_claimed_first(self):
+        self.enqueue(self.alice, JudgeJob.PRIORITY_BACKGROUND)
+        rejudge = self.enqueue(self.alice, JudgeJob.PRIORITY_REJUDGE)
+        live = self.enqueue(self.bob, JudgeJob.PRIORITY_LIVE)
+        queue = JudgeQueue(total_workers=4, max_share=1.0)
+        self.assertEqual([queue.claim('w').id for _ in range(2)], [live.id, rejudge.id])
+        self.assertEqual(JudgeJob.objects.get(id=live.id).status, 'RUNNING')
+
+    def test_student_at_fair_share_is_skipped(self):
+        first = self.enqueue(self.alice)
+        self.enqueue(self.alice)
+        bobs = self.enqueue(self.bob)
+        queue = JudgeQueue(total_workers=4, max_share=0.25)  # one job per student
+        self.assertEqual(queue.claim('w1').id, first.id)
+        self.assertEqual(queue.claim('w2').id, bobs.id)
+        self.assertIsNone(queue.claim('w3'))
+
+    def test_fair_share_counts_jobs_of_other_processes(self):
+        running = self.enqueue(self.alice)
+        JudgeJob.objects.filter(id=running.id).update(status='RUNNING', worker='other-host:1:0')
+        self.enqueue(self.alice)
+        # One worker here, but the share is of all eight.
+        queue = JudgeQueue(total_workers=8, max_share=0.25)
+        self.assertIsNotNone(queue.claim('w'))
+        self.assertIsNone(queue.claim('w'))
+
+    def test_long_waiting_job_is_taken_first(self):
+        old = self.enqueue(self.alice)
+        self.enqueue(self.bob)
+        JudgeJob.objects.filter(id=old.id).update(enqueued_at=timezone.now() - timedelta(minutes=5))
+        queue = JudgeQueue(total_workers=4, max_share=1.0, max_wait_seconds=60)
+        self.assertEqual(queue.claim('w').id, old.id)
+
+
+class JudgeSandboxTests(TestCase):
+    @override_settings(JUDGE_SANDBOX='none', DEBUG=False)
+    def test_unsandboxed_judge_is_refused_outside_debug(self):
+        with self.assertRaises(JudgeError):
+            sandbox_command(['python'], '/tmp')
+
+    @override_settings(JUDGE_SANDBOX='none', DEBUG=True)
+    def test_unsandboxed_judge_is_allowed_in_debug(self):
+        self.assertEqual(sandbox_command(['python'], '/tmp'), ['python'])
+
+    @override_settings(JUDGE_SANDBOX='bwrap')
+    def test_bwrap_confines_the_solution(self):
+        try:
+            command = sandbox_command(['python', '/sandbox/solution.py'], '/tmp/judge_x')
+        except JudgeError:
+            self.skipTest('bubblewrap is not installed')
+        self.assertIn('--unshare-all', command)
+        self.assertEqual(command[command.index('--ro-bind') + 1:command.index('--ro-bind') + 3], ['/tmp/judge_x', '/sandbox'])
+        self.assertEqual(command[-3:], ['--', 'python', '/sandbox/solution.py'])
+
+
+class PassingRunner:
+    def judge(self, submission):
+        return 'PASS', 'Test Case 1 Passed.\n', []
+
+
+class RunJudgeOnceTests(TestCase):
+    def test_once_waits_for_jobs_held_back_by_the_fair_share(self):
+        task = make_task(make_assignment())
+        student = make_user('student')
+        elsewhere, held_back = (JudgeQueue.enqueue(make_submission(student, task)) for _ in range(2))
+        JudgeJob.objects.filter(id=elsewhere.id).update(status='RUNNING', worker='other-host:1:0')
+
+        def other_process_finishes(seconds):
+            JudgeJob.objects.filter(id=elsewhere.id).update(status='DONE')
+
+        command = run_judge.Command()
+        command._stop, command._lock, command._judged = threading.Event(), threading.Lock(), 0
+        with mock.patch.object(run_judge.time, 'sleep', side_effect=other_process_finishes) as sleep:
+            command._work(JudgeQueue(total_workers=1), PassingRunner(), 'w', {'once': True, 'poll_interval': 0})
+        sleep.assert_called_once()
+        self.assertEqual(JudgeJob.objects.get(id=held_back.id).status, 'DONE')
+        self.assertEqual(command._judged, 1)
@@ -0,0 +1,26 @@
+from django.test import SimpleTestCase
+
+from core.services.loadtest import TrafficReplayer
+
+
+class ReportTests(SimpleTestCase):
+    def replayer(self, *samples):
+        replayer = TrafficReplayer({}, clients=1, requests_per_client=0)
+        for view, seconds, status in samples:
+            replayer._record(view, seconds, 1, status)
+        return replayer
+
+    def test_rejected_requests_are_not_throughput(self):
+        report = self.replayer(
+            ('submit_task', 0.5, 200), ('submit_task', 0.001, 503), ('leaderboard', 0.001, 429),
+            ('leaderboard', 0.1, 200),
+        ).report(elapsed=1.0)
+        summary = report['summary']
+        self.assertEqual((summary['requests'], summary['rejected'], summary['errors']), (4, 2, 0))
+        self.assertEqual(summary['throughput_rps'], 2.0)
+        self.assertEqual(report['views']['submit_task']['p50_ms'], 500.0)
+        self.assertEqual((report['views']['leaderboard']['throttled'], report['views']['submit_task']['shed']), (1, 1))
+
+    def test_view_with_only_rejections(self):
+        view = self.replayer(('submit_task', 0.001, 503)).report(elapsed=1.0)['views']['submit_task']
+        self.assertEqual((view['shed'], view['mean_ms'], view['p95_ms']), (1, 0.0, 0.0))
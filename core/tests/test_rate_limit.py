@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.services import rate_limit
+from core.services.rate_limit import SubmissionThrottle, TokenBucket
+from core.tests.utils import make_assignment
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        patcher = mock.patch.object(rate_limit, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_then_refill_rate(self):
+        bucket = TokenBucket('t', rate_per_minute=6, burst=3)
+        self.assertEqual([bucket.take() for _ in range(3)], [None] * 3)
+        self.assertAlmostEqual(bucket.take(), 10.0)
+        self.clock.now += 10
+        self.assertIsNone(bucket.take())
+        self.assertIsNotNone(bucket.take())
+
+    def test_full_bucket_does_not_save_up(self):
+        bucket = TokenBucket('t', rate_per_minute=6, burst=2)
+        bucket.take()
+        self.clock.now += 3600
+        self.assertEqual([bucket.take() is None for _ in range(3)], [True, True, False])
+
+    def test_refund_gives_the_token_back(self):
+        bucket = TokenBucket('t', rate_per_minute=6, burst=1)
+        bucket.take()
+        bucket.refund()
+        self.assertIsNone(bucket.take())
+
+    def test_zero_rate_disables_the_bucket(self):
+        bucket = TokenBucket('t', rate_per_minute=0, burst=0)
+        self.assertEqual([bucket.take() for _ in range(100)], [None] * 100)
+
+
+@override_settings(SUBMIT_TASK_RATE_PER_MINUTE=6, SUBMIT_TASK_BURST=1,
+                   SUBMIT_STUDENT_RATE_PER_MINUTE=6, SUBMIT_STUDENT_BURST=2)
+class SubmissionThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_task_limit_does_not_use_up_the_student_limit(self):
+        throttle = SubmissionThrottle(make_assignment())
+        self.assertIsNone(throttle.check(1, 10))
+        self.assertEqual(throttle.check(1, 10), 10)  # refunds the student token it took
+        self.assertIsNone(throttle.check(1, 11))
+        self.assertIsNotNone(throttle.check(1, 12))
+
+    def test_assignment_overrides_the_defaults(self):
+        throttle = SubmissionThrottle(make_assignment(submit_task_rate=0))
+        self.assertEqual([throttle.check(1, 10) for _ in range(2)], [None, None])
+        self.assertIsNotNone(throttle.check(1, 10))
@@ -0,0 +1,123 @@
+import csv
+import io
+import os
+import stat
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.models import User
+from core.services.roster import RosterError, RosterProvisioner
+from core.tests.utils import make_user
+
+
+def roster(text):
+    return io.StringIO(text.lstrip())
+
+
+class RosterReadTests(TestCase):
+    def read(self, text, **kwargs):
+        return RosterProvisioner(workers=1, **kwargs).read(roster(text))
+
+    def test_rows_are_normalized(self):
+        [entry] = self.read("username,email,role,password\n alice ,a@example.com,teacher, pass word \n")
+        self.assertEqual(
+            (entry['username'], entry['role'], entry['password'], entry['first_name']),
+            ('alice', 'TEACHER', ' pass word ', ''),
+        )
+        [entry] = self.read("username\nbob\n", default_role='TEACHER')
+        self.assertEqual(entry['role'], 'TEACHER')
+
+    def test_invalid_rosters_name_the_line(self):
+        for text, message in [
+            ("email\na@example.com\n", "needs a header row with a 'username' column"),
+            ("username,age\nalice,7\n", "Unknown columns: age"),
+            ("username\nalice\nal ice\n", "Line 3: Invalid username 'al ice'"),
+            ("username\nalice\nalice\n", "Line 3: Duplicate username 'alice'"),
+            ("username,role\nalice,admin\n", "Line 2: Invalid role 'ADMIN'"),
+            ("username,email\nalice,nope\n", "Line 2: Invalid email 'nope'"),
+        ]:
+            with self.subTest(message=message), self.assertRaisesMessage(RosterError, message):
+                self.read(text)
+
+    def test_invalid_default_role_is_refused(self):
+        with self.assertRaises(RosterError):
+            RosterProvisioner(default_role='ADMIN')
+
+
+class RosterProvisionTests(TestCase):
+    def provision(self, text, **kwargs):
+        provisioner = RosterProvisioner(workers=1)
+        return provisioner.provision(provisioner.read(roster(text)), **kwargs)
+
+    def test_roles_and_approval(self):
+        stats = self.provision("username,role,password\nalice,student,pw1\nterry,teacher,pw2\n")
+        self.assertEqual((stats['created'], stats['credentials']), (2, []))
+        alice, terry = User.objects.get(username='alice'), User.objects.get(username='terry')
+        self.assertEqual((alice.role, alice.is_approved), ('STUDENT', True))
+        self.assertEqual((terry.role, terry.is_approved), ('TEACHER', False))
+        self.assertTrue(alice.check_password('pw1'))
+
+        provisioner = RosterProvisioner(workers=1, approve_teachers=True)
+        provisioner.provision(provisioner.read(roster("username,role,password\ntina,teacher,pw\n")))
+        self.assertTrue(User.objects.get(username='tina').is_approved)
+
+    def test_existing_usernames_are_skipped(self):
+        existing = make_user('alice')
+        stats = self.provision("username,role\nalice,teacher\nbob,student\n")
+        self.assertEqual((stats['created'], stats['skipped']), (1, 1))
+        self.assertEqual([c['username'] for c in stats['credentials']], ['bob'])
+        alice = User.objects.get(username='alice')
+        self.assertEqual((alice.password, alice.role), (existing.password, 'STUDENT'))
+        self.assertEqual(self.provision("username\nalice\nbob\n")['created'], 0)
+
+    def test_users_a_concurrent_run_created_are_not_counted(self):
+        def concurrent_run(credentials):
+            make_user('bob')
+
+        stats = self.provision("username\nalice\nbob\n", before_insert=concurrent_run)
+        self.assertEqual((stats['created'], stats['skipped']), (1, 1))
+        self.assertEqual([c['username'] for c in stats['credentials']], ['alice'])
+
+    def test_dry_run_creates_nothing(self):
+        stats = self.provision("username\nalice\n", dry_run=True)
+        self.assertEqual(stats['created'], 1)
+        self.assertFalse(User.objects.exists())
+
+
+class ProvisionUsersCommandTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.roster = os.path.join(directory.name, 'roster.csv')
+        self.out = os.path.join(directory.name, 'passwords.csv')
+        with open(self.roster, 'w') as f:
+            f.write("username\nalice\nbob\n")
+
+    def provision(self):
+        call_command('provision_users', self.roster, '--workers', '1', '--credentials-out', self.out,
+                     stdout=io.StringIO())
+
+    def credentials(self):
+        with open(self.out, newline='') as f:
+            return {row['username']: row['password'] for row in csv.DictReader(f)}
+
+    def test_credentials_file_is_private(self):
+        self.provision()
+        self.assertEqual(stat.S_IMODE(os.stat(self.out).st_mode), 0o600)
+        self.assertTrue(User.objects.get(username='alice').check_password(self.credentials()['alice']))
+
+    def test_credentials_are_on_disk_before_users_are_created(self):
+        with mock.patch('core.services.roster.User.objects.bulk_create', side_effect=RuntimeError('db down')):
+            with self.assertRaises(RuntimeError):
+                self.provision()
+        self.assertEqual(set(self.credentials()), {'alice', 'bob'})
+
+    def test_existing_credentials_file_is_not_overwritten(self):
+        open(self.out, 'w').close()
+        with self.assertRaisesMessage(CommandError, 'already exists'):
+            self.provision()
+        self.assertFalse(User.objects.exists())
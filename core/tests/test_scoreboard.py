@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.services import scoreboard
+from core.tests.utils import TEST_STORAGES, make_assignment, make_submission, make_task, make_user
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class ScoreboardSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.assignment = make_assignment(title='Contest', public_scoreboard=True)
+        cls.task = make_task(cls.assignment)
+        cls.alice = make_user('alice')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(SCOREBOARD_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def standings(self):
+        with open(scoreboard.snapshot_path(self.assignment.id, 'json'), 'rb') as f:
+            return json.loads(f.read())['standings']
+
+    def snapshot_round(self):
+        out = StringIO()
+        call_command('snapshot_scoreboards', '--once', stdout=out)
+        return out.getvalue()
+
+    def test_command_picks_up_new_submissions(self):
+        self.assertIn("Updated scoreboard of 'Contest'", self.snapshot_round())
+        self.assertEqual(self.standings(), [])
+        make_submission(self.alice, self.task, 'PASS')
+        self.assertIn("Updated scoreboard of 'Contest'", self.snapshot_round())
+        self.assertEqual([(s['username'], s['solved_count']) for s in self.standings()], [('alice', 1)])
+        self.assertIn("unchanged", self.snapshot_round())
+
+    def test_frozen_scoreboard_leaves_out_late_submissions(self):
+        self.assignment.end_time = timezone.now() + timedelta(minutes=10)
+        self.assignment.scoreboard_freeze_minutes = 30
+        make_submission(self.alice, self.task, 'PASS')
+        scoreboard.write_snapshot(self.assignment)
+        self.assertEqual(self.standings(), [])
+
+    def test_private_scoreboards_are_taken_down(self):
+        scoreboard.write_snapshot(self.assignment)
+        self.assertEqual(scoreboard.prune_snapshots([]), 1)
+        self.assertFalse(os.path.exists(scoreboard.snapshot_path(self.assignment.id, 'json')))
+
+    def test_snapshot_is_served_with_etag(self):
+        scoreboard.write_snapshot(self.assignment)
+        url = reverse('public_scoreboard_json', args=[self.assignment.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from core.cache_versions import get_version
+from core.services.submission_archiver import SubmissionArchiver
+from core.tests.utils import make_assignment, make_submission, make_task, make_user
+
+
+class SubmissionDeleteSignalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.assignment = make_assignment(ended_days_ago=200)
+        cls.task = make_task(cls.assignment)
+        cls.student = make_user('student')
+
+    def test_single_delete_bumps_versions(self):
+        submission = make_submission(self.student, self.task)
+        versions = [
+            get_version('assignment', self.assignment.id),
+            get_version('dashboard', self.student.id),
+            get_version('dashboard', self.assignment.teacher_id),
+        ]
+        submission.delete()
+        self.assertEqual(
+            [
+                get_version('assignment', self.assignment.id),
+                get_version('dashboard', self.student.id),
+                get_version('dashboard', self.assignment.teacher_id),
+            ],
+            [version + 1 for version in versions],
+        )
+
+    def test_archival_bumps_once(self):
+        for result in ['FAIL', 'FAIL', 'FAIL', 'PASS']:
+            make_submission(self.student, self.task, result)
+        with mock.patch('core.signals.bump_version') as per_row, \
+                mock.patch('core.services.submission_archiver.bump_version') as once:
+            self.assertEqual(SubmissionArchiver().archive_assignment(self.assignment), 3)
+        per_row.assert_not_called()
+        once.assert_called_once_with('assignment', self.assignment.id)
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import BackgroundJob, SimilarityReport
+from core.services import background_jobs, similarity
+from core.services.similarity import SimilarityFinder, assignment_similar_pairs
+from core.tests.utils import make_assignment, make_submission, make_task, make_user
+
+CODE = """
+def solve(values):
+    total = 0
+    for value in values:
+        if value % 2 == 0:
+            total += value
+    return total
+print(solve([1, 2, 3, 4]))
+"""
+
+
+class AssignmentSimilarPairsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.assignment = make_assignment()
+        cls.task = make_task(cls.assignment)
+
+    def submit(self, username, content=CODE):
+        make_submission(make_user(username), self.task, content=content)  # signed by the post_save signal
+
+    def run_jobs(self):
+        while (job := background_jobs.claim('w')) is not None:
+            background_jobs.run(job)
+            self.assertEqual(job.status, 'DONE', job.result)
+
+    def test_pairs_are_computed_in_the_background(self):
+        self.submit('alice')
+        self.submit('bob', CODE.replace('values', 'numbers'))
+        with self.assertNumQueries(5):
+            self.assertEqual(assignment_similar_pairs(self.assignment), [])
+        self.assertEqual(BackgroundJob.objects.get().kind, 'SIMILARITY')
+        assignment_similar_pairs(self.assignment)  # already queued
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+
+        self.run_jobs()
+        [entry] = assignment_similar_pairs(self.assignment)
+        self.assertEqual(entry['task'], self.task)
+        self.assertEqual({entry['pairs'][0]['student_a'], entry['pairs'][0]['student_b']}, {'alice', 'bob'})
+
+    @override_settings(SIMILARITY_REFRESH_SECONDS=300)
+    def test_refreshed_only_after_changes_and_refresh_interval(self):
+        self.submit('alice')
+        self.submit('bob')
+        assignment_similar_pairs(self.assignment)
+        self.run_jobs()
+        assignment_similar_pairs(self.assignment)
+        self.assertFalse(BackgroundJob.objects.filter(status='QUEUED').exists())  # nothing changed
+        self.submit('carol')
+        assignment_similar_pairs(self.assignment)
+        self.assertFalse(BackgroundJob.objects.filter(status='QUEUED').exists())  # computed recently
+        SimilarityReport.objects.update(computed_at=timezone.now() - timedelta(seconds=301))
+        assignment_similar_pairs(self.assignment)
+        self.assertTrue(BackgroundJob.objects.filter(status='QUEUED').exists())
+
+    def test_oversized_buckets_are_skipped_and_reported(self):
+        for name in ('alice', 'bob', 'carol'):
+            self.submit(name)
+        finder = SimilarityFinder(self.task)
+        with mock.patch.object(similarity, 'MAX_BUCKET_SIZE', 2):
+            self.assertEqual(finder.find_pairs(), [])
+        self.assertEqual(finder.skipped_buckets, similarity.BANDS)
@@ -0,0 +1,70 @@
+import gzip
+import importlib.util
+import json
+import tempfile
+from unittest import skipUnless
+
+from django.test import TestCase
+
+from core.models import ArchivedSubmission, Submission, SubmissionArchive
+from core.services.submission_archiver import SubmissionArchiver
+from core.tests.utils import make_assignment, make_submission, make_task, make_user
+
+
+class SubmissionArchiverTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.old = make_assignment(ended_days_ago=200)
+        cls.recent = make_assignment(teacher=cls.old.teacher, ended_days_ago=10)
+        cls.task = make_task(cls.old)
+        cls.recent_task = make_task(cls.recent)
+        cls.student = make_user('student')
+        cls.attempts = [
+            make_submission(cls.student, cls.task, result, content=f"attempt {i}")
+            for i, result in enumerate(['FAIL', 'PASS', 'ERROR', 'FAIL', 'ERROR'])
+        ]
+        make_submission(cls.student, cls.recent_task, 'FAIL')
+        make_submission(cls.student, cls.recent_task, 'FAIL')
+
+    def test_only_ended_assignments_are_eligible(self):
+        self.assertEqual(list(SubmissionArchiver(older_than_days=90).eligible_assignments()), [self.old])
+
+    def test_keeps_best_and_last_attempt(self):
+        moved = SubmissionArchiver().archive_assignment(self.old)
+        self.assertEqual(moved, 3)
+        best, last = self.attempts[1], self.attempts[4]
+        self.assertEqual(
+            set(Submission.objects.filter(task=self.task).values_list('id', flat=True)), {best.id, last.id},
+        )
+        archive = SubmissionArchive.objects.get(assignment=self.old)
+        self.assertEqual(archive.row_count, 3)
+        archived = ArchivedSubmission.objects.filter(archive=archive).order_by('original_id')
+        self.assertEqual([a.original_id for a in archived], [self.attempts[i].id for i in (0, 2, 3)])
+        self.assertEqual(archived[0].content, 'attempt 0')
+
+    def test_dry_run_moves_nothing(self):
+        self.assertEqual(SubmissionArchiver().archive_assignment(self.old, dry_run=True), 3)
+        self.assertEqual(Submission.objects.filter(task=self.task).count(), 5)
+        self.assertFalse(ArchivedSubmission.objects.exists())
+
+    def test_second_run_has_nothing_left(self):
+        archiver = SubmissionArchiver()
+        archiver.archive_assignment(self.old)
+        self.assertEqual(archiver.archive_assignment(self.old), 0)
+        self.assertEqual(SubmissionArchive.objects.count(), 1)
+
+    def test_jsonl_dump(self):
+        with tempfile.TemporaryDirectory() as dump_dir:
+            SubmissionArchiver(dump_dir=dump_dir).archive_assignment(self.old)
+            archive = SubmissionArchive.objects.get()
+            with gzip.open(archive.dump_path, 'rt') as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual(sorted(row['content'] for row in rows), ['attempt 0', 'attempt 2', 'attempt 3'])
+
+    @skipUnless(importlib.util.find_spec('pyarrow') and importlib.util.find_spec('pandas'), 'needs pandas and pyarrow')
+    def test_parquet_dump_keeps_attempt_count(self):
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as dump_dir:
+            SubmissionArchiver(dump_dir=dump_dir, dump_format='parquet').archive_assignment(self.old)
+            table = pq.read_table(SubmissionArchive.objects.get().dump_path)
+        self.assertEqual(table.column('attempt_count').to_pylist(), [1, 1, 1])
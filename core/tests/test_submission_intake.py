@@ -0,0 +1,132 @@
+import asyncio
+import json
+import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import JudgeJob, Submission
+from core.services.judge_queue import JudgeQueue
+from core.services.submission_intake import IN_FLIGHT_WINDOW, SubmitGate, store_submission, submit_batch
+from core.tests.utils import make_assignment, make_submission, make_task, make_user
+
+
+def other_processes_in_flight(count):
+    cache.set(SubmitGate._key(int(time.time() // IN_FLIGHT_WINDOW)), count)
+
+
+@override_settings(SUBMIT_MAX_IN_FLIGHT=2, SERVER_JUDGE=False)
+class SubmitGateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_requests_are_counted_while_in_flight(self):
+        gate = SubmitGate()
+        with gate.admitted() as first, gate.admitted() as second:
+            self.assertEqual((first, second), (None, None))
+            self.assertEqual(gate.in_flight(), 2)
+            with gate.admitted() as third:
+                self.assertIsNotNone(third)
+            self.assertEqual(gate.in_flight(), 2)
+        self.assertEqual(gate.in_flight(), 0)
+
+    def test_requests_of_other_processes_count(self):
+        other_processes_in_flight(2)
+        with SubmitGate().admitted() as retry_after:
+            self.assertGreaterEqual(retry_after, 1)
+
+    def test_previous_window_still_counts(self):
+        window = int(time.time() // IN_FLIGHT_WINDOW)
+        cache.set(SubmitGate._key(window - 1), 2)
+        cache.set(SubmitGate._key(window - 2), 5)  # long gone
+        self.assertEqual(SubmitGate().in_flight(), 2)
+
+    def test_async_admission_is_released(self):
+        gate = SubmitGate()
+
+        async def submit():
+            retry_after, window = await gate.aadmit()
+            self.assertEqual((retry_after, gate.in_flight()), (None, 1))
+            await gate.arelease(window)
+
+        asyncio.run(submit())
+        self.assertEqual(gate.in_flight(), 0)
+
+    def test_busy_server_answers_503_with_retry_after(self):
+        other_processes_in_flight(2)
+        self.client.force_login(make_user('student'))
+        response = self.client.post(reverse('submit_batch'), json.dumps({'submissions': []}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 503)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+    @override_settings(SERVER_JUDGE=True, SUBMIT_MAX_JUDGE_BACKLOG=1)
+    def test_judge_backlog_sheds_load(self):
+        student = make_user('student')
+        task = make_task(make_assignment())
+        for _ in range(2):
+            JudgeQueue.enqueue(make_submission(student, task), JudgeJob.PRIORITY_LIVE)
+        with SubmitGate().admitted() as retry_after:
+            self.assertIsNotNone(retry_after)
+        self.assertEqual(SubmitGate().in_flight(), 0)
+
+
+@override_settings(SERVER_JUDGE=False)
+class StoreSubmissionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.task = make_task(make_assignment())
+        cls.student = make_user('student')
+
+    def test_identical_resubmission_counts_an_attempt(self):
+        first, created = store_submission(self.student, self.task, 'print(1)', 'FAIL', 'x')
+        again, created_again = store_submission(self.student, self.task, 'print(1)', 'FAIL', 'x')
+        self.assertEqual((created, created_again, again.id, again.attempt_count), (True, False, first.id, 2))
+
+    def test_a_different_verdict_is_kept_as_its_own_submission(self):
+        passed, _ = store_submission(self.student, self.task, 'print(1)', 'PASS', '')
+        failed, created = store_submission(self.student, self.task, 'print(1)', 'FAIL', 'flaky')
+        self.assertTrue(created)
+        self.assertEqual(Submission.objects.get(id=passed.id).auto_result, 'PASS')
+        self.assertEqual(failed.auto_result, 'FAIL')
+
+    @override_settings(SERVER_JUDGE=True)
+    def test_server_verdict_stands_for_the_same_code(self):
+        first, _ = store_submission(self.student, self.task, 'print(1)', 'PENDING', '')
+        Submission.objects.filter(id=first.id).update(auto_result='PASS')
+        again, created = store_submission(self.student, self.task, 'print(1)', 'PENDING', '')
+        self.assertEqual((created, again.id, again.auto_result), (False, first.id, 'PASS'))
+
+
+@override_settings(SERVER_JUDGE=False)
+class SubmitBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.task = make_task(make_assignment())
+        cls.student = make_user('student')
+
+    def setUp(self):
+        cache.clear()
+
+    def item(self, client_id, content='print(1)', result='FAIL'):
+        return {'client_id': client_id, 'task_id': self.task.id, 'content': content, 'auto_result': result}
+
+    def statuses(self, *items):
+        return [result['status'] for result in submit_batch(self.student, list(items))]
+
+    def test_retried_batch_is_not_stored_twice(self):
+        self.assertEqual(self.statuses(self.item('a'), self.item('b', 'print(2)'), self.item('a')),
+                         ['created', 'created', 'duplicate'])
+        self.assertEqual(self.statuses(self.item('a'), self.item('b', 'print(2)')), ['duplicate', 'duplicate'])
+        self.assertEqual(Submission.objects.count(), 2)
+
+    def test_ids_of_counted_attempts_are_remembered(self):
+        self.statuses(self.item('a'))
+        self.statuses(self.item('b'))  # counted on a's submission
+        self.assertEqual(self.statuses(self.item('a'), self.item('b')), ['duplicate', 'duplicate'])
+        self.assertEqual(Submission.objects.get().attempt_count, 2)
+
+    def test_invalid_items_fail_alone(self):
+        results = submit_batch(self.student, [self.item('a', result='GREAT'), {'client_id': 'b', 'task_id': 0}, self.item('c')])
+        self.assertEqual([r['status'] for r in results], ['error', 'error', 'created'])
@@ -0,0 +1,58 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Task, TestCase as TaskTestCase
+from core.services.test_case_delivery import test_cases_url
+from core.tests.utils import make_assignment, make_task, make_user
+
+
+class TestCaseDeliveryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.task = make_task(make_assignment(), cases=[('1', '1'), ('2', '4')])
+        cls.student = make_user('student')
+
+    def setUp(self):
+        self.client.force_login(self.student)
+
+    def current_url(self):
+        return test_cases_url(Task.objects.get(id=self.task.id))
+
+    def test_current_version_is_immutable(self):
+        response = self.client.get(self.current_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(len(response.json()['test_cases']), 2)
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get(self.current_url())['ETag']
+        response = self.client.get(self.current_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_change_gives_a_new_url_and_retires_the_old_one(self):
+        old_url = self.current_url()
+        old_etag = self.client.get(old_url)['ETag']
+        TaskTestCase.objects.create(task=self.task, input_data='3', expected_output='9')
+        new_url = self.current_url()
+        self.assertNotEqual(new_url, old_url)
+
+        stale = self.client.get(old_url, HTTP_IF_NONE_MATCH=old_etag)
+        self.assertEqual(stale.status_code, 200)
+        self.assertIn('no-cache', stale['Cache-Control'])
+        self.assertEqual(len(stale.json()['test_cases']), 3)
+        self.assertIn('immutable', self.client.get(new_url)['Cache-Control'])
+
+    def test_saving_a_stale_task_never_reuses_a_version(self):
+        stale = Task.objects.get(id=self.task.id)
+        used = {stale.test_cases_version}
+        TaskTestCase.objects.create(task=self.task, input_data='3', expected_output='9')
+        used.add(Task.objects.get(id=self.task.id).test_cases_version)
+        stale.title = 'Renamed'
+        stale.save()  # writes the old version back before the signal bumps it
+        self.assertNotIn(Task.objects.get(id=self.task.id).test_cases_version, used)
+
+    def test_compact_format_and_bad_format(self):
+        url = reverse('task_test_cases', args=[self.task.id])
+        self.assertEqual(self.client.get(url, {'format': 'compact'}).json()['cases'][1][1:], ['2', '4'])
+        self.assertEqual(self.client.get(url, {'format': 'xml'}).status_code, 400)
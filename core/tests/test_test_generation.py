@@ -0,0 +1,118 @@
+import json
+import random
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.html import escape
+
+from core.models import Assignment, BackgroundJob
+from core.services import background_jobs
+from core.services.assignment_importer import AssignmentImporter, AssignmentImportError
+from core.services.judge import JudgeRunner
+from core.services.test_generation import TestCaseGenerator, TestGenerationError, generate_case
+from core.tests.utils import TEST_STORAGES, make_user
+
+GENERATOR = "import random, sys\nprint(sys.argv[2], random.randint(1, 10**9))"
+SOLUTION = "index, value = input().split()\nprint(int(value) * 2)"
+
+
+def expected_case(seed, index):
+    random.seed(f"{seed}:{index}")
+    value = random.randint(1, 10**9)
+    return f"{index} {value}\n", f"{value * 2}\n"
+
+
+@override_settings(JUDGE_SANDBOX='none', DEBUG=True)
+class TestGenerationTests(TestCase):
+    def test_cases_are_seeded_per_index(self):
+        jobs = [(GENERATOR, SOLUTION, '7', index) for index in range(3)]
+        cases = TestCaseGenerator(workers=2).generate(jobs)
+        self.assertEqual(cases, [expected_case(7, index) for index in range(3)])
+
+    def test_failing_script_names_the_case(self):
+        with self.assertRaisesMessage(TestGenerationError, 'Case 2: reference solution failed: ZeroDivisionError'):
+            generate_case((GENERATOR, 'print(1 / 0)', '0', 1))
+
+    def test_scripts_run_outside_this_process(self):
+        generate_case(("import sys\nsys.modules.clear()\nprint(1)", 'print(input())', '0', 0))
+        self.assertIn('django', __import__('sys').modules)
+
+    def test_total_size_is_capped(self):
+        big = "print('x' * 400_000)"
+        jobs = [(big, 'print(input())', '0', index) for index in range(3)]
+        with self.assertRaisesMessage(TestGenerationError, 'exceed 1 MB in total'):
+            TestCaseGenerator(workers=2, max_total_mb=1).generate(jobs)
+        self.assertEqual(len(TestCaseGenerator(workers=1, max_total_mb=1).generate(jobs[:1])), 1)
+
+    def test_reserved_bytes_count_towards_the_limit(self):
+        with self.assertRaises(TestGenerationError):
+            TestCaseGenerator(max_total_mb=1).generate([], reserved_bytes=2 * 1024 * 1024)
+
+    def test_slow_script_is_stopped(self):
+        with self.assertRaisesMessage(TestGenerationError, 'generator took longer than 0.5s'):
+            generate_case(('while True: pass', SOLUTION, '0', 0), JudgeRunner(time_limit=0.5))
+
+
+@override_settings(JUDGE_SANDBOX='none', DEBUG=True, STORAGES=TEST_STORAGES)
+class GeneratedImportTests(TestCase):
+    def test_upload_with_generator_is_imported_in_the_background(self):
+        teacher = make_user('teacher', role='TEACHER')
+        data = {
+            'title': 'Generated', 'tasks': [{
+                'title': 'Double', 'description': '', 'validation_type': 'AUTO', 'reference_solution': SOLUTION,
+                'generator': {'script': GENERATOR, 'count': 2, 'seed': 3},
+            }],
+        }
+        self.client.force_login(teacher)
+        upload = SimpleUploadedFile('a.json', json.dumps(data).encode('utf-8'))
+        response = self.client.post(reverse('import_assignment'), {'json_file': upload})
+        self.assertRedirects(response, reverse('import_assignment'))
+        self.assertFalse(Assignment.objects.exists())
+
+        job = background_jobs.claim('w')
+        self.assertEqual((job.kind, job.created_by), ('IMPORT', teacher))
+        background_jobs.run(job)
+        self.assertEqual(job.status, 'DONE', job.result)
+        task = Assignment.objects.get(title='Generated').tasks.get()
+        self.assertEqual(
+            list(task.test_cases.order_by('id').values_list('input_data', 'expected_output')),
+            [expected_case(3, 0), expected_case(3, 1)],
+        )
+        self.assertContains(self.client.get(reverse('import_assignment')), escape(job.result))
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+
+    def import_data(self, title):
+        return {
+            'title': title, 'tasks': [{
+                'title': 'Double', 'description': '', 'validation_type': 'AUTO', 'reference_solution': SOLUTION,
+                'generator': {'script': GENERATOR, 'count': 2, 'seed': 3},
+            }],
+        }
+
+    def test_cases_are_reused_only_by_their_teacher(self):
+        class Recording(TestCaseGenerator):
+            def generate(self, jobs, reserved_bytes=0):
+                self.jobs = list(jobs)
+                return super().generate(jobs, reserved_bytes)
+
+        teacher = make_user('teacher', role='TEACHER')
+        AssignmentImporter(teacher).import_from_dict(self.import_data('First'))
+        again, other = Recording(), Recording()
+        AssignmentImporter(teacher, generator=again).import_from_dict(self.import_data('Again'))
+        AssignmentImporter(make_user('other', role='TEACHER'), generator=other).import_from_dict(
+            self.import_data('Other')
+        )
+        self.assertEqual((len(again.jobs), len(other.jobs)), (0, 2))
+
+    def test_oversized_import_is_refused(self):
+        teacher = make_user('teacher', role='TEACHER')
+        with self.assertRaisesMessage(AssignmentImportError, 'exceed 1 MB in total'):
+            AssignmentImporter(teacher, generator=TestCaseGenerator(max_total_mb=1)).import_from_dict({
+                'title': 'Big', 'tasks': [{
+                    'title': 'Big', 'description': '', 'validation_type': 'AUTO',
+                    'reference_solution': 'print(input())',
+                    'generator': {'script': "print('x' * 600_000)", 'count': 2},
+                }],
+            })
+        self.assertFalse(Assignment.objects.exists())
@@ -0,0 +1,67 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.models import Task, TestCase as TaskTestCase
+from core.services.test_ordering import judge_order, record_browser_runs, record_runs
+from core.tests.utils import make_assignment, make_task
+
+
+class TestOrderingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        assignment = make_assignment()
+        cls.task = make_task(assignment, cases=[('1', '1'), ('2', '2'), ('3', '3')])
+        cls.other_task = make_task(assignment, cases=[('4', '4')])
+        cls.cases = list(TaskTestCase.objects.filter(task=cls.task).order_by('id'))
+
+    def setUp(self):
+        cache.clear()
+
+    def counters(self):
+        return list(TaskTestCase.objects.filter(task=self.task).order_by('id').values_list('run_count', 'fail_count', 'total_ms'))
+
+    def report(self, *runs):
+        return json.dumps([[case.id, verdict, ms] for case, verdict, ms in runs])
+
+    def test_runs_are_recorded_in_one_update(self):
+        first, second, third = self.cases
+        cache.add(f"test_order:checked:{self.task.id}", True)  # the order was checked recently
+        with self.assertNumQueries(1):
+            record_runs(self.task.id, [
+                {'test_case_id': first.id, 'verdict': 'PASS', 'cpu_ms': 5.0},
+                {'test_case_id': second.id, 'verdict': 'FAIL', 'cpu_ms': None, 'wall_ms': 7.0},
+            ])
+        self.assertEqual(self.counters(), [(1, 0, 5.0), (1, 1, 7.0), (0, 0, 0.0)])
+
+    def test_consistent_browser_report_is_recorded(self):
+        first, second, third = self.cases
+        raw = self.report((first, 'PASS', 3), (second, 'FAIL', 4))
+        self.assertEqual(record_browser_runs(self.task, raw, 'FAIL'), 2)
+        self.assertEqual(self.counters(), [(1, 0, 3.0), (1, 1, 4.0), (0, 0, 0.0)])
+
+    def test_inconsistent_browser_reports_are_dropped(self):
+        first, second, third = self.cases
+        foreign = self.other_task.test_cases.get()
+        for raw, result in [
+            (self.report((first, 'FAIL', 1), (second, 'PASS', 1)), 'FAIL'),  # runs past a failure
+            (self.report((first, 'PASS', 1), (second, 'PASS', 1)), 'FAIL'),  # no failing case
+            (self.report((first, 'PASS', 1)), 'PASS'),  # a pass that skipped cases
+            (self.report((first, 'PASS', 1), (foreign, 'FAIL', 1)), 'FAIL'),  # another task's case
+        ]:
+            self.assertEqual(record_browser_runs(self.task, raw, result), 0)
+        self.assertEqual(self.counters(), [(0, 0, 0.0)] * 3)
+
+    def test_changed_order_republishes_the_test_cases(self):
+        first, second, third = self.cases
+        record_runs(self.task.id, [{'test_case_id': first.id, 'verdict': 'PASS', 'cpu_ms': 1.0}])
+        version = Task.objects.get(id=self.task.id).test_cases_version
+        for _ in range(5):
+            record_runs(self.task.id, [{'test_case_id': third.id, 'verdict': 'FAIL', 'cpu_ms': 1.0}])
+        self.assertEqual(Task.objects.get(id=self.task.id).test_cases_version, version)  # checked recently
+
+        cache.delete(f"test_order:checked:{self.task.id}")
+        record_runs(self.task.id, [{'test_case_id': third.id, 'verdict': 'FAIL', 'cpu_ms': 1.0}])
+        self.assertGreater(Task.objects.get(id=self.task.id).test_cases_version, version)
+        self.assertEqual(judge_order(TaskTestCase.objects.filter(task=self.task)).first(), third)
@@ -0,0 +1,38 @@
+"""Shared fixtures for the core tests."""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.models import Assignment, Submission, Task, TestCase, User
+
+# Templates use {% static %}; the manifest storage needs collectstatic first.
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+def make_user(username, role='STUDENT'):
+    return User.objects.create_user(username=username, password='pw', role=role)
+
+
+def make_assignment(teacher=None, ended_days_ago=None, **fields):
+    """An assignment with its teacher; live unless ``ended_days_ago`` is given."""
+    teacher = teacher or make_user(f"teacher{User.objects.count()}", role='TEACHER')
+    if ended_days_ago is not None:
+        fields.setdefault('end_time', timezone.now() - timedelta(days=ended_days_ago))
+    return Assignment.objects.create(teacher=teacher, title=fields.pop('title', 'Assignment'), **fields)
+
+
+def make_task(assignment, title='Task', cases=(), **fields):
+    """A coding task with auto validation and the given (input, output) test cases."""
+    fields.setdefault('task_type', 'CODING')
+    fields.setdefault('validation_type', 'AUTO')
+    task = Task.objects.create(assignment=assignment, title=title, description='', **fields)
+    for input_data, expected_output in cases:
+        TestCase.objects.create(task=task, input_data=input_data, expected_output=expected_output)
+    return task
+
+
+def make_submission(student, task, result='PENDING', content='print(1)', **fields):
+    return Submission.objects.create(student=student, task=task, content=content, auto_result=result, **fields)
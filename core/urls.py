@@ -1,6 +1,12 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_VIEWS:
+    from . import async_views as student_views
+else:
+    student_views = views
+
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('signup/', views.signup_view, name='signup'),
@@ -20,14 +26,24 @@ urlpatterns = [
     path('testcase/<int:testcase_id>/edit/', views.edit_test_case, name='edit_test_case'),
     path('testcase/<int:testcase_id>/delete/', views.delete_test_case, name='delete_test_case'),
     path('assignment/<int:assignment_id>/submissions/', views.view_submissions, name='view_submissions'),
+    path('assignment/<int:assignment_id>/analytics/', views.assignment_analytics, name='assignment_analytics'),
+    path('assignment/<int:assignment_id>/export/', views.export_grades, name='export_grades'),
+    path('task/<int:task_id>/grade/', views.bulk_grade, name='bulk_grade'),
+    path('submission/<int:submission_id>/grade/quick/', views.bulk_grade_row, name='bulk_grade_row'),
     path('submission/<int:submission_id>/grade/', views.grade_submission, name='grade_submission'),
+    path('judge/stats/', views.judge_queue_stats, name='judge_queue_stats'),
+    path('submission/archived/<int:submission_id>/', views.archived_submission_detail, name='archived_submission_detail'),
 
     # Teacher Approval Requests
     path('approvals/teachers/', views.admin_teacher_requests, name='admin_teacher_requests'),
     path('approvals/teachers/<int:user_id>/<str:action>/', views.approve_teacher, name='approve_teacher'),
 
     # Student
-    path('assignment/<int:assignment_id>/', views.assignment_detail, name='assignment_detail'),
-    path('assignment/<int:assignment_id>/leaderboard/', views.leaderboard, name='leaderboard'),
-    path('task/<int:task_id>/submit/', views.submit_task, name='submit_task'),
+    path('assignment/<int:assignment_id>/', student_views.assignment_detail, name='assignment_detail'),
+    path('assignment/<int:assignment_id>/leaderboard/', student_views.leaderboard, name='leaderboard'),
+    path('task/<int:task_id>/test-cases/', student_views.task_test_cases, name='task_test_cases'),
+    path('scoreboard/<int:assignment_id>/', views.public_scoreboard, name='public_scoreboard'),
+    path('scoreboard/<int:assignment_id>.json', views.public_scoreboard_json, name='public_scoreboard_json'),
+    path('task/<int:task_id>/submit/', student_views.submit_task, name='submit_task'),
+    path('submissions/batch/', student_views.submit_batch, name='submit_batch'),
 ]
@@ -1,11 +1,12 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
-from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .forms import CustomUserCreationForm
-from .models import Assignment, Task, Submission, TestCase, User
-# Removed server-side executor import
+from .db_router import use_replica
+from .models import Assignment, Task, Submission, TestCase, User, ArchivedSubmission, BackgroundJob
+# Services, forms and other per-view dependencies are imported inside the views
+# that use them, so importing this module stays cheap; core.warmup preloads them
+# in the gunicorn master instead.
 
 @login_required
 def import_assignment_view(request):
@@ -30,7 +31,19 @@ def import_assignment_view(request):
         
         try:
             importer = AssignmentImporter(request.user)
-            assignment = importer.import_from_uploaded_file(json_file)
+            data = importer.read_uploaded_file(json_file)
+            importer.validate_json_structure(data)
+            if importer.has_generators(data):
+                # Generating test cases runs the teacher's scripts; too slow for a request.
+                from core.services.background_jobs import enqueue_import
+                enqueue_import(data, request.user)
+                messages.success(
+                    request,
+                    f"Generating the test cases of '{data['title']}'. The assignment appears on your "
+                    f"dashboard once they are ready; the status is shown below."
+                )
+                return redirect('import_assignment')
+            assignment = importer.import_from_dict(data)
             messages.success(
                 request, 
                 f"Successfully imported assignment '{assignment.title}' with {assignment.tasks.count()} tasks"
@@ -41,10 +54,13 @@ def import_assignment_view(request):
         except Exception as e:
             messages.error(request, f"Unexpected error: {e}")
     
-    return render(request, 'core/import_assignment.html')
+    return render(request, 'core/import_assignment.html', {
+        'imports': BackgroundJob.objects.filter(kind='IMPORT', created_by=request.user).order_by('-id')[:5],
+    })
 
 
 def signup_view(request):
+    from .forms import CustomUserCreationForm
     if request.method == 'POST':
         form = CustomUserCreationForm(request.POST)
         if form.is_valid():
@@ -64,6 +80,7 @@ def signup_view(request):
     return render(request, 'core/signup.html', {'form': form})
 
 def login_view(request):
+    from django.contrib.auth.forms import AuthenticationForm
     if request.method == 'POST':
         form = AuthenticationForm(request, data=request.POST)
         if form.is_valid():
@@ -81,19 +98,66 @@ def logout_view(request):
     logout(request)
     return redirect('login')
 
+def _count_per_assignment(queryset, field):
+    """Correlated subquery counting distinct ``field`` values of ``queryset`` for the outer assignment."""
+    from django.db.models import Count, IntegerField, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+    counts = (
+        queryset.filter(task__assignment=OuterRef('pk'))
+        .order_by()
+        .values('task__assignment')
+        .annotate(n=Count(field, distinct=True))
+        .values('n')[:1]
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+@use_replica
 @login_required
 def dashboard(request):
+    from django.conf import settings
+    from django.db.models import Case, CharField, Count, Value, When
     from django.utils import timezone
+    from core.cache_versions import get_version
     now = timezone.now()
     if request.user.role == 'TEACHER' and not request.user.is_approved:
         return render(request, 'core/waiting_approval.html')
-    
+
+    status = Case(
+        When(start_time__gt=now, then=Value('UPCOMING')),
+        When(end_time__lt=now, then=Value('ENDED')),
+        default=Value('LIVE'),
+        output_field=CharField(),
+    )
+    # Querysets stay lazy: they are only evaluated when the cached fragment is stale.
+    context = {
+        'now': now,
+        'cache_timeout': settings.DASHBOARD_CACHE_TIMEOUT,
+        'cache_version': f"{get_version('dashboard', request.user.id)}.{get_version('assignments', 'all')}",
+    }
     if request.user.is_teacher():
-        assignments = Assignment.objects.filter(teacher=request.user)
-        return render(request, 'core/teacher_dashboard.html', {'assignments': assignments, 'now': now})
+        context['assignments'] = (
+            Assignment.objects.filter(teacher=request.user)
+            .annotate(
+                status=status,
+                task_count=Count('tasks', distinct=True),
+                submission_count=_count_per_assignment(Submission.objects.all(), 'id'),
+                student_count=_count_per_assignment(Submission.objects.all(), 'student'),
+            )
+        )
+        return render(request, 'core/teacher_dashboard.html', context)
     else:
-        assignments = Assignment.objects.all()
-        return render(request, 'core/student_dashboard.html', {'assignments': assignments, 'now': now})
+        own = Submission.objects.filter(student=request.user)
+        context['assignments'] = (
+            Assignment.objects.select_related('teacher')
+            .annotate(
+                status=status,
+                task_count=Count('tasks', distinct=True),
+                attempted_count=_count_per_assignment(own, 'task'),
+                solved_count=_count_per_assignment(own.filter(auto_result='PASS'), 'task'),
+            )
+        )
+        return render(request, 'core/student_dashboard.html', context)
 
 @login_required
 def admin_teacher_requests(request):
@@ -138,6 +202,18 @@ def create_assignment(request):
         return redirect('dashboard')
     return render(request, 'core/create_assignment.html')
 
+def _edit_assignment_context(assignment):
+    from django.conf import settings
+    return {
+        'assignment': assignment,
+        'submit_defaults': {
+            'task_rate': settings.SUBMIT_TASK_RATE_PER_MINUTE,
+            'task_burst': settings.SUBMIT_TASK_BURST,
+            'student_rate': settings.SUBMIT_STUDENT_RATE_PER_MINUTE,
+            'student_burst': settings.SUBMIT_STUDENT_BURST,
+        },
+    }
+
 @login_required
 def edit_assignment(request, assignment_id):
     if not request.user.is_teacher(): return redirect('dashboard')
@@ -150,22 +226,46 @@ def edit_assignment(request, assignment_id):
         start_time_str = request.POST.get('start_time')
         end_time_str = request.POST.get('end_time')
         
+        # datetime-local values are naive; read them in the current time zone, as save() would,
+        # so the scoreboard snapshot below can compare them with now().
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime
         if start_time_str:
-            from django.utils.dateparse import parse_datetime
             assignment.start_time = parse_datetime(start_time_str)
+            if assignment.start_time and timezone.is_naive(assignment.start_time):
+                assignment.start_time = timezone.make_aware(assignment.start_time)
         else:
             assignment.start_time = None
             
         if end_time_str:
-            from django.utils.dateparse import parse_datetime
             assignment.end_time = parse_datetime(end_time_str)
+            if assignment.end_time and timezone.is_naive(assignment.end_time):
+                assignment.end_time = timezone.make_aware(assignment.end_time)
         else:
             assignment.end_time = None
-        
+
+        assignment.public_scoreboard = request.POST.get('public_scoreboard') == 'on'
+        # Optional whole numbers; empty means "use the default".
+        for field, label in (
+            ('scoreboard_freeze_minutes', "Freeze minutes"),
+            ('submit_task_rate', "Submissions per minute per task"),
+            ('submit_task_burst', "Burst per task"),
+            ('submit_student_rate', "Submissions per minute per student"),
+            ('submit_student_burst', "Burst per student"),
+        ):
+            value = request.POST.get(field, '').strip()
+            if value and not value.isdigit():
+                messages.error(request, f"{label} must be a whole number")
+                return render(request, 'core/edit_assignment.html', _edit_assignment_context(assignment))
+            setattr(assignment, field, int(value) if value else None)
+
         assignment.save()
+        # Publish (or take down) the snapshot now rather than on the next scheduled run.
+        from core.services.scoreboard import sync_snapshot
+        sync_snapshot(assignment)
         messages.success(request, f"Assignment '{assignment.title}' updated successfully")
         return redirect('manage_tasks', assignment_id=assignment.id)
-    return render(request, 'core/edit_assignment.html', {'assignment': assignment})
+    return render(request, 'core/edit_assignment.html', _edit_assignment_context(assignment))
 
 @login_required
 def delete_assignment(request, assignment_id):
@@ -178,35 +278,14 @@ def delete_assignment(request, assignment_id):
         return redirect('dashboard')
     return render(request, 'core/delete_assignment.html', {'assignment': assignment})
 
+@use_replica
 @login_required
 def leaderboard(request, assignment_id):
     assignment = get_object_or_404(Assignment, id=assignment_id)
     tasks = assignment.tasks.all()
     
-    # Get all students who have submitted something for this assignment
-    submissions = Submission.objects.filter(task__assignment=assignment).select_related('student', 'task')
-    
-    students_data = {}
-    for sub in submissions:
-        student = sub.student
-        if student.id not in students_data:
-            students_data[student.id] = {
-                'username': student.username,
-                'solved_count': 0,
-                'task_results': {t.id: 'PENDING' for t in tasks}
-            }
-        
-        # Keep track of the best result for each task for this student
-        current_status = students_data[student.id]['task_results'].get(sub.task.id, 'PENDING')
-        if sub.auto_result == 'PASS':
-            if current_status != 'PASS':
-                students_data[student.id]['solved_count'] += 1
-            students_data[student.id]['task_results'][sub.task.id] = 'PASS'
-        elif sub.auto_result == 'FAIL' and current_status != 'PASS':
-            students_data[student.id]['task_results'][sub.task.id] = 'FAIL'
-
-    # Sort students by solved_count (desc)
-    sorted_students = sorted(students_data.values(), key=lambda x: x['solved_count'], reverse=True)
+    from core.services.leaderboard import build_leaderboard
+    sorted_students = build_leaderboard(assignment, tasks)
 
     context = {
         'assignment': assignment,
@@ -218,6 +297,36 @@ def leaderboard(request, assignment_id):
         return render(request, 'core/partials/leaderboard_table.html', context)
     return render(request, 'core/leaderboard.html', context)
 
+def _serve_scoreboard(request, assignment_id, kind):
+    # Deliberately no login and no database access: see core/services/scoreboard.py.
+    from django.conf import settings
+    from django.http import Http404, HttpResponse
+    from django.utils.cache import get_conditional_response, patch_cache_control
+    from core.services.scoreboard import CONTENT_TYPES, load_snapshot
+
+    snapshot = load_snapshot(assignment_id, kind)
+    if snapshot is None:
+        raise Http404("This scoreboard is not public")
+    content, etag, modified, final = snapshot
+    response = get_conditional_response(request, etag=etag, last_modified=int(modified))
+    if response is None:
+        response = HttpResponse(content, content_type=CONTENT_TYPES[kind])
+    response['ETag'] = etag
+    if final:
+        patch_cache_control(response, public=True, max_age=settings.SCOREBOARD_FINAL_MAX_AGE)
+    else:
+        # Shared caches may keep serving the previous snapshot while they fetch the next one.
+        patch_cache_control(response, public=True, max_age=settings.SCOREBOARD_SNAPSHOT_SECONDS,
+                            stale_while_revalidate=settings.SCOREBOARD_SNAPSHOT_SECONDS * 6)
+    response['Access-Control-Allow-Origin'] = '*'
+    return response
+
+def public_scoreboard(request, assignment_id):
+    return _serve_scoreboard(request, assignment_id, 'html')
+
+def public_scoreboard_json(request, assignment_id):
+    return _serve_scoreboard(request, assignment_id, 'json')
+
 @login_required
 def manage_tasks(request, assignment_id):
     if not request.user.is_teacher(): return redirect('dashboard')
@@ -267,6 +376,26 @@ def edit_task(request, task_id):
         task.description = request.POST.get('description')
         task.task_type = request.POST.get('task_type')
         task.validation_type = request.POST.get('validation_type')
+        if request.POST.get('comparator') in dict(Task.COMPARATOR_CHOICES):
+            task.comparator = request.POST['comparator']
+        try:
+            float_tolerance = float(request.POST.get('float_tolerance') or task.float_tolerance)
+        except ValueError:
+            float_tolerance = -1
+        if not float_tolerance >= 0:
+            messages.error(request, "Float tolerance must be a non-negative number")
+            return render(request, 'core/edit_task.html', {'task': task})
+        task.float_tolerance = float_tolerance
+        task.reference_solution = request.POST.get('reference_solution', '')
+        task.adaptive_time_limit = bool(request.POST.get('adaptive_time_limit'))
+        try:
+            time_limit = float(request.POST.get('time_limit') or 0)
+        except ValueError:
+            time_limit = -1
+        if time_limit < 0:
+            messages.error(request, "Time limit must be a positive number of seconds")
+            return render(request, 'core/edit_task.html', {'task': task})
+        task.time_limit = time_limit or None
         task.save()
         messages.success(request, f"Task '{task.title}' updated successfully")
         return redirect('manage_tasks', assignment_id=task.assignment.id)
@@ -310,7 +439,9 @@ def delete_test_case(request, testcase_id):
 # Student Views
 import json
 from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponseBadRequest
 
+@use_replica
 @login_required
 def assignment_detail(request, assignment_id):
     assignment = get_object_or_404(Assignment, id=assignment_id)
@@ -319,62 +450,122 @@ def assignment_detail(request, assignment_id):
          return redirect('dashboard')
     tasks = assignment.tasks.all()
     
-    # Prepare test cases for the frontend
-    tasks_data = []
-    for task in tasks:
-        tc_list = []
-        if task.task_type == 'CODING' and task.validation_type == 'AUTO':
-            for tc in task.test_cases.all():
-                tc_list.append({
-                    'input': tc.input_data,
-                    'output': tc.expected_output.strip()
-                })
-        tasks_data.append({
-            'id': task.id,
-            'test_cases': tc_list
-        })
-    
+    # The runner fetches each task's test cases when it is first run.
+    from core.services.test_case_delivery import test_cases_url
+    test_case_urls = {task.id: test_cases_url(task) for task in tasks if task.task_type == 'CODING'}
+
     return render(request, 'core/assignment_detail.html', {
         'assignment': assignment, 
         'tasks': tasks,
-        'tasks_json': json.dumps(tasks_data, cls=DjangoJSONEncoder)
+        'test_case_urls_json': json.dumps(test_case_urls, cls=DjangoJSONEncoder)
     })
 
+@use_replica
+@login_required
+def task_test_cases(request, task_id):
+    task = get_object_or_404(Task.objects.select_related('assignment'), id=task_id, task_type='CODING')
+    if not task.assignment.is_live():
+        raise Http404("This assignment is not currently available.")
+    from core.services.test_case_delivery import (
+        TestCaseDeliveryError, encoded_test_cases, test_cases_response,
+    )
+    try:
+        encoded = encoded_test_cases(task, request.GET.get('format', 'full'))
+    except TestCaseDeliveryError as e:
+        return HttpResponseBadRequest(str(e))
+    return test_cases_response(request, task, encoded)
+
 @login_required
 def submit_task(request, task_id):
-    task = get_object_or_404(Task, id=task_id)
+    task = get_object_or_404(Task.objects.select_related('assignment'), id=task_id)
     if request.method == 'POST':
-        content = request.POST.get('content')
-        auto_result = request.POST.get('auto_result', 'PENDING')
-        auto_output = request.POST.get('auto_output', '')
-        
-        submission = Submission.objects.create(
-            student=request.user, 
-            task=task, 
-            content=content,
-            auto_result=auto_result,
-            auto_output=auto_output
-        )
-        
+        from core.services.submission_intake import overloaded_response, submit_gate
+        with submit_gate.admitted() as retry_after:
+            if retry_after is not None:
+                return overloaded_response(retry_after)
+            return _submit_task(request, task)
+    return redirect('assignment_detail', assignment_id=task.assignment.id)
+
+def _submit_task(request, task):
+    from core.services.rate_limit import SubmissionThrottle
+    from core.services.submission_intake import store_submission, throttled_response
+    wait = SubmissionThrottle(task.assignment).check(request.user.id, task.id)
+    if wait is not None:
         if request.headers.get('HX-Request'):
-            return render(request, 'core/partials/submission_result.html', {'submission': submission})
-        
+            return throttled_response(wait)
+        messages.error(request, f"Too many submissions. Try again in {wait} seconds.")
         return redirect('assignment_detail', assignment_id=task.assignment.id)
+
+    content = request.POST.get('content')
+    auto_result = request.POST.get('auto_result', 'PENDING')
+    # The browser runner bounds its output too, but the request can come from anywhere.
+    from core.services.comparators import bound_output
+    auto_output = bound_output(request.POST.get('auto_output', ''))
+    
+    submission, created = store_submission(request.user, task, content, auto_result, auto_output)
+    from django.conf import settings
+    if created and auto_result != 'PENDING' and not settings.SERVER_JUDGE:
+        # With the server judge on, its own runs feed the statistics instead.
+        from core.services.test_ordering import record_browser_runs
+        record_browser_runs(task, request.POST.get('test_runs'), auto_result)
+    
+    if request.headers.get('HX-Request'):
+        return render(request, 'core/partials/submission_result.html', {'submission': submission})
+    
     return redirect('assignment_detail', assignment_id=task.assignment.id)
 
+@login_required
+def submit_batch(request):
+    if request.method != 'POST':
+        return HttpResponseBadRequest("POST a JSON batch of submissions")
+    from core.services.submission_intake import (
+        SubmissionIntakeError, batch_response, overloaded_response, parse_batch,
+        submit_batch as store_batch, submit_gate,
+    )
+    with submit_gate.admitted() as retry_after:
+        if retry_after is not None:
+            return overloaded_response(retry_after)
+        try:
+            items = parse_batch(request.body)
+        except SubmissionIntakeError as e:
+            return HttpResponseBadRequest(str(e))
+        return batch_response(request, store_batch(request.user, items))
+
+@use_replica
 @login_required
 def view_submissions(request, assignment_id):
     assignment = get_object_or_404(Assignment, id=assignment_id)
     if not request.user.is_teacher() and not assignment.teacher == request.user:
         return redirect('dashboard')
     
-    submissions = Submission.objects.filter(task__assignment=assignment).order_by('-submitted_at')
-    return render(request, 'core/view_submissions.html', {'assignment': assignment, 'submissions': submissions})
+    submissions = Submission.objects.filter(task__assignment=assignment).select_related('student', 'task').order_by('-submitted_at')
+    if assignment.archives.exists():
+        # Old attempts live in the archive table; merge them back in so the list looks unchanged.
+        from itertools import chain
+        archived = (
+            ArchivedSubmission.objects.filter(task__assignment=assignment)
+            .select_related('student', 'task')
+            .defer('content_zlib', 'auto_output_zlib')
+        )
+        submissions = sorted(chain(submissions, archived), key=lambda s: s.submitted_at, reverse=True)
+
+    from core.services.grade_export import GradeExporter
+    from core.services.similarity import assignment_similar_pairs
+    return render(request, 'core/view_submissions.html', {
+        'assignment': assignment,
+        'submissions': submissions,
+        'similar_pairs': assignment_similar_pairs(assignment, user=request.user),
+        'grading_tasks': assignment.tasks.filter(validation_type='MANUAL'),
+        'parquet_export': GradeExporter.parquet_available(),
+    })
 
 @login_required
 def grade_submission(request, submission_id):
     if not request.user.is_teacher(): return redirect('dashboard')
-    submission = get_object_or_404(Submission, id=submission_id, task__assignment__teacher=request.user)
+    submission = get_object_or_404(
+        Submission.objects.select_related('student', 'task__assignment'),
+        id=submission_id, task__assignment__teacher=request.user
+    )
     if request.method == 'POST':
         grade = request.POST.get('grade')
         comments = request.POST.get('comments')
@@ -384,3 +575,153 @@ def grade_submission(request, submission_id):
         messages.success(request, f"Graded {submission.student.username}'s submission.")
         return redirect('view_submissions', assignment_id=submission.task.assignment.id)
     return render(request, 'core/grade_submission.html', {'submission': submission})
+
+@login_required
+def archived_submission_detail(request, submission_id):
+    if not request.user.is_teacher(): return redirect('dashboard')
+    submission = get_object_or_404(
+        ArchivedSubmission.objects.select_related('student', 'task__assignment'),
+        id=submission_id, task__assignment__teacher=request.user
+    )
+    return render(request, 'core/grade_submission.html', {'submission': submission})
+
+@use_replica
+@login_required
+def export_grades(request, assignment_id):
+    if not request.user.is_teacher(): return redirect('dashboard')
+    assignment = get_object_or_404(Assignment, id=assignment_id, teacher=request.user)
+    from django.http import FileResponse, StreamingHttpResponse
+    from core.services.grade_export import GradeExporter, GradeExportError
+
+    exporter = GradeExporter(assignment)
+    filename = f"assignment_{assignment.id}_grades"
+    if request.GET.get('format') == 'parquet':
+        # Not streamed: the file is built in full before the first byte is sent.
+        # Very large exports are better run with 'manage.py export_grades'.
+        import tempfile
+        target = tempfile.TemporaryFile()
+        try:
+            exporter.write_parquet(target)
+        except GradeExportError as e:
+            target.close()
+            messages.error(request, f"Export failed: {e}")
+            return redirect('view_submissions', assignment_id=assignment.id)
+        target.seek(0)
+        return FileResponse(target, as_attachment=True, filename=f"{filename}.parquet")
+
+    from core.db_router import stream_with_replica_reads
+    response = StreamingHttpResponse(stream_with_replica_reads(exporter.iter_csv()), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+@use_replica
+@login_required
+def assignment_analytics(request, assignment_id):
+    if not request.user.is_teacher(): return redirect('dashboard')
+    assignment = get_object_or_404(Assignment, id=assignment_id, teacher=request.user)
+    from core.services.assignment_analytics import AssignmentAnalytics
+    stats = AssignmentAnalytics(assignment).get()
+    return render(request, 'core/assignment_analytics.html', {'assignment': assignment, 'stats': stats})
+
+@login_required
+def judge_queue_stats(request):
+    if not request.user.is_teacher(): return redirect('dashboard')
+    from django.http import JsonResponse
+    from core.services.judge_queue import JudgeQueue
+    minutes = int(request.GET['minutes']) if request.GET.get('minutes', '').isdigit() else 60
+    return JsonResponse({'minutes': minutes, 'classes': JudgeQueue.wait_stats(minutes)})
+
+BULK_GRADE_PAGE_SIZE = 25
+BULK_GRADE_PREFETCH_OFFSET = 5
+
+
+def _parse_grade(value):
+    """Return the grade as a Decimal in [0, 100], None when blank; raise ValueError otherwise."""
+    from decimal import Decimal, InvalidOperation
+    if value is None or value.strip() == '':
+        return None
+    try:
+        grade = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"'{value}' is not a number")
+    if not 0 <= grade <= 100:
+        raise ValueError("Grades must be between 0 and 100")
+    return grade.quantize(Decimal('0.01'))
+
+
+@login_required
+def bulk_grade(request, task_id):
+    if not request.user.is_teacher(): return redirect('dashboard')
+    task = get_object_or_404(Task.objects.select_related('assignment'), id=task_id, assignment__teacher=request.user)
+
+    if request.method == 'POST':
+        submitted = {}
+        for key, value in request.POST.items():
+            if key.startswith('grade-') and value.strip():
+                submission_id = key.split('-', 1)[1]
+                if not submission_id.isdigit():
+                    continue  # not a field of the grading form
+                submission_id = int(submission_id)
+                try:
+                    submitted[submission_id] = _parse_grade(value)
+                except ValueError as e:
+                    messages.error(request, f"Submission {submission_id}: {e}")
+        valid_ids = set(
+            Submission.objects.filter(task=task, id__in=submitted).values_list('id', flat=True)
+        )
+        updates = [
+            Submission(id=submission_id, manual_grade=grade,
+                       teacher_comments=request.POST.get(f'comments-{submission_id}', ''))
+            for submission_id, grade in submitted.items() if submission_id in valid_ids
+        ]
+        Submission.objects.bulk_update(updates, ['manual_grade', 'teacher_comments'], batch_size=500)
+        foreign = len(submitted) - len(updates)
+        if foreign:
+            messages.error(request, f"Skipped {foreign} grades for submissions that are not part of this task.")
+        if updates:
+            from core.cache_versions import bump_version
+            bump_version('assignment', task.assignment_id)
+            messages.success(request, f"Saved {len(updates)} grades.")
+        return redirect('bulk_grade', task_id=task.id)
+
+    after = int(request.GET['after']) if request.GET.get('after', '').isdigit() else 0
+    page = list(
+        Submission.objects
+        .filter(task=task, manual_grade__isnull=True, id__gt=after)
+        .select_related('student')
+        .only('id', 'content', 'auto_result', 'teacher_comments', 'submitted_at', 'student__username')
+        .order_by('id')[:BULK_GRADE_PAGE_SIZE + 1]
+    )
+    has_next = len(page) > BULK_GRADE_PAGE_SIZE
+    page = page[:BULK_GRADE_PAGE_SIZE]
+    context = {
+        'task': task,
+        'submissions': page,
+        'next_after': page[-1].id if has_next else None,
+        'prefetch_index': max(len(page) - BULK_GRADE_PREFETCH_OFFSET, 1),
+    }
+    if request.headers.get('HX-Request'):
+        return render(request, 'core/partials/bulk_grade_rows.html', context)
+    return render(request, 'core/bulk_grade.html', context)
+
+
+@login_required
+def bulk_grade_row(request, submission_id):
+    if not request.user.is_teacher(): return redirect('dashboard')
+    if request.method != 'POST':
+        return redirect('dashboard')
+    from django.http import HttpResponse
+    try:
+        grade = _parse_grade(request.POST.get(f'grade-{submission_id}'))
+    except ValueError as e:
+        return render(request, 'core/partials/bulk_grade_saved.html', {'error': str(e)})
+    comments = request.POST.get(f'comments-{submission_id}', '')
+    updated = Submission.objects.filter(
+        id=submission_id, task__assignment__teacher=request.user
+    ).update(manual_grade=grade, teacher_comments=comments)
+    if not updated:
+        return HttpResponse(status=404)
+    from core.cache_versions import bump_version
+    assignment_id = Task.objects.filter(submissions__id=submission_id).values_list('assignment_id', flat=True).first()
+    bump_version('assignment', assignment_id)
+    return render(request, 'core/partials/bulk_grade_saved.html', {'grade': grade})
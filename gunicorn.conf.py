@@ -0,0 +1,54 @@
+"""
+Production gunicorn profile, used by the Procfile and the Dockerfile.
+
+With ``GUNICORN_PRELOAD`` (the default) the master imports the app and runs
+``core.warmup.warm_up`` before forking, then freezes the garbage collector
+so the objects loaded so far are never touched again. Workers start with
+all of it already in memory, share those pages copy-on-write and answer
+their first request at full speed. Without preloading each worker warms up
+for itself after it starts.
+
+``python manage.py measure_startup`` compares both profiles.
+
+Usage:
+    gunicorn -c gunicorn.conf.py config.wsgi:application
+    gunicorn -c gunicorn.conf.py -k uvicorn_worker.UvicornWorker config.asgi:application
+"""
+import gc
+
+# Not "from decouple import config": gunicorn would read a module-level
+# "config" as its own setting of that name.
+import decouple
+
+# Address to listen on; PORT is set by most platforms
+bind = f"0.0.0.0:{decouple.config('PORT', default='8000')}"
+
+# Load and warm up the app in the master, before forking workers
+preload_app = decouple.config('GUNICORN_PRELOAD', default=True, cast=bool)
+
+# Number of worker processes (WEB_CONCURRENCY, as most platforms set it)
+workers = decouple.config('WEB_CONCURRENCY', default=2, cast=int)
+
+# Restart a worker after this many requests (0 = never); guards against slow leaks
+max_requests = decouple.config('GUNICORN_MAX_REQUESTS', default=0, cast=int)
+max_requests_jitter = max_requests // 10
+
+
+def _warm_up(log):
+    from core.warmup import warm_up
+    stats = warm_up()
+    log.info("Warmed up: %(modules)d modules, %(url_patterns)d URL names, "
+             "%(templates)d templates in %(seconds).3fs", stats)
+
+
+def when_ready(server):
+    if preload_app:
+        _warm_up(server.log)
+        # Objects that survive to here live for the whole process; keeping the
+        # collector off them stops it from dirtying the shared pages.
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    if not preload_app:
+        _warm_up(worker.log)